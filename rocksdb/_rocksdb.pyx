@@ -2,17 +2,34 @@ import cython
 from libcpp.string cimport string
 from libcpp.deque cimport deque
 from libcpp.vector cimport vector
+from libcpp.utility cimport pair
 from cpython cimport bool as py_bool
 from libcpp cimport bool as cpp_bool
 from libc.stdint cimport uint32_t
+from libc.stdint cimport int64_t
+from libc.stdint cimport uint64_t
+from libc.string cimport memcpy
 from cython.operator cimport dereference as deref
 from cpython.bytes cimport PyBytes_AsString
 from cpython.bytes cimport PyBytes_Size
+from cpython.bytes cimport PyBytes_Check
+from cpython.bytes cimport PyBytes_AS_STRING
+from cpython.bytes cimport PyBytes_GET_SIZE
 from cpython.bytes cimport PyBytes_FromString
 from cpython.bytes cimport PyBytes_FromStringAndSize
+from cpython.buffer cimport PyObject_GetBuffer
+from cpython.buffer cimport PyBuffer_Release
+from cpython.buffer cimport PyBuffer_FillInfo
+from cpython.buffer cimport PyBUF_SIMPLE
+from cpython.buffer cimport PyBUF_WRITABLE
+from cpython.buffer cimport PyBUF_C_CONTIGUOUS
+from cpython.buffer cimport PyBUF_FORMAT
 from cpython.unicode cimport PyUnicode_Decode
+from cpython.ref cimport Py_INCREF
+from cpython.ref cimport Py_DECREF
 
 from std_memory cimport shared_ptr
+from std_memory cimport unique_ptr
 cimport options
 cimport merge_operator
 cimport filter_policy
@@ -28,6 +45,15 @@ cimport env
 cimport table_factory
 cimport memtablerep
 cimport universal_compaction
+cimport statistics
+cimport sst_file_writer
+cimport compaction_filter
+cimport write_batch_with_index
+cimport transaction_db
+cimport write_buffer_manager
+cimport checkpoint
+cimport transaction_log
+cimport call_stats
 
 # Enums are the only exception for direct imports
 # Their name als already unique enough
@@ -38,6 +64,7 @@ from options cimport kCompactionStyleLevel
 from options cimport kCompactionStyleUniversal
 
 from slice_ cimport Slice
+from slice_ cimport PinnableSlice
 from status cimport Status
 
 import sys
@@ -46,10 +73,19 @@ from interfaces import AssociativeMergeOperator as IAssociativeMergeOperator
 from interfaces import FilterPolicy as IFilterPolicy
 from interfaces import Comparator as IComparator
 from interfaces import SliceTransform as ISliceTransform
+from interfaces import CompactionFilter as ICompactionFilter
+from interfaces import CompactionFilterFactory as ICompactionFilterFactory
 import traceback
+import threading
+import weakref
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import errors
 
 ctypedef const filter_policy.FilterPolicy ConstFilterPolicy
+ctypedef db.ColumnFamilyHandle CColumnFamilyHandle
+ctypedef db.ColumnFamilyDescriptor CColumnFamilyDescriptor
+ctypedef db.Range CRange
 
 cdef extern from "cpp/utils.hpp" namespace "py_rocks":
     cdef const Slice* vector_data(vector[Slice]&)
@@ -87,6 +123,18 @@ cdef check_status(const Status& st):
     if st.IsIncomplete():
         raise errors.Incomplete(st.ToString())
 
+    if st.IsBusy():
+        raise errors.Busy(st.ToString())
+
+    if st.IsTimedOut():
+        raise errors.TimedOut(st.ToString())
+
+    if st.IsTryAgain():
+        raise errors.TryAgain(st.ToString())
+
+    if st.IsExpired():
+        raise errors.Expired(st.ToString())
+
     raise Exception("Unknown error: %s" % st.ToString())
 ######################################################
 
@@ -97,8 +145,72 @@ cdef string bytes_to_string(path) except *:
 cdef string_to_bytes(string ob):
     return PyBytes_FromStringAndSize(ob.c_str(), ob.size())
 
+# Accepts bytes and any other object supporting the (contiguous) buffer
+# protocol, like bytearray or memoryview. No copy is made, the slice points
+# directly into the memory of 'ob'. For non-bytes objects the buffer is
+# released immediately, so the slice is only valid as long as the GIL is
+# held and no python code runs. Use hold_slice for everything else.
 cdef Slice bytes_to_slice(ob) except *:
-    return Slice(PyBytes_AsString(ob), PyBytes_Size(ob))
+    cdef Py_buffer view
+    cdef Slice ret
+
+    if PyBytes_Check(ob):
+        return Slice(PyBytes_AS_STRING(ob), PyBytes_GET_SIZE(ob))
+
+    PyObject_GetBuffer(ob, cython.address(view), PyBUF_SIMPLE)
+    ret = Slice(<const char*>view.buf, <size_t>view.len)
+    PyBuffer_Release(cython.address(view))
+    return ret
+
+@cython.final
+@cython.internal
+cdef class BufferHold(object):
+    # Keeps the buffer of an object exported as long as it is alive.
+    cdef Py_buffer view
+
+    def __cinit__(self, ob):
+        PyObject_GetBuffer(ob, cython.address(self.view), PyBUF_SIMPLE)
+
+    def __dealloc__(self):
+        # A failed PyObject_GetBuffer leaves view.obj NULL, which
+        # makes this a no-op.
+        PyBuffer_Release(cython.address(self.view))
+
+# Like bytes_to_slice, but for non-bytes objects the buffer stays exported
+# until 'holds' is dropped. A bytearray can't be resized while its buffer is
+# exported, so the slice stays valid after the GIL is released.
+# Bytes are immutable, the caller just has to keep 'ob' alive.
+cdef Slice hold_slice(ob, list holds) except *:
+    cdef BufferHold hold
+
+    if PyBytes_Check(ob):
+        return Slice(PyBytes_AS_STRING(ob), PyBytes_GET_SIZE(ob))
+
+    hold = BufferHold(ob)
+    holds.append(hold)
+    return Slice(<const char*>hold.view.buf, <size_t>hold.view.len)
+
+# Gets the buffer of an array of fixed size items, every entry of the first
+# dimension is one item. Works for numpy arrays and every other object
+# supporting the buffer protocol. Returns the number of items.
+cdef size_t get_array_buffer(
+        ob,
+        Py_buffer* view,
+        size_t* item_size,
+        int flags) except? 0:
+
+    PyObject_GetBuffer(ob, view, PyBUF_C_CONTIGUOUS | flags)
+
+    if view.ndim < 1:
+        PyBuffer_Release(view)
+        raise ValueError("Array must have at least one dimension")
+
+    if view.shape[0] == 0:
+        item_size[0] = 0
+        return 0
+
+    item_size[0] = view.len // view.shape[0]
+    return view.shape[0]
 
 cdef slice_to_bytes(Slice sl):
     return PyBytes_FromStringAndSize(sl.data(), sl.size())
@@ -117,6 +229,130 @@ cdef object string_to_path(string path):
     fs_encoding = sys.getfilesystemencoding().encode('ascii')
     return PyUnicode_Decode(path.c_str(), path.size(), fs_encoding, "replace")
 
+## Here comes the instrumentation of the binding, see rocksdb/instrumentation.py
+# Identifies the instrumented calls, the names are in 'instrumented_calls'.
+cdef enum:
+    CALL_DB_PUT
+    CALL_DB_DELETE
+    CALL_DB_MERGE
+    CALL_DB_WRITE
+    CALL_DB_GET
+    CALL_DB_GET_PINNED
+    CALL_DB_GET_INTO
+    CALL_DB_MULTI_GET
+    CALL_DB_KEY_MAY_EXIST
+    CALL_DB_READ_OPTS
+    CALL_ITERATOR_SEEK
+    CALL_COMPARE
+    CALL_MERGE
+    CALL_FULL_MERGE
+    CALL_PARTIAL_MERGE
+    CALL_SLICE_TRANSFORM
+    CALL_SLICE_IN_DOMAIN
+    CALL_SLICE_IN_RANGE
+    CALL_COMPACTION_FILTER
+    CALL_CREATE_COMPACTION_FILTER
+    CALL_COUNT
+
+instrumented_calls = (
+    ('DB.put', 'method'),
+    ('DB.delete', 'method'),
+    ('DB.merge', 'method'),
+    ('DB.write', 'method'),
+    ('DB.get', 'method'),
+    ('DB.get_pinned', 'method'),
+    ('DB.get_into', 'method'),
+    ('DB.multi_get', 'method'),
+    ('DB.key_may_exist', 'method'),
+    ('DB.read_opts', 'method'),
+    ('Iterator.seek', 'method'),
+    ('compare', 'callback'),
+    ('merge', 'callback'),
+    ('full_merge', 'callback'),
+    ('partial_merge', 'callback'),
+    ('slice_transform', 'callback'),
+    ('slice_in_domain', 'callback'),
+    ('slice_in_range', 'callback'),
+    ('compaction_filter', 'callback'),
+    ('create_compaction_filter', 'callback'),
+)
+
+# While disabled the costs are one check of this flag per call.
+cdef cpp_bool instrumentation_enabled = False
+cdef vector[call_stats.CallStats] instrumentation_stats
+instrumentation_stats.resize(CALL_COUNT)
+
+# Returns 0 if disabled, this makes the other functions no-ops for the call.
+cdef inline uint64_t call_started() nogil:
+    if instrumentation_enabled:
+        return call_stats.monotonic_nanos()
+    return 0
+
+# Called by callbacks right after the GIL was acquired.
+cdef inline uint64_t call_acquired(uint64_t started) nogil:
+    if started == 0:
+        return 0
+    return call_stats.monotonic_nanos()
+
+# Must be called with the GIL held.
+cdef inline void call_finished(
+        int call,
+        uint64_t started,
+        uint64_t acquired,
+        cpp_bool failed) nogil:
+
+    if started != 0:
+        instrumentation_stats[call].record(
+            started,
+            acquired,
+            call_stats.monotonic_nanos(),
+            failed)
+
+cdef inline cpp_bool status_failed(const Status& st) nogil:
+    return not st.ok() and not st.IsNotFound()
+
+cdef dict histogram_to_python(const call_stats.CallHistogram& hist):
+    cdef size_t i
+    return {
+        'count': hist.count,
+        'sum_seconds': hist.sum_nanos / 1e9,
+        'max_seconds': hist.max_nanos / 1e9,
+        'buckets': [
+            (call_stats.bucket_bound_nanos(i) / 1e9, hist.bucket(i))
+            for i in range(call_stats.CALL_STATS_BUCKETS)
+        ] + [(float('inf'), hist.bucket(call_stats.CALL_STATS_BUCKETS))],
+    }
+
+def _set_instrumentation(cpp_bool enabled):
+    global instrumentation_enabled
+    instrumentation_enabled = enabled
+
+def _get_instrumentation():
+    return instrumentation_enabled
+
+def _reset_instrumentation():
+    cdef size_t i
+    for i in range(instrumentation_stats.size()):
+        instrumentation_stats[i].reset()
+
+def _instrumentation_snapshot():
+    cdef size_t i
+    cdef dict ret = {}
+
+    for i in range(instrumentation_stats.size()):
+        name, kind = instrumented_calls[i]
+        ret[name] = {
+            'type': kind,
+            'calls': instrumentation_stats[i].calls,
+            'errors': instrumentation_stats[i].errors,
+            'latency': histogram_to_python(instrumentation_stats[i].latency),
+        }
+        if kind == 'callback':
+            ret[name]['gil_wait'] = histogram_to_python(
+                instrumentation_stats[i].gil_wait)
+    return ret
+#########################################
+
 ## Here comes the stuff for the comparator
 @cython.internal
 cdef class PyComparator(object):
@@ -179,21 +415,78 @@ cdef class PyBytewiseComparator(PyComparator):
     cdef const comparator.Comparator* get_comparator(self):
         return self.comparator_ptr
 
+@cython.internal
+cdef class PyReverseBytewiseComparator(PyComparator):
+    cdef const comparator.Comparator* comparator_ptr
+
+    def __cinit__(self):
+        self.comparator_ptr = comparator.ReverseBytewiseComparator()
+
+    def name(self):
+        return PyBytes_FromString(self.comparator_ptr.Name())
+
+    def compare(self, a, b):
+        return self.comparator_ptr.Compare(
+            bytes_to_slice(a),
+            bytes_to_slice(b))
+
+    cdef object get_ob(self):
+       return self
+
+    cdef const comparator.Comparator* get_comparator(self):
+        return self.comparator_ptr
+
+@cython.internal
+cdef class PyUInt64Comparator(PyComparator):
+    cdef comparator.UInt64Comparator* comparator_ptr
+
+    def __cinit__(self):
+        self.comparator_ptr = new comparator.UInt64Comparator()
+
+    def __dealloc__(self):
+        if not self.comparator_ptr == NULL:
+            del self.comparator_ptr
+
+    def name(self):
+        return PyBytes_FromString(self.comparator_ptr.Name())
+
+    def compare(self, a, b):
+        return self.comparator_ptr.Compare(
+            bytes_to_slice(a),
+            bytes_to_slice(b))
+
+    cdef object get_ob(self):
+       return self
+
+    cdef const comparator.Comparator* get_comparator(self):
+        return <comparator.Comparator*> self.comparator_ptr
+
 cdef int compare_callback(
     void* ctx,
     logger.Logger* log,
     string& error_msg,
     const Slice& a,
-    const Slice& b) with gil:
-
-    try:
-        return (<object>ctx).compare(slice_to_bytes(a), slice_to_bytes(b))
-    except BaseException as error:
-        tb = traceback.format_exc()
-        logger.Log(log, "Error in compare callback: %s", <bytes>tb)
-        error_msg.assign(<bytes>str(error))
+    const Slice& b) nogil:
+
+    cdef uint64_t started = call_started()
+    cdef uint64_t acquired
+    cdef cpp_bool failed = False
+
+    with gil:
+        acquired = call_acquired(started)
+        try:
+            return (<object>ctx).compare(slice_to_bytes(a), slice_to_bytes(b))
+        except BaseException as error:
+            failed = True
+            tb = traceback.format_exc()
+            logger.Log(log, "Error in compare callback: %s", <bytes>tb)
+            error_msg.assign(<bytes>str(error))
+        finally:
+            call_finished(CALL_COMPARE, started, acquired, failed)
 
 BytewiseComparator = PyBytewiseComparator
+ReverseBytewiseComparator = PyReverseBytewiseComparator
+UInt64Comparator = PyUInt64Comparator
 #########################################
 
 
@@ -211,92 +504,52 @@ cdef class PyFilterPolicy(object):
         pass
 
 @cython.internal
-cdef class PyGenericFilterPolicy(PyFilterPolicy):
-    cdef shared_ptr[filter_policy.FilterPolicyWrapper] policy
-    cdef object ob
+cdef class PyBloomFilterPolicy(PyFilterPolicy):
+    cdef shared_ptr[ConstFilterPolicy] policy
 
-    def __cinit__(self, object ob):
-        if not isinstance(ob, IFilterPolicy):
-            raise TypeError("%s is not of type %s" % (ob, IFilterPolicy))
+    def __cinit__(self, double bits_per_key):
+        self.policy.reset(filter_policy.NewBloomFilterPolicy(bits_per_key, False))
 
-        self.ob = ob
-        self.policy.reset(new filter_policy.FilterPolicyWrapper(
-                bytes_to_string(ob.name()),
-                <void*>ob,
-                create_filter_callback,
-                key_may_match_callback))
+    def name(self):
+        return PyBytes_FromString(self.policy.get().Name())
 
     cdef object get_ob(self):
-        return self.ob
+        return self
 
     cdef shared_ptr[ConstFilterPolicy] get_policy(self):
-        return <shared_ptr[ConstFilterPolicy]>(self.policy)
-
-    cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
-        self.policy.get().set_info_log(info_log)
-
-
-cdef void create_filter_callback(
-    void* ctx,
-    logger.Logger* log,
-    string& error_msg,
-    const Slice* keys,
-    int n,
-    string* dst) with gil:
-
-    try:
-        ret = (<object>ctx).create_filter(
-            [slice_to_bytes(keys[i]) for i in range(n)])
-        dst.append(bytes_to_string(ret))
-    except BaseException as error:
-        tb = traceback.format_exc()
-        logger.Log(log, "Error in create filter callback: %s", <bytes>tb)
-        error_msg.assign(<bytes>str(error))
-
-cdef cpp_bool key_may_match_callback(
-    void* ctx,
-    logger.Logger* log,
-    string& error_msg,
-    const Slice& key,
-    const Slice& filt) with gil:
-
-    try:
-        return (<object>ctx).key_may_match(
-            slice_to_bytes(key),
-            slice_to_bytes(filt))
-    except BaseException as error:
-        tb = traceback.format_exc()
-        logger.Log(log, "Error in key_mach_match callback: %s", <bytes>tb)
-        error_msg.assign(<bytes>str(error))
+        return self.policy
 
 @cython.internal
-cdef class PyBloomFilterPolicy(PyFilterPolicy):
+cdef class PyFullFilterPolicy(PyFilterPolicy):
     cdef shared_ptr[ConstFilterPolicy] policy
 
-    def __cinit__(self, int bits_per_key):
-        self.policy.reset(filter_policy.NewBloomFilterPolicy(bits_per_key))
+    def __cinit__(self, double bits_per_key=10):
+        self.policy.reset(filter_policy.NewBloomFilterPolicy(bits_per_key, False))
 
     def name(self):
         return PyBytes_FromString(self.policy.get().Name())
 
-    def create_filter(self, keys):
-        cdef string dst
-        cdef vector[Slice] c_keys
+    cdef object get_ob(self):
+        return self
 
-        for key in keys:
-            c_keys.push_back(bytes_to_slice(key))
+    cdef shared_ptr[ConstFilterPolicy] get_policy(self):
+        return self.policy
+
+@cython.internal
+cdef class PyRibbonFilterPolicy(PyFilterPolicy):
+    cdef shared_ptr[ConstFilterPolicy] policy
 
-        self.policy.get().CreateFilter(
-            vector_data(c_keys),
-            c_keys.size(),
-            cython.address(dst))
+    def __cinit__(
+            self,
+            double bloom_equivalent_bits_per_key=10,
+            int bloom_before_level=0):
 
-        return string_to_bytes(dst)
+        self.policy.reset(filter_policy.NewRibbonFilterPolicy(
+            bloom_equivalent_bits_per_key,
+            bloom_before_level))
 
-    def key_may_match(self, key, filter_):
-        return self.policy.get().KeyMayMatch(
-            bytes_to_slice(key),
-            bytes_to_slice(filter_))
+    def name(self):
+        return PyBytes_FromString(self.policy.get().Name())
 
     cdef object get_ob(self):
         return self
@@ -305,6 +558,8 @@ cdef class PyBloomFilterPolicy(PyFilterPolicy):
         return self.policy
 
 BloomFilterPolicy = PyBloomFilterPolicy
+FullFilterPolicy = PyFullFilterPolicy
+RibbonFilterPolicy = PyRibbonFilterPolicy
 #############################################
 
 
@@ -312,6 +567,14 @@ BloomFilterPolicy = PyBloomFilterPolicy
 ## Here comes the stuff for the merge operator
 @cython.internal
 cdef class PyMergeOperator(object):
+    cdef object get_ob(self):
+        return None
+
+    cdef shared_ptr[merge_operator.MergeOperator] get_operator(self):
+        return shared_ptr[merge_operator.MergeOperator]()
+
+@cython.internal
+cdef class PyGenericMergeOperator(PyMergeOperator):
     cdef shared_ptr[merge_operator.MergeOperator] merge_op
     cdef object ob
 
@@ -352,28 +615,37 @@ cdef cpp_bool merge_callback(
     const Slice* existing_value,
     const Slice& value,
     string* new_value,
-    logger.Logger* log) with gil:
-
-    if existing_value == NULL:
-        py_existing_value = None
-    else:
-        py_existing_value = slice_to_bytes(deref(existing_value))
-
-    try:
-        ret = (<object>ctx).merge(
-            slice_to_bytes(key),
-            py_existing_value,
-            slice_to_bytes(value))
+    logger.Logger* log) nogil:
 
-        if ret[0]:
-            new_value.assign(bytes_to_string(ret[1]))
-            return True
-        return False
+    cdef uint64_t started = call_started()
+    cdef uint64_t acquired
+    cdef cpp_bool failed = False
 
-    except:
-        tb = traceback.format_exc()
-        logger.Log(log, "Error in merge_callback: %s", <bytes>tb)
-        return False
+    with gil:
+        acquired = call_acquired(started)
+        if existing_value == NULL:
+            py_existing_value = None
+        else:
+            py_existing_value = slice_to_bytes(deref(existing_value))
+
+        try:
+            ret = (<object>ctx).merge(
+                slice_to_bytes(key),
+                py_existing_value,
+                slice_to_bytes(value))
+
+            if ret[0]:
+                new_value.assign(bytes_to_string(ret[1]))
+                return True
+            return False
+
+        except:
+            failed = True
+            tb = traceback.format_exc()
+            logger.Log(log, "Error in merge_callback: %s", <bytes>tb)
+            return False
+        finally:
+            call_finished(CALL_MERGE, started, acquired, failed)
 
 cdef cpp_bool full_merge_callback(
     void* ctx,
@@ -381,28 +653,37 @@ cdef cpp_bool full_merge_callback(
     const Slice* existing_value,
     const deque[string]& op_list,
     string* new_value,
-    logger.Logger* log) with gil:
-
-    if existing_value == NULL:
-        py_existing_value = None
-    else:
-        py_existing_value = slice_to_bytes(deref(existing_value))
-
-    try:
-        ret = (<object>ctx).full_merge(
-            slice_to_bytes(key),
-            py_existing_value,
-            [string_to_bytes(op_list[i]) for i in range(op_list.size())])
+    logger.Logger* log) nogil:
 
-        if ret[0]:
-            new_value.assign(bytes_to_string(ret[1]))
-            return True
-        return False
+    cdef uint64_t started = call_started()
+    cdef uint64_t acquired
+    cdef cpp_bool failed = False
 
-    except:
-        tb = traceback.format_exc()
-        logger.Log(log, "Error in full_merge_callback: %s", <bytes>tb)
-        return False
+    with gil:
+        acquired = call_acquired(started)
+        if existing_value == NULL:
+            py_existing_value = None
+        else:
+            py_existing_value = slice_to_bytes(deref(existing_value))
+
+        try:
+            ret = (<object>ctx).full_merge(
+                slice_to_bytes(key),
+                py_existing_value,
+                [string_to_bytes(op_list[i]) for i in range(op_list.size())])
+
+            if ret[0]:
+                new_value.assign(bytes_to_string(ret[1]))
+                return True
+            return False
+
+        except:
+            failed = True
+            tb = traceback.format_exc()
+            logger.Log(log, "Error in full_merge_callback: %s", <bytes>tb)
+            return False
+        finally:
+            call_finished(CALL_FULL_MERGE, started, acquired, failed)
 
 cdef cpp_bool partial_merge_callback(
     void* ctx,
@@ -410,1019 +691,3865 @@ cdef cpp_bool partial_merge_callback(
     const Slice& left_op,
     const Slice& right_op,
     string* new_value,
-    logger.Logger* log) with gil:
+    logger.Logger* log) nogil:
+
+    cdef uint64_t started = call_started()
+    cdef uint64_t acquired
+    cdef cpp_bool failed = False
+
+    with gil:
+        acquired = call_acquired(started)
+        try:
+            ret = (<object>ctx).partial_merge(
+                slice_to_bytes(key),
+                slice_to_bytes(left_op),
+                slice_to_bytes(right_op))
+
+            if ret[0]:
+                new_value.assign(bytes_to_string(ret[1]))
+                return True
+            return False
+
+        except:
+            failed = True
+            tb = traceback.format_exc()
+            logger.Log(log, "Error in partial_merge_callback: %s", <bytes>tb)
+            return False
+        finally:
+            call_finished(CALL_PARTIAL_MERGE, started, acquired, failed)
 
-    try:
-        ret = (<object>ctx).partial_merge(
-            slice_to_bytes(key),
-            slice_to_bytes(left_op),
-            slice_to_bytes(right_op))
+@cython.internal
+cdef class PyNativeMergeOperator(PyMergeOperator):
+    cdef shared_ptr[merge_operator.AssociativeMergeOperator] merge_op
 
-        if ret[0]:
-            new_value.assign(bytes_to_string(ret[1]))
-            return True
-        return False
+    def name(self):
+        return PyBytes_FromString(self.merge_op.get().Name())
 
-    except:
-        tb = traceback.format_exc()
-        logger.Log(log, "Error in partial_merge_callback: %s", <bytes>tb)
-        return False
-##############################################
+    def merge(self, key, existing_value, value):
+        cdef string new_value
+        cdef Slice c_existing_value
+        cdef Slice* existing_value_ptr = NULL
+
+        if existing_value is not None:
+            c_existing_value = bytes_to_slice(existing_value)
+            existing_value_ptr = cython.address(c_existing_value)
+
+        if not self.merge_op.get().Merge(
+                bytes_to_slice(key),
+                existing_value_ptr,
+                bytes_to_slice(value),
+                cython.address(new_value),
+                NULL):
+            raise ValueError("Merge of %r failed" % (value,))
+
+        return string_to_bytes(new_value)
+
+    cdef object get_ob(self):
+        return self
+
+    cdef shared_ptr[merge_operator.MergeOperator] get_operator(self):
+        return <shared_ptr[merge_operator.MergeOperator]>(self.merge_op)
 
-#### Here comes the Cache stuff
 @cython.internal
-cdef class PyCache(object):
-    cdef shared_ptr[cache.Cache] get_cache(self):
-        return shared_ptr[cache.Cache]()
+cdef class PyUInt64AddOperator(PyNativeMergeOperator):
+    def __cinit__(self):
+        self.merge_op.reset(
+            <merge_operator.AssociativeMergeOperator*>
+                new merge_operator.UInt64AddOperator())
 
 @cython.internal
-cdef class PyLRUCache(PyCache):
-    cdef shared_ptr[cache.Cache] cache_ob
+cdef class PyStringAppendOperator(PyNativeMergeOperator):
+    def __cinit__(self, delim=b','):
+        self.merge_op.reset(
+            <merge_operator.AssociativeMergeOperator*>
+                new merge_operator.StringAppendOperator(bytes_to_string(delim)))
 
-    def __cinit__(self, capacity, shard_bits=None):
-        if shard_bits is not None:
-            self.cache_ob = cache.NewLRUCache(capacity, shard_bits)
-        else:
-            self.cache_ob = cache.NewLRUCache(capacity)
+@cython.internal
+cdef class PyMaxOperator(PyNativeMergeOperator):
+    def __cinit__(self):
+        self.merge_op.reset(
+            <merge_operator.AssociativeMergeOperator*>
+                new merge_operator.MaxOperator(False))
 
-    cdef shared_ptr[cache.Cache] get_cache(self):
-        return self.cache_ob
+@cython.internal
+cdef class PyMinOperator(PyNativeMergeOperator):
+    def __cinit__(self):
+        self.merge_op.reset(
+            <merge_operator.AssociativeMergeOperator*>
+                new merge_operator.MaxOperator(True))
 
-LRUCache = PyLRUCache
-###############################
+@cython.internal
+cdef class PyBoundedListAppendOperator(PyNativeMergeOperator):
+    def __cinit__(self, max_items, delim=b','):
+        if max_items < 1:
+            raise ValueError("max_items must be at least 1")
+
+        if len(delim) == 0:
+            raise ValueError("delim must not be empty")
+
+        self.merge_op.reset(
+            <merge_operator.AssociativeMergeOperator*>
+                new merge_operator.BoundedListAppendOperator(
+                    max_items,
+                    bytes_to_string(delim)))
+
+UInt64AddOperator = PyUInt64AddOperator
+StringAppendOperator = PyStringAppendOperator
+MaxOperator = PyMaxOperator
+MinOperator = PyMinOperator
+BoundedListAppendOperator = PyBoundedListAppendOperator
+##############################################
 
-### Here comes the stuff for SliceTransform
+## Here comes the stuff for the compaction filter
 @cython.internal
-cdef class PySliceTransform(object):
-    cdef shared_ptr[slice_transform.SliceTransform] transfomer
+cdef class PyCompactionFilter(object):
+    cdef object get_ob(self):
+        return None
+
+    cdef shared_ptr[compaction_filter.CompactionFilter] get_filter(self):
+        return shared_ptr[compaction_filter.CompactionFilter]()
+
+    cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
+        pass
+
+@cython.internal
+cdef class PyGenericCompactionFilter(PyCompactionFilter):
+    cdef shared_ptr[compaction_filter.CompactionFilter] filter_
     cdef object ob
 
     def __cinit__(self, object ob):
-        if not isinstance(ob, ISliceTransform):
-            raise TypeError("%s is not of type %s" % (ob, ISliceTransform))
+        if not isinstance(ob, ICompactionFilter):
+            raise TypeError("%s is not of type %s" % (ob, ICompactionFilter))
 
         self.ob = ob
-        self.transfomer.reset(
-            <slice_transform.SliceTransform*>
-                new slice_transform.SliceTransformWrapper(
+        self.filter_.reset(
+            <compaction_filter.CompactionFilter*>
+                new compaction_filter.CompactionFilterWrapper(
                     bytes_to_string(ob.name()),
                     <void*>ob,
-                    slice_transform_callback,
-                    slice_in_domain_callback,
-                    slice_in_range_callback))
+                    compaction_filter_callback,
+                    NULL))
 
     cdef object get_ob(self):
         return self.ob
 
-    cdef shared_ptr[slice_transform.SliceTransform] get_transformer(self):
-        return self.transfomer
+    cdef shared_ptr[compaction_filter.CompactionFilter] get_filter(self):
+        return self.filter_
 
     cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
-        cdef slice_transform.SliceTransformWrapper* ptr
-        ptr = <slice_transform.SliceTransformWrapper*> self.transfomer.get()
+        cdef compaction_filter.CompactionFilterWrapper* ptr
+        ptr = <compaction_filter.CompactionFilterWrapper*> self.filter_.get()
         ptr.set_info_log(info_log)
 
+@cython.internal
+cdef class PyNativeCompactionFilter(PyCompactionFilter):
+    cdef shared_ptr[compaction_filter.CompactionFilter] filter_
 
-cdef Slice slice_transform_callback(
-    void* ctx,
-    logger.Logger* log,
-    string& error_msg,
-    const Slice& src) with gil:
+    def name(self):
+        return PyBytes_FromString(self.filter_.get().Name())
 
-    cdef size_t offset
-    cdef size_t size
+    def filter(self, level, key, existing_value):
+        cdef string new_value
+        cdef cpp_bool value_changed = False
+        cdef cpp_bool remove
 
-    try:
-        ret = (<object>ctx).transform(slice_to_bytes(src))
-        offset = ret[0]
-        size = ret[1]
-        if (offset + size) > src.size():
-            msg = "offset(%i) + size(%i) is bigger than slice(%i)"
-            raise Exception(msg  % (offset, size, src.size()))
-
-        return Slice(src.data() + offset, size)
-    except BaseException as error:
-        tb = traceback.format_exc()
-        logger.Log(log, "Error in slice transfrom callback: %s", <bytes>tb)
-        error_msg.assign(<bytes>str(error))
+        remove = self.filter_.get().Filter(
+            level,
+            bytes_to_slice(key),
+            bytes_to_slice(existing_value),
+            cython.address(new_value),
+            cython.address(value_changed))
 
-cdef cpp_bool slice_in_domain_callback(
-    void* ctx,
-    logger.Logger* log,
-    string& error_msg,
-    const Slice& src) with gil:
+        if value_changed:
+            return (remove, string_to_bytes(new_value))
+        return (remove, None)
 
-    try:
-        return (<object>ctx).in_domain(slice_to_bytes(src))
-    except BaseException as error:
-        tb = traceback.format_exc()
-        logger.Log(log, "Error in slice transfrom callback: %s", <bytes>tb)
-        error_msg.assign(<bytes>str(error))
+    cdef object get_ob(self):
+        return self
 
-cdef cpp_bool slice_in_range_callback(
-    void* ctx,
-    logger.Logger* log,
-    string& error_msg,
-    const Slice& src) with gil:
+    cdef shared_ptr[compaction_filter.CompactionFilter] get_filter(self):
+        return self.filter_
 
-    try:
-        return (<object>ctx).in_range(slice_to_bytes(src))
-    except BaseException as error:
-        tb = traceback.format_exc()
-        logger.Log(log, "Error in slice transfrom callback: %s", <bytes>tb)
-        error_msg.assign(<bytes>str(error))
-###########################################
+@cython.internal
+cdef class PyTTLFilter(PyNativeCompactionFilter):
+    def __cinit__(self, int64_t ttl):
+        self.filter_.reset(
+            <compaction_filter.CompactionFilter*>
+                new compaction_filter.TTLFilter(ttl))
 
-## Here are the TableFactories
 @cython.internal
-cdef class PyTableFactory(object):
-    cdef shared_ptr[table_factory.TableFactory] factory
+cdef class PyPrefixDropFilter(PyNativeCompactionFilter):
+    def __cinit__(self, prefixes):
+        cdef vector[string] c_prefixes
 
-    cdef shared_ptr[table_factory.TableFactory] get_table_factory(self):
-        return self.factory
+        if isinstance(prefixes, bytes):
+            prefixes = [prefixes]
 
-    cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
-        pass
+        for prefix in prefixes:
+            c_prefixes.push_back(bytes_to_string(prefix))
 
-cdef class BlockBasedTableFactory(PyTableFactory):
-    cdef PyFilterPolicy py_filter_policy
+        self.filter_.reset(
+            <compaction_filter.CompactionFilter*>
+                new compaction_filter.PrefixDropFilter(c_prefixes))
 
-    def __init__(self,
-            index_type='binary_search',
-            py_bool hash_index_allow_collision=True,
-            checksum='crc32',
-            PyCache block_cache=None,
-            PyCache block_cache_compressed=None,
-            filter_policy=None,
-            no_block_cache=False,
-            block_size=None,
-            block_size_deviation=None,
-            block_restart_interval=None,
-            whole_key_filtering=None):
+TTLFilter = PyTTLFilter
+PrefixDropFilter = PyPrefixDropFilter
 
-        cdef table_factory.BlockBasedTableOptions table_options
+cdef cpp_bool compaction_filter_callback(
+    void* ctx,
+    logger.Logger* log,
+    int level,
+    const Slice& key,
+    const Slice& existing_value,
+    string* new_value,
+    cpp_bool* value_changed) nogil:
+
+    cdef uint64_t started = call_started()
+    cdef uint64_t acquired
+    cdef cpp_bool failed = False
+
+    with gil:
+        acquired = call_acquired(started)
+        try:
+            ret = (<object>ctx).filter(
+                level,
+                slice_to_bytes(key),
+                slice_to_bytes(existing_value))
+
+            if ret[1] is not None:
+                new_value.assign(bytes_to_string(ret[1]))
+                value_changed[0] = True
+            return ret[0]
+
+        except:
+            failed = True
+            # Keep the entry, nothing can be raised within a compaction.
+            tb = traceback.format_exc()
+            logger.Log(log, "Error in compaction filter callback: %s", <bytes>tb)
+            return False
+        finally:
+            call_finished(CALL_COMPACTION_FILTER, started, acquired, failed)
+
+cdef void compaction_filter_release_callback(void* ctx) with gil:
+    Py_DECREF(<object>ctx)
 
-        if index_type == 'binary_search':
-            table_options.index_type = table_factory.kBinarySearch
-        elif index_type == 'hash_search':
-            table_options.index_type = table_factory.kHashSearch
-        else:
-            raise ValueError("Unknown index_type: %s" % index_type)
+@cython.internal
+cdef class PyCompactionFilterFactory(object):
+    cdef shared_ptr[compaction_filter.CompactionFilterFactory] factory
+    cdef object ob
 
-        if hash_index_allow_collision:
-            table_options.hash_index_allow_collision = True
-        else:
-            table_options.hash_index_allow_collision = False
+    def __cinit__(self, object ob):
+        if not isinstance(ob, ICompactionFilterFactory):
+            msg = "%s is not of type %s"
+            raise TypeError(msg % (ob, ICompactionFilterFactory))
 
-        if checksum == 'crc32':
-            table_options.checksum = table_factory.kCRC32c
-        elif checksum == 'xxhash':
-            table_options.checksum = table_factory.kxxHash
-        else:
-            raise ValueError("Unknown checksum: %s" % checksum)
+        self.ob = ob
+        self.factory.reset(
+            <compaction_filter.CompactionFilterFactory*>
+                new compaction_filter.CompactionFilterFactoryWrapper(
+                    bytes_to_string(ob.name()),
+                    <void*>ob,
+                    create_compaction_filter_callback))
 
-        if no_block_cache:
-            table_options.no_block_cache = True
-        else:
-            table_options.no_block_cache = False
+    cdef object get_ob(self):
+        return self.ob
 
-        # If the following options are None use the rocksdb default.
-        if block_size is not None:
-            table_options.block_size = block_size
+    cdef shared_ptr[compaction_filter.CompactionFilterFactory] get_factory(self):
+        return self.factory
 
-        if block_size_deviation is not None:
-            table_options.block_size_deviation = block_size_deviation
+    cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
+        cdef compaction_filter.CompactionFilterFactoryWrapper* ptr
+        ptr = <compaction_filter.CompactionFilterFactoryWrapper*> self.factory.get()
+        ptr.set_info_log(info_log)
 
-        if block_restart_interval is not None:
-            table_options.block_restart_interval = block_restart_interval
+# Called once per compaction. The returned filter is owned by rocksdb,
+# for python filters it holds a reference to the python object.
+cdef compaction_filter.CompactionFilter* create_compaction_filter_callback(
+    void* ctx,
+    shared_ptr[logger.Logger] info_log,
+    cpp_bool is_full_compaction,
+    cpp_bool is_manual_compaction,
+    uint32_t column_family_id) nogil:
+
+    cdef compaction_filter.CompactionFilterWrapper* wrapper
+    cdef uint64_t started = call_started()
+    cdef uint64_t acquired
+    cdef cpp_bool failed = False
+
+    with gil:
+        acquired = call_acquired(started)
+        try:
+            ob = (<object>ctx).create_compaction_filter({
+                'is_full_compaction': is_full_compaction,
+                'is_manual_compaction': is_manual_compaction,
+                'column_family_id': column_family_id})
+
+            if ob is None:
+                return NULL
+
+            if isinstance(ob, PyNativeCompactionFilter):
+                return <compaction_filter.CompactionFilter*>(
+                    new compaction_filter.SharedCompactionFilter(
+                        (<PyNativeCompactionFilter>ob).get_filter()))
+
+            if not isinstance(ob, ICompactionFilter):
+                raise TypeError("%s is not of type %s" % (ob, ICompactionFilter))
+
+            wrapper = new compaction_filter.CompactionFilterWrapper(
+                bytes_to_string(ob.name()),
+                <void*>ob,
+                compaction_filter_callback,
+                compaction_filter_release_callback)
+            Py_INCREF(ob)
+
+            wrapper.set_info_log(info_log)
+            return <compaction_filter.CompactionFilter*>wrapper
+
+        except:
+            failed = True
+            tb = traceback.format_exc()
+            logger.Log(
+                info_log.get(),
+                "Error in create compaction filter callback: %s",
+                <bytes>tb)
+            return NULL
+        finally:
+            call_finished(CALL_CREATE_COMPACTION_FILTER, started, acquired, failed)
+##############################################
 
-        if whole_key_filtering is not None:
-            if whole_key_filtering:
-                table_options.whole_key_filtering = True
-            else:
-                table_options.whole_key_filtering = False
+#### Here comes the Cache stuff
+@cython.internal
+cdef class PyCache(object):
+    # One cache object can be shared by several databases and be used as
+    # block_cache and row_cache at the same time. The usage reported
+    # covers all of them.
+    cdef shared_ptr[cache.Cache] cache_ob
 
-        if block_cache is not None:
-            table_options.block_cache = block_cache.get_cache()
+    cdef shared_ptr[cache.Cache] get_cache(self):
+        return self.cache_ob
 
-        if block_cache_compressed is not None:
-            table_options.block_cache_compressed = block_cache_compressed.get_cache()
+    def get_usage(self):
+        return self.cache_ob.get().GetUsage()
 
-        # Set the filter_policy
-        self.py_filter_policy = None
-        if filter_policy is not None:
-            if isinstance(filter_policy, PyFilterPolicy):
-                if (<PyFilterPolicy?>filter_policy).get_policy().get() == NULL:
-                    raise Exception("Cannot set filter policy: %s" % filter_policy)
-                self.py_filter_policy = filter_policy
-            else:
-                self.py_filter_policy = PyGenericFilterPolicy(filter_policy)
+    def get_pinned_usage(self):
+        return self.cache_ob.get().GetPinnedUsage()
 
-            table_options.filter_policy = self.py_filter_policy.get_policy()
+    def get_capacity(self):
+        return self.cache_ob.get().GetCapacity()
 
-        self.factory.reset(table_factory.NewBlockBasedTableFactory(table_options))
+    def set_capacity(self, size_t capacity):
+        # Shrinking evicts entries, which takes a while for big caches.
+        with nogil:
+            self.cache_ob.get().SetCapacity(capacity)
 
-    cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
-        if self.py_filter_policy is not None:
-            self.py_filter_policy.set_info_log(info_log)
+    property strict_capacity_limit:
+        def __get__(self):
+            return self.cache_ob.get().HasStrictCapacityLimit()
 
-cdef class PlainTableFactory(PyTableFactory):
-    def __init__(
+        def __set__(self, value):
+            self.cache_ob.get().SetStrictCapacityLimit(value)
+
+    def erase_unreferenced(self):
+        with nogil:
+            self.cache_ob.get().EraseUnRefEntries()
+
+    property name:
+        def __get__(self):
+            return self.cache_ob.get().Name().decode('ascii')
+
+@cython.internal
+cdef class PyLRUCache(PyCache):
+    def __cinit__(
             self,
-            user_key_len=0,
-            bloom_bits_per_key=10,
-            hash_table_ratio=0.75,
-            index_sparseness=10,
-            huge_page_tlb_size=0,
-            encoding_type='plain',
-            py_bool full_scan_mode=False,
-            py_bool store_index_in_file=False):
+            size_t capacity,
+            shard_bits=None,
+            strict_capacity_limit=False,
+            double high_pri_pool_ratio=0.5):
 
-        cdef table_factory.PlainTableOptions table_options
+        if shard_bits is None:
+            shard_bits = -1
 
-        table_options.user_key_len = user_key_len
-        table_options.bloom_bits_per_key = bloom_bits_per_key
-        table_options.hash_table_ratio = hash_table_ratio
-        table_options.index_sparseness = index_sparseness
-        table_options.huge_page_tlb_size = huge_page_tlb_size
+        self.cache_ob = cache.NewLRUCache(
+            capacity,
+            shard_bits,
+            strict_capacity_limit,
+            high_pri_pool_ratio)
 
-        if encoding_type == 'plain':
-            table_options.encoding_type = table_factory.kPlain
-        elif encoding_type == 'prefix':
-            table_options.encoding_type = table_factory.kPrefix
-        else:
-            raise ValueError("Unknown encoding_type: %s" % encoding_type)
+@cython.internal
+cdef class PyHyperClockCache(PyCache):
+    def __cinit__(
+            self,
+            size_t capacity,
+            size_t estimated_entry_charge=0,
+            shard_bits=None,
+            strict_capacity_limit=False):
 
-        table_options.full_scan_mode = full_scan_mode
-        table_options.store_index_in_file = store_index_in_file
+        if shard_bits is None:
+            shard_bits = -1
 
-        self.factory.reset( table_factory.NewPlainTableFactory(table_options))
-#############################################
+        cdef cache.HyperClockCacheOptions* opts = new cache.HyperClockCacheOptions(
+            capacity,
+            estimated_entry_charge,
+            shard_bits,
+            strict_capacity_limit)
+
+        try:
+            self.cache_ob = opts.MakeSharedCache()
+        finally:
+            del opts
 
-### Here are the MemtableFactories
 @cython.internal
-cdef class PyMemtableFactory(object):
-    cdef shared_ptr[memtablerep.MemTableRepFactory] factory
+cdef class PyClockCache(PyCache):
+    def __cinit__(self, *args, **kwargs):
+        raise_removed('ClockCache', 'use HyperClockCache instead')
 
-    cdef shared_ptr[memtablerep.MemTableRepFactory] get_memtable_factory(self):
-        return self.factory
+LRUCache = PyLRUCache
+ClockCache = PyClockCache
+HyperClockCache = PyHyperClockCache
+###############################
 
-cdef class SkipListMemtableFactory(PyMemtableFactory):
-    def __init__(self):
-        self.factory.reset(memtablerep.NewSkipListFactory())
+## Here comes the WriteBufferManager stuff
+@cython.internal
+cdef class PyWriteBufferManager(object):
+    # Several databases sharing one manager share one memtable budget.
+    # With a cache the memtable memory is charged to it as well, so the
+    # capacity of the cache bounds both.
+    cdef shared_ptr[write_buffer_manager.WriteBufferManager] manager
+    cdef PyCache py_cache
+
+    def __cinit__(self, size_t total_bytes, cache=None):
+        if cache is not None and not isinstance(cache, PyCache):
+            raise Exception("cache must be a Cache object")
+
+        self.py_cache = cache
+        self.manager.reset(self.new_manager(total_bytes))
+
+    cdef write_buffer_manager.WriteBufferManager* new_manager(self, size_t total_bytes):
+        cdef shared_ptr[cache.Cache] c_cache
+        if self.py_cache is not None:
+            c_cache = self.py_cache.get_cache()
+        return new write_buffer_manager.WriteBufferManager(total_bytes, c_cache)
+
+    cdef shared_ptr[write_buffer_manager.WriteBufferManager] get_manager(self):
+        return self.manager
+
+    property cache:
+        def __get__(self):
+            return self.py_cache
 
-cdef class VectorMemtableFactory(PyMemtableFactory):
-    def __init__(self, count=0):
-        self.factory.reset(memtablerep.NewVectorRepFactory(count))
+    def memory_usage(self):
+        return self.manager.get().memory_usage()
 
-cdef class HashSkipListMemtableFactory(PyMemtableFactory):
-    def __init__(
-            self,
-            bucket_count=1000000,
-            skiplist_height=4,
-            skiplist_branching_factor=4):
+    def mutable_memtable_memory_usage(self):
+        return self.manager.get().mutable_memtable_memory_usage()
 
-        self.factory.reset(
-            memtablerep.NewHashSkipListRepFactory(
-                bucket_count,
-                skiplist_height,
-                skiplist_branching_factor))
+    def buffer_size(self):
+        return self.manager.get().buffer_size()
 
-cdef class HashLinkListMemtableFactory(PyMemtableFactory):
-    def __init__(self, bucket_count=50000):
-        self.factory.reset(memtablerep.NewHashLinkListRepFactory(bucket_count))
-##################################
+    def set_buffer_size(self, size_t total_bytes):
+        self.manager.get().SetBufferSize(total_bytes)
 
-cdef class CompressionType(object):
-    no_compression = u'no_compression'
-    snappy_compression = u'snappy_compression'
-    zlib_compression = u'zlib_compression'
-    bzip2_compression = u'bzip2_compression'
-    lz4_compression = u'lz4_compression'
-    lz4hc_compression = u'lz4hc_compression'
+    def enabled(self):
+        return self.manager.get().enabled()
 
-cdef class Options(object):
-    cdef options.Options* opts
-    cdef PyComparator py_comparator
-    cdef PyMergeOperator py_merge_operator
-    cdef PySliceTransform py_prefix_extractor
-    cdef PyTableFactory py_table_factory
-    cdef PyMemtableFactory py_memtable_factory
-    cdef PyCache py_row_cache
+    def cost_to_cache(self):
+        return self.manager.get().cost_to_cache()
 
-    # Used to protect sharing of Options with many DB-objects
-    cdef cpp_bool in_use
+WriteBufferManager = PyWriteBufferManager
+###############################
 
-    def __cinit__(self):
-        self.opts = NULL
-        self.opts = new options.Options()
-        self.in_use = False
+#### Here comes the Statistics stuff
+cdef counters_to_dict(const statistics.counter_list& counters):
+    cdef size_t i
+    cdef dict ret = {}
 
-    def __dealloc__(self):
-        if not self.opts == NULL:
-            del self.opts
+    for i in range(counters.size()):
+        name = PyUnicode_Decode(
+            counters[i].first.c_str(),
+            counters[i].first.size(),
+            "ascii",
+            "strict")
+        ret[name] = counters[i].second
+    return ret
 
-    def __init__(self, **kwargs):
-        self.py_comparator = BytewiseComparator()
-        self.py_merge_operator = None
-        self.py_prefix_extractor = None
-        self.py_table_factory = None
-        self.py_memtable_factory = None
-        self.py_row_cache = None
+@cython.internal
+cdef class PyStatistics(object):
+    cdef shared_ptr[statistics.Statistics] stats
 
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+    def __cinit__(self, level='except_detailed_timers'):
+        self.stats = statistics.CreateDBStatistics()
+        self.level = level
 
-    property create_if_missing:
+    property level:
         def __get__(self):
-            return self.opts.create_if_missing
-        def __set__(self, value):
-            self.opts.create_if_missing = value
+            cdef statistics.StatsLevel level = self.stats.get().get_stats_level()
+
+            if level == statistics.kExceptHistogramOrTimers:
+                return 'except_histogram_or_timers'
+            if level == statistics.kExceptTimers:
+                return 'except_timers'
+            if level == statistics.kExceptDetailedTimers:
+                return 'except_detailed_timers'
+            if level == statistics.kExceptTimeForMutex:
+                return 'except_time_for_mutex'
+            if level == statistics.kAll:
+                return 'all'
+            raise Exception("Unknown statistics level")
 
-    property error_if_exists:
-        def __get__(self):
-            return self.opts.error_if_exists
         def __set__(self, value):
-            self.opts.error_if_exists = value
+            if value == 'except_histogram_or_timers':
+                self.stats.get().set_stats_level(statistics.kExceptHistogramOrTimers)
+            elif value == 'except_timers':
+                self.stats.get().set_stats_level(statistics.kExceptTimers)
+            elif value == 'except_detailed_timers':
+                self.stats.get().set_stats_level(statistics.kExceptDetailedTimers)
+            elif value == 'except_time_for_mutex':
+                self.stats.get().set_stats_level(statistics.kExceptTimeForMutex)
+            elif value == 'all':
+                self.stats.get().set_stats_level(statistics.kAll)
+            else:
+                raise Exception("Unknown statistics level: %s" % value)
 
-    property paranoid_checks:
-        def __get__(self):
-            return self.opts.paranoid_checks
-        def __set__(self, value):
-            self.opts.paranoid_checks = value
+    def tickers(self):
+        cdef statistics.counter_list tickers
 
-    property write_buffer_size:
-        def __get__(self):
-            return self.opts.write_buffer_size
-        def __set__(self, value):
-            self.opts.write_buffer_size = value
+        with nogil:
+            statistics.get_tickers(self.stats.get(), cython.address(tickers))
 
-    property max_write_buffer_number:
-        def __get__(self):
-            return self.opts.max_write_buffer_number
-        def __set__(self, value):
-            self.opts.max_write_buffer_number = value
+        return counters_to_dict(tickers)
 
-    property min_write_buffer_number_to_merge:
-        def __get__(self):
-            return self.opts.min_write_buffer_number_to_merge
-        def __set__(self, value):
-            self.opts.min_write_buffer_number_to_merge = value
+    def histograms(self):
+        cdef statistics.histogram_list histograms
+        cdef size_t i
+        cdef dict ret = {}
 
-    property max_open_files:
-        def __get__(self):
-            return self.opts.max_open_files
-        def __set__(self, value):
-            self.opts.max_open_files = value
+        with nogil:
+            statistics.get_histograms(
+                self.stats.get(),
+                cython.address(histograms))
+
+        for i in range(histograms.size()):
+            name = PyUnicode_Decode(
+                histograms[i].first.c_str(),
+                histograms[i].first.size(),
+                "ascii",
+                "strict")
+
+            ret[name] = {
+                'count': histograms[i].second.count,
+                'sum': histograms[i].second.sum,
+                'min': histograms[i].second.min,
+                'max': histograms[i].second.max,
+                'average': histograms[i].second.average,
+                'median': histograms[i].second.median,
+                'percentile95': histograms[i].second.percentile95,
+                'percentile99': histograms[i].second.percentile99,
+                'standard_deviation': histograms[i].second.standard_deviation
+            }
 
-    property compression:
-        def __get__(self):
-            if self.opts.compression == options.kNoCompression:
-                return CompressionType.no_compression
-            elif self.opts.compression  == options.kSnappyCompression:
-                return CompressionType.snappy_compression
-            elif self.opts.compression == options.kZlibCompression:
-                return CompressionType.zlib_compression
-            elif self.opts.compression == options.kBZip2Compression:
-                return CompressionType.bzip2_compression
-            elif self.opts.compression == options.kLZ4Compression:
-                return CompressionType.lz4_compression
-            elif self.opts.compression == options.kLZ4HCCompression:
-                return CompressionType.lz4hc_compression
-            else:
-                raise Exception("Unknonw type: %s" % self.opts.compression)
-
-        def __set__(self, value):
-            if value == CompressionType.no_compression:
-                self.opts.compression = options.kNoCompression
-            elif value == CompressionType.snappy_compression:
-                self.opts.compression = options.kSnappyCompression
-            elif value == CompressionType.zlib_compression:
-                self.opts.compression = options.kZlibCompression
-            elif value == CompressionType.bzip2_compression:
-                self.opts.compression = options.kBZip2Compression
-            elif value == CompressionType.lz4_compression:
-                self.opts.compression = options.kLZ4Compression
-            elif value == CompressionType.lz4hc_compression:
-                self.opts.compression = options.kLZ4HCCompression
-            else:
-                raise TypeError("Unknown compression: %s" % value)
+        return ret
 
-    property num_levels:
-        def __get__(self):
-            return self.opts.num_levels
-        def __set__(self, value):
-            self.opts.num_levels = value
+    def snapshot(self):
+        return {
+            'tickers': self.tickers(),
+            'histograms': self.histograms()
+        }
 
-    property level0_file_num_compaction_trigger:
-        def __get__(self):
-            return self.opts.level0_file_num_compaction_trigger
-        def __set__(self, value):
-            self.opts.level0_file_num_compaction_trigger = value
+    def delta(self, snapshot):
+        # Percentiles can't be subtracted, only count and sum of the
+        # histograms are part of the delta.
+        current = self.snapshot()
 
-    property level0_slowdown_writes_trigger:
-        def __get__(self):
-            return self.opts.level0_slowdown_writes_trigger
-        def __set__(self, value):
-            self.opts.level0_slowdown_writes_trigger = value
+        tickers = {}
+        for name, value in current['tickers'].items():
+            tickers[name] = value - snapshot['tickers'].get(name, 0)
 
-    property level0_stop_writes_trigger:
-        def __get__(self):
-            return self.opts.level0_stop_writes_trigger
-        def __set__(self, value):
-            self.opts.level0_stop_writes_trigger = value
+        histograms = {}
+        for name, value in current['histograms'].items():
+            old = snapshot['histograms'].get(name, {'count': 0, 'sum': 0})
+            histograms[name] = {
+                'count': value['count'] - old['count'],
+                'sum': value['sum'] - old['sum']
+            }
 
-    property max_mem_compaction_level:
-        def __get__(self):
-            return self.opts.max_mem_compaction_level
-        def __set__(self, value):
-            self.opts.max_mem_compaction_level = value
+        return {'tickers': tickers, 'histograms': histograms}
 
-    property target_file_size_base:
-        def __get__(self):
-            return self.opts.target_file_size_base
-        def __set__(self, value):
-            self.opts.target_file_size_base = value
+    def reset(self):
+        check_status(self.stats.get().Reset())
 
-    property target_file_size_multiplier:
-        def __get__(self):
-            return self.opts.target_file_size_multiplier
-        def __set__(self, value):
-            self.opts.target_file_size_multiplier = value
+    def __str__(self):
+        return string_to_bytes(self.stats.get().ToString()).decode('ascii')
 
-    property max_bytes_for_level_base:
-        def __get__(self):
-            return self.opts.max_bytes_for_level_base
-        def __set__(self, value):
-            self.opts.max_bytes_for_level_base = value
+    cdef shared_ptr[statistics.Statistics] get_statistics(self):
+        return self.stats
 
-    property max_bytes_for_level_multiplier:
-        def __get__(self):
-            return self.opts.max_bytes_for_level_multiplier
-        def __set__(self, value):
-            self.opts.max_bytes_for_level_multiplier = value
+Statistics = PyStatistics
 
-    property max_bytes_for_level_multiplier_additional:
-        def __get__(self):
-            return self.opts.max_bytes_for_level_multiplier_additional
-        def __set__(self, value):
-            self.opts.max_bytes_for_level_multiplier_additional = value
 
-    property expanded_compaction_factor:
-        def __get__(self):
-            return self.opts.expanded_compaction_factor
-        def __set__(self, value):
-            self.opts.expanded_compaction_factor = value
+@cython.internal
+cdef class PyPerfContext(object):
+    cdef statistics.PerfLevel level
+    cdef statistics.PerfLevel previous_level
+    cdef dict perf_counters
+    cdef dict iostats_counters
+
+    def __cinit__(self, level='enable_time_except_for_mutex'):
+        if level == 'enable_count':
+            self.level = statistics.kEnableCount
+        elif level == 'enable_time_except_for_mutex':
+            self.level = statistics.kEnableTimeExceptForMutex
+        elif level == 'enable_time':
+            self.level = statistics.kEnableTime
+        else:
+            raise Exception("Unknown perf level: %s" % level)
 
-    property source_compaction_factor:
-        def __get__(self):
-            return self.opts.source_compaction_factor
-        def __set__(self, value):
-            self.opts.source_compaction_factor = value
+        self.perf_counters = {}
+        self.iostats_counters = {}
 
-    property max_grandparent_overlap_factor:
-        def __get__(self):
-            return self.opts.max_grandparent_overlap_factor
-        def __set__(self, value):
-            self.opts.max_grandparent_overlap_factor = value
+    def __enter__(self):
+        self.previous_level = statistics.GetPerfLevel()
+        statistics.reset_perf_context()
+        statistics.SetPerfLevel(self.level)
+        return self
 
-    property disable_data_sync:
-        def __get__(self):
-            return self.opts.disableDataSync
-        def __set__(self, value):
-            self.opts.disableDataSync = value
+    def __exit__(self, exc_type, exc_value, traceback):
+        cdef statistics.counter_list perf
+        cdef statistics.counter_list iostats
 
-    property use_fsync:
-        def __get__(self):
-            return self.opts.use_fsync
-        def __set__(self, value):
-            self.opts.use_fsync = value
+        statistics.get_perf_context(cython.address(perf))
+        statistics.get_iostats_context(cython.address(iostats))
+        statistics.SetPerfLevel(self.previous_level)
 
-    property db_log_dir:
-        def __get__(self):
-            return string_to_path(self.opts.db_log_dir)
-        def __set__(self, value):
-            self.opts.db_log_dir = path_to_string(value)
+        self.perf_counters = counters_to_dict(perf)
+        self.iostats_counters = counters_to_dict(iostats)
 
-    property wal_dir:
+    property perf:
         def __get__(self):
-            return string_to_path(self.opts.wal_dir)
-        def __set__(self, value):
-            self.opts.wal_dir = path_to_string(value)
+            return self.perf_counters
 
-    property delete_obsolete_files_period_micros:
+    property iostats:
+        def __get__(self):
+            return self.iostats_counters
+
+PerfContext = PyPerfContext
+###############################
+
+### Here comes the stuff for SliceTransform
+@cython.internal
+cdef class PySliceTransform(object):
+    cdef object get_ob(self):
+        return None
+
+    cdef shared_ptr[slice_transform.SliceTransform] get_transformer(self):
+        return shared_ptr[slice_transform.SliceTransform]()
+
+    cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
+        pass
+
+@cython.internal
+cdef class PyGenericSliceTransform(PySliceTransform):
+    cdef shared_ptr[slice_transform.SliceTransform] transfomer
+    cdef object ob
+
+    def __cinit__(self, object ob):
+        if not isinstance(ob, ISliceTransform):
+            raise TypeError("%s is not of type %s" % (ob, ISliceTransform))
+
+        self.ob = ob
+        self.transfomer.reset(
+            <slice_transform.SliceTransform*>
+                new slice_transform.SliceTransformWrapper(
+                    bytes_to_string(ob.name()),
+                    <void*>ob,
+                    slice_transform_callback,
+                    slice_in_domain_callback,
+                    slice_in_range_callback))
+
+    cdef object get_ob(self):
+        return self.ob
+
+    cdef shared_ptr[slice_transform.SliceTransform] get_transformer(self):
+        return self.transfomer
+
+    cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
+        cdef slice_transform.SliceTransformWrapper* ptr
+        ptr = <slice_transform.SliceTransformWrapper*> self.transfomer.get()
+        ptr.set_info_log(info_log)
+
+
+cdef Slice slice_transform_callback(
+    void* ctx,
+    logger.Logger* log,
+    string& error_msg,
+    const Slice& src) nogil:
+
+    cdef size_t offset
+    cdef size_t size
+    cdef uint64_t started = call_started()
+    cdef uint64_t acquired
+    cdef cpp_bool failed = False
+
+    with gil:
+        acquired = call_acquired(started)
+        try:
+            ret = (<object>ctx).transform(slice_to_bytes(src))
+            offset = ret[0]
+            size = ret[1]
+            if (offset + size) > src.size():
+                msg = "offset(%i) + size(%i) is bigger than slice(%i)"
+                raise Exception(msg  % (offset, size, src.size()))
+
+            return Slice(src.data() + offset, size)
+        except BaseException as error:
+            failed = True
+            tb = traceback.format_exc()
+            logger.Log(log, "Error in slice transfrom callback: %s", <bytes>tb)
+            error_msg.assign(<bytes>str(error))
+        finally:
+            call_finished(CALL_SLICE_TRANSFORM, started, acquired, failed)
+
+cdef cpp_bool slice_in_domain_callback(
+    void* ctx,
+    logger.Logger* log,
+    string& error_msg,
+    const Slice& src) nogil:
+
+    cdef uint64_t started = call_started()
+    cdef uint64_t acquired
+    cdef cpp_bool failed = False
+
+    with gil:
+        acquired = call_acquired(started)
+        try:
+            return (<object>ctx).in_domain(slice_to_bytes(src))
+        except BaseException as error:
+            failed = True
+            tb = traceback.format_exc()
+            logger.Log(log, "Error in slice transfrom callback: %s", <bytes>tb)
+            error_msg.assign(<bytes>str(error))
+        finally:
+            call_finished(CALL_SLICE_IN_DOMAIN, started, acquired, failed)
+
+cdef cpp_bool slice_in_range_callback(
+    void* ctx,
+    logger.Logger* log,
+    string& error_msg,
+    const Slice& src) nogil:
+
+    cdef uint64_t started = call_started()
+    cdef uint64_t acquired
+    cdef cpp_bool failed = False
+
+    with gil:
+        acquired = call_acquired(started)
+        try:
+            return (<object>ctx).in_range(slice_to_bytes(src))
+        except BaseException as error:
+            failed = True
+            tb = traceback.format_exc()
+            logger.Log(log, "Error in slice transfrom callback: %s", <bytes>tb)
+            error_msg.assign(<bytes>str(error))
+        finally:
+            call_finished(CALL_SLICE_IN_RANGE, started, acquired, failed)
+
+@cython.internal
+cdef class PyNativeSliceTransform(PySliceTransform):
+    cdef shared_ptr[slice_transform.SliceTransform] transfomer
+
+    def name(self):
+        return PyBytes_FromString(self.transfomer.get().Name())
+
+    def transform(self, src):
+        cdef Slice c_src = bytes_to_slice(src)
+        cdef Slice dst
+
+        if not self.transfomer.get().InDomain(c_src):
+            raise ValueError("%r is not in the domain of %s" % (src, self.name()))
+
+        dst = self.transfomer.get().Transform(c_src)
+        return (dst.data() - c_src.data(), dst.size())
+
+    def in_domain(self, src):
+        return self.transfomer.get().InDomain(bytes_to_slice(src))
+
+    def in_range(self, dst):
+        return self.transfomer.get().InRange(bytes_to_slice(dst))
+
+    cdef object get_ob(self):
+        return self
+
+    cdef shared_ptr[slice_transform.SliceTransform] get_transformer(self):
+        return self.transfomer
+
+@cython.internal
+cdef class PyFixedPrefixTransform(PyNativeSliceTransform):
+    def __cinit__(self, size_t prefix_len):
+        self.transfomer.reset(
+            <slice_transform.SliceTransform*>
+                slice_transform.NewFixedPrefixTransform(prefix_len))
+
+@cython.internal
+cdef class PyCappedPrefixTransform(PyNativeSliceTransform):
+    def __cinit__(self, size_t cap_len):
+        self.transfomer.reset(
+            <slice_transform.SliceTransform*>
+                slice_transform.NewCappedPrefixTransform(cap_len))
+
+@cython.internal
+cdef class PyNoopTransform(PyNativeSliceTransform):
+    def __cinit__(self):
+        self.transfomer.reset(
+            <slice_transform.SliceTransform*>
+                slice_transform.NewNoopTransform())
+
+FixedPrefixTransform = PyFixedPrefixTransform
+CappedPrefixTransform = PyCappedPrefixTransform
+NoopTransform = PyNoopTransform
+###########################################
+
+## Here are the TableFactories
+@cython.internal
+cdef class PyTableFactory(object):
+    cdef shared_ptr[table_factory.TableFactory] factory
+
+    cdef shared_ptr[table_factory.TableFactory] get_table_factory(self):
+        return self.factory
+
+    cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
+        pass
+
+cdef class BlockBasedTableFactory(PyTableFactory):
+    cdef PyFilterPolicy py_filter_policy
+
+    def __init__(self,
+            index_type='binary_search',
+            py_bool hash_index_allow_collision=True,
+            checksum='crc32',
+            PyCache block_cache=None,
+            PyCache block_cache_compressed=None,
+            filter_policy=None,
+            no_block_cache=False,
+            block_size=None,
+            block_size_deviation=None,
+            block_restart_interval=None,
+            whole_key_filtering=None,
+            cache_index_and_filter_blocks=None,
+            cache_index_and_filter_blocks_with_high_priority=None,
+            pin_l0_filter_and_index_blocks_in_cache=None,
+            pin_top_level_index_and_filter=None,
+            partition_filters=None,
+            metadata_block_size=None,
+            format_version=None,
+            data_block_index_type='binary_search',
+            data_block_hash_table_util_ratio=None):
+
+        cdef table_factory.BlockBasedTableOptions table_options
+
+        if index_type == 'binary_search':
+            table_options.index_type = table_factory.kBinarySearch
+        elif index_type == 'hash_search':
+            table_options.index_type = table_factory.kHashSearch
+        elif index_type == 'two_level_index_search':
+            table_options.index_type = table_factory.kTwoLevelIndexSearch
+        else:
+            raise ValueError("Unknown index_type: %s" % index_type)
+
+        if data_block_index_type == 'binary_search':
+            table_options.data_block_index_type = table_factory.kDataBlockBinarySearch
+        elif data_block_index_type == 'binary_and_hash':
+            table_options.data_block_index_type = table_factory.kDataBlockBinaryAndHash
+        else:
+            raise ValueError("Unknown data_block_index_type: %s" % data_block_index_type)
+
+        # RocksDB always allows collisions now.
+        if not hash_index_allow_collision:
+            raise_removed('hash_index_allow_collision=False')
+
+        if checksum == 'crc32':
+            table_options.checksum = table_factory.kCRC32c
+        elif checksum == 'xxhash':
+            table_options.checksum = table_factory.kxxHash
+        else:
+            raise ValueError("Unknown checksum: %s" % checksum)
+
+        if no_block_cache:
+            table_options.no_block_cache = True
+        else:
+            table_options.no_block_cache = False
+
+        # If the following options are None use the rocksdb default.
+        if block_size is not None:
+            table_options.block_size = block_size
+
+        if block_size_deviation is not None:
+            table_options.block_size_deviation = block_size_deviation
+
+        if block_restart_interval is not None:
+            table_options.block_restart_interval = block_restart_interval
+
+        if whole_key_filtering is not None:
+            if whole_key_filtering:
+                table_options.whole_key_filtering = True
+            else:
+                table_options.whole_key_filtering = False
+
+        if cache_index_and_filter_blocks is not None:
+            table_options.cache_index_and_filter_blocks = bool(
+                cache_index_and_filter_blocks)
+
+        if cache_index_and_filter_blocks_with_high_priority is not None:
+            table_options.cache_index_and_filter_blocks_with_high_priority = bool(
+                cache_index_and_filter_blocks_with_high_priority)
+
+        if pin_l0_filter_and_index_blocks_in_cache is not None:
+            table_options.pin_l0_filter_and_index_blocks_in_cache = bool(
+                pin_l0_filter_and_index_blocks_in_cache)
+
+        if pin_top_level_index_and_filter is not None:
+            table_options.pin_top_level_index_and_filter = bool(
+                pin_top_level_index_and_filter)
+
+        if partition_filters is not None:
+            # rocksdb silently ignores this flag for the other index types.
+            if partition_filters and index_type != 'two_level_index_search':
+                raise ValueError(
+                    "partition_filters requires index_type='two_level_index_search'")
+            table_options.partition_filters = bool(partition_filters)
+
+        if metadata_block_size is not None:
+            table_options.metadata_block_size = metadata_block_size
+
+        if format_version is not None:
+            table_options.format_version = format_version
+
+        if data_block_hash_table_util_ratio is not None:
+            table_options.data_block_hash_table_util_ratio = data_block_hash_table_util_ratio
+
+        if block_cache is not None:
+            table_options.block_cache = block_cache.get_cache()
+
+        if block_cache_compressed is not None:
+            raise_removed('block_cache_compressed')
+
+        # Set the filter_policy
+        self.py_filter_policy = None
+        if filter_policy is not None:
+            # Since rocksdb 7.0 filters can't be implemented outside of
+            # rocksdb anymore, only the builtin policies are accepted.
+            if isinstance(filter_policy, IFilterPolicy):
+                raise_removed(
+                    'Implementing a FilterPolicy in python',
+                    'use BloomFilterPolicy or RibbonFilterPolicy instead')
+            if not isinstance(filter_policy, PyFilterPolicy):
+                raise TypeError("%s is not a builtin filter policy" % (filter_policy,))
+            if (<PyFilterPolicy?>filter_policy).get_policy().get() == NULL:
+                raise Exception("Cannot set filter policy: %s" % filter_policy)
+            self.py_filter_policy = filter_policy
+
+            table_options.filter_policy = self.py_filter_policy.get_policy()
+
+        self.factory.reset(table_factory.NewBlockBasedTableFactory(table_options))
+
+    cdef set_info_log(self, shared_ptr[logger.Logger] info_log):
+        if self.py_filter_policy is not None:
+            self.py_filter_policy.set_info_log(info_log)
+
+cdef class PlainTableFactory(PyTableFactory):
+    def __init__(
+            self,
+            user_key_len=0,
+            bloom_bits_per_key=10,
+            hash_table_ratio=0.75,
+            index_sparseness=10,
+            huge_page_tlb_size=0,
+            encoding_type='plain',
+            py_bool full_scan_mode=False,
+            py_bool store_index_in_file=False):
+
+        cdef table_factory.PlainTableOptions table_options
+
+        table_options.user_key_len = user_key_len
+        table_options.bloom_bits_per_key = bloom_bits_per_key
+        table_options.hash_table_ratio = hash_table_ratio
+        table_options.index_sparseness = index_sparseness
+        table_options.huge_page_tlb_size = huge_page_tlb_size
+
+        if encoding_type == 'plain':
+            table_options.encoding_type = table_factory.kPlain
+        elif encoding_type == 'prefix':
+            table_options.encoding_type = table_factory.kPrefix
+        else:
+            raise ValueError("Unknown encoding_type: %s" % encoding_type)
+
+        table_options.full_scan_mode = full_scan_mode
+        table_options.store_index_in_file = store_index_in_file
+
+        self.factory.reset( table_factory.NewPlainTableFactory(table_options))
+#############################################
+
+### Here are the MemtableFactories
+@cython.internal
+cdef class PyMemtableFactory(object):
+    cdef shared_ptr[memtablerep.MemTableRepFactory] factory
+
+    cdef shared_ptr[memtablerep.MemTableRepFactory] get_memtable_factory(self):
+        return self.factory
+
+cdef class SkipListMemtableFactory(PyMemtableFactory):
+    def __init__(self):
+        self.factory.reset(memtablerep.NewSkipListFactory())
+
+cdef class VectorMemtableFactory(PyMemtableFactory):
+    def __init__(self, count=0):
+        self.factory.reset(memtablerep.NewVectorRepFactory(count))
+
+cdef class HashSkipListMemtableFactory(PyMemtableFactory):
+    def __init__(
+            self,
+            bucket_count=1000000,
+            skiplist_height=4,
+            skiplist_branching_factor=4):
+
+        self.factory.reset(
+            memtablerep.NewHashSkipListRepFactory(
+                bucket_count,
+                skiplist_height,
+                skiplist_branching_factor))
+
+cdef class HashLinkListMemtableFactory(PyMemtableFactory):
+    def __init__(self, bucket_count=50000):
+        self.factory.reset(memtablerep.NewHashLinkListRepFactory(bucket_count))
+##################################
+
+cdef class CompressionType(object):
+    no_compression = u'no_compression'
+    snappy_compression = u'snappy_compression'
+    zlib_compression = u'zlib_compression'
+    bzip2_compression = u'bzip2_compression'
+    lz4_compression = u'lz4_compression'
+    lz4hc_compression = u'lz4hc_compression'
+    xpress_compression = u'xpress_compression'
+    zstd_compression = u'zstd_compression'
+    disable_compression_option = u'disable_compression_option'
+
+cdef object compression_to_python(options.CompressionType value):
+    if value == options.kNoCompression:
+        return CompressionType.no_compression
+    elif value == options.kSnappyCompression:
+        return CompressionType.snappy_compression
+    elif value == options.kZlibCompression:
+        return CompressionType.zlib_compression
+    elif value == options.kBZip2Compression:
+        return CompressionType.bzip2_compression
+    elif value == options.kLZ4Compression:
+        return CompressionType.lz4_compression
+    elif value == options.kLZ4HCCompression:
+        return CompressionType.lz4hc_compression
+    elif value == options.kXpressCompression:
+        return CompressionType.xpress_compression
+    elif value == options.kZSTD:
+        return CompressionType.zstd_compression
+    elif value == options.kDisableCompressionOption:
+        return CompressionType.disable_compression_option
+    else:
+        raise Exception("Unknonw type: %s" % value)
+
+cdef options.CompressionType python_to_compression(value) except *:
+    if value == CompressionType.no_compression:
+        return options.kNoCompression
+    elif value == CompressionType.snappy_compression:
+        return options.kSnappyCompression
+    elif value == CompressionType.zlib_compression:
+        return options.kZlibCompression
+    elif value == CompressionType.bzip2_compression:
+        return options.kBZip2Compression
+    elif value == CompressionType.lz4_compression:
+        return options.kLZ4Compression
+    elif value == CompressionType.lz4hc_compression:
+        return options.kLZ4HCCompression
+    elif value == CompressionType.xpress_compression:
+        return options.kXpressCompression
+    elif value == CompressionType.zstd_compression:
+        return options.kZSTD
+    elif value == CompressionType.disable_compression_option:
+        return options.kDisableCompressionOption
+    else:
+        raise TypeError("Unknown compression: %s" % value)
+
+cdef dict compression_options_to_python(const options.CompressionOptions& copts):
+    return {
+        'window_bits': copts.window_bits,
+        'level': copts.level,
+        'strategy': copts.strategy,
+        'max_dict_bytes': copts.max_dict_bytes,
+        'zstd_max_train_bytes': copts.zstd_max_train_bytes,
+        'enabled': copts.enabled}
+
+cdef python_to_compression_options(dict value, options.CompressionOptions* copts):
+    for key in value:
+        if key not in (
+                'window_bits',
+                'level',
+                'strategy',
+                'max_dict_bytes',
+                'zstd_max_train_bytes',
+                'enabled'):
+            raise ValueError("Unknown compression option: %s" % key)
+
+    if 'window_bits' in value:
+        copts.window_bits = value['window_bits']
+
+    if 'level' in value:
+        copts.level = value['level']
+
+    if 'strategy' in value:
+        copts.strategy = value['strategy']
+
+    if 'max_dict_bytes' in value:
+        copts.max_dict_bytes = value['max_dict_bytes']
+
+    if 'zstd_max_train_bytes' in value:
+        copts.zstd_max_train_bytes = value['zstd_max_train_bytes']
+
+    if 'enabled' in value:
+        copts.enabled = value['enabled']
+
+# Used by the options, classes and arguments RocksDB removed. They still
+# exist to raise a clear error instead of an AttributeError or TypeError.
+cdef raise_removed(name, hint=None):
+    msg = "%s was removed from RocksDB and isn't supported anymore" % name
+    if hint is not None:
+        msg += ", " + hint
+    raise errors.NotSupported(msg)
+
+cdef class Options(object):
+    cdef options.Options* opts
+    cdef PyComparator py_comparator
+    cdef PyMergeOperator py_merge_operator
+    cdef PySliceTransform py_prefix_extractor
+    cdef PyTableFactory py_table_factory
+    cdef PyMemtableFactory py_memtable_factory
+    cdef PyCache py_row_cache
+    cdef PyWriteBufferManager py_write_buffer_manager
+    cdef PyStatistics py_statistics
+    cdef PyCompactionFilter py_compaction_filter
+    cdef PyCompactionFilterFactory py_compaction_filter_factory
+
+    # Used to protect sharing of Options with many DB-objects
+    cdef cpp_bool in_use
+
+    def __cinit__(self):
+        self.opts = NULL
+        self.opts = new options.Options()
+        self.in_use = False
+
+    def __dealloc__(self):
+        if not self.opts == NULL:
+            del self.opts
+
+    def __init__(self, **kwargs):
+        self.py_comparator = BytewiseComparator()
+        self.py_merge_operator = None
+        self.py_prefix_extractor = None
+        self.py_table_factory = None
+        self.py_memtable_factory = None
+        self.py_row_cache = None
+        self.py_write_buffer_manager = None
+        self.py_statistics = None
+        self.py_compaction_filter = None
+        self.py_compaction_filter_factory = None
+
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    property create_if_missing:
+        def __get__(self):
+            return self.opts.create_if_missing
+        def __set__(self, value):
+            self.opts.create_if_missing = value
+
+    property error_if_exists:
+        def __get__(self):
+            return self.opts.error_if_exists
+        def __set__(self, value):
+            self.opts.error_if_exists = value
+
+    property paranoid_checks:
+        def __get__(self):
+            return self.opts.paranoid_checks
+        def __set__(self, value):
+            self.opts.paranoid_checks = value
+
+    property write_buffer_size:
+        def __get__(self):
+            return self.opts.write_buffer_size
+        def __set__(self, value):
+            self.opts.write_buffer_size = value
+
+    property max_write_buffer_number:
+        def __get__(self):
+            return self.opts.max_write_buffer_number
+        def __set__(self, value):
+            self.opts.max_write_buffer_number = value
+
+    property min_write_buffer_number_to_merge:
+        def __get__(self):
+            return self.opts.min_write_buffer_number_to_merge
+        def __set__(self, value):
+            self.opts.min_write_buffer_number_to_merge = value
+
+    property max_open_files:
+        def __get__(self):
+            return self.opts.max_open_files
+        def __set__(self, value):
+            self.opts.max_open_files = value
+
+    property compression:
+        def __get__(self):
+            return compression_to_python(self.opts.compression)
+
+        def __set__(self, value):
+            if value == CompressionType.disable_compression_option:
+                raise TypeError("Unknown compression: %s" % value)
+            self.opts.compression = python_to_compression(value)
+
+    property compression_per_level:
+        def __get__(self):
+            cdef size_t i
+            return [
+                compression_to_python(self.opts.compression_per_level[i])
+                for i in range(self.opts.compression_per_level.size())]
+
+        def __set__(self, value):
+            cdef vector[options.CompressionType] levels
+            if value is not None:
+                for item in value:
+                    levels.push_back(python_to_compression(item))
+            self.opts.compression_per_level = levels
+
+    property compression_opts:
+        def __get__(self):
+            return compression_options_to_python(self.opts.compression_opts)
+
+        def __set__(self, dict value):
+            python_to_compression_options(
+                value,
+                cython.address(self.opts.compression_opts))
+
+    property bottommost_compression:
+        def __get__(self):
+            return compression_to_python(self.opts.bottommost_compression)
+
+        def __set__(self, value):
+            self.opts.bottommost_compression = python_to_compression(value)
+
+    property bottommost_compression_opts:
+        def __get__(self):
+            return compression_options_to_python(
+                self.opts.bottommost_compression_opts)
+
+        def __set__(self, dict value):
+            python_to_compression_options(
+                value,
+                cython.address(self.opts.bottommost_compression_opts))
+
+    property num_levels:
+        def __get__(self):
+            return self.opts.num_levels
+        def __set__(self, value):
+            self.opts.num_levels = value
+
+    property level0_file_num_compaction_trigger:
+        def __get__(self):
+            return self.opts.level0_file_num_compaction_trigger
+        def __set__(self, value):
+            self.opts.level0_file_num_compaction_trigger = value
+
+    property level0_slowdown_writes_trigger:
+        def __get__(self):
+            return self.opts.level0_slowdown_writes_trigger
+        def __set__(self, value):
+            self.opts.level0_slowdown_writes_trigger = value
+
+    property level0_stop_writes_trigger:
+        def __get__(self):
+            return self.opts.level0_stop_writes_trigger
+        def __set__(self, value):
+            self.opts.level0_stop_writes_trigger = value
+
+    property max_mem_compaction_level:
+        def __get__(self):
+            raise_removed('Options.max_mem_compaction_level')
+        def __set__(self, value):
+            raise_removed('Options.max_mem_compaction_level')
+
+    property target_file_size_base:
+        def __get__(self):
+            return self.opts.target_file_size_base
+        def __set__(self, value):
+            self.opts.target_file_size_base = value
+
+    property target_file_size_multiplier:
+        def __get__(self):
+            return self.opts.target_file_size_multiplier
+        def __set__(self, value):
+            self.opts.target_file_size_multiplier = value
+
+    property max_bytes_for_level_base:
+        def __get__(self):
+            return self.opts.max_bytes_for_level_base
+        def __set__(self, value):
+            self.opts.max_bytes_for_level_base = value
+
+    property max_bytes_for_level_multiplier:
+        def __get__(self):
+            return self.opts.max_bytes_for_level_multiplier
+        def __set__(self, value):
+            self.opts.max_bytes_for_level_multiplier = value
+
+    property max_bytes_for_level_multiplier_additional:
+        def __get__(self):
+            return self.opts.max_bytes_for_level_multiplier_additional
+        def __set__(self, value):
+            self.opts.max_bytes_for_level_multiplier_additional = value
+
+    property expanded_compaction_factor:
+        def __get__(self):
+            raise_removed('Options.expanded_compaction_factor')
+        def __set__(self, value):
+            raise_removed('Options.expanded_compaction_factor')
+
+    property source_compaction_factor:
+        def __get__(self):
+            raise_removed('Options.source_compaction_factor')
+        def __set__(self, value):
+            raise_removed('Options.source_compaction_factor')
+
+    property max_grandparent_overlap_factor:
+        def __get__(self):
+            raise_removed('Options.max_grandparent_overlap_factor')
+        def __set__(self, value):
+            raise_removed('Options.max_grandparent_overlap_factor')
+
+    property disable_data_sync:
+        def __get__(self):
+            raise_removed('Options.disable_data_sync')
+        def __set__(self, value):
+            raise_removed('Options.disable_data_sync')
+
+    property use_fsync:
+        def __get__(self):
+            return self.opts.use_fsync
+        def __set__(self, value):
+            self.opts.use_fsync = value
+
+    property db_log_dir:
+        def __get__(self):
+            return string_to_path(self.opts.db_log_dir)
+        def __set__(self, value):
+            self.opts.db_log_dir = path_to_string(value)
+
+    property wal_dir:
+        def __get__(self):
+            return string_to_path(self.opts.wal_dir)
+        def __set__(self, value):
+            self.opts.wal_dir = path_to_string(value)
+
+    property delete_obsolete_files_period_micros:
         def __get__(self):
             return self.opts.delete_obsolete_files_period_micros
         def __set__(self, value):
-            self.opts.delete_obsolete_files_period_micros = value
+            self.opts.delete_obsolete_files_period_micros = value
+
+    property max_background_compactions:
+        def __get__(self):
+            return self.opts.max_background_compactions
+        def __set__(self, value):
+            self.opts.max_background_compactions = value
+
+    property max_background_flushes:
+        def __get__(self):
+            return self.opts.max_background_flushes
+        def __set__(self, value):
+            self.opts.max_background_flushes = value
+
+    property max_log_file_size:
+        def __get__(self):
+            return self.opts.max_log_file_size
+        def __set__(self, value):
+            self.opts.max_log_file_size = value
+
+    property log_file_time_to_roll:
+        def __get__(self):
+            return self.opts.log_file_time_to_roll
+        def __set__(self, value):
+            self.opts.log_file_time_to_roll = value
+
+    property keep_log_file_num:
+        def __get__(self):
+            return self.opts.keep_log_file_num
+        def __set__(self, value):
+            self.opts.keep_log_file_num = value
+
+    property soft_rate_limit:
+        def __get__(self):
+            raise_removed('Options.soft_rate_limit')
+        def __set__(self, value):
+            raise_removed('Options.soft_rate_limit')
+
+    property hard_rate_limit:
+        def __get__(self):
+            raise_removed('Options.hard_rate_limit')
+        def __set__(self, value):
+            raise_removed('Options.hard_rate_limit')
+
+    property rate_limit_delay_max_milliseconds:
+        def __get__(self):
+            raise_removed('Options.rate_limit_delay_max_milliseconds')
+        def __set__(self, value):
+            raise_removed('Options.rate_limit_delay_max_milliseconds')
+
+    property max_manifest_file_size:
+        def __get__(self):
+            return self.opts.max_manifest_file_size
+        def __set__(self, value):
+            self.opts.max_manifest_file_size = value
+
+    property table_cache_numshardbits:
+        def __get__(self):
+            return self.opts.table_cache_numshardbits
+        def __set__(self, value):
+            self.opts.table_cache_numshardbits = value
+
+    property arena_block_size:
+        def __get__(self):
+            return self.opts.arena_block_size
+        def __set__(self, value):
+            self.opts.arena_block_size = value
+
+    property disable_auto_compactions:
+        def __get__(self):
+            return self.opts.disable_auto_compactions
+        def __set__(self, value):
+            self.opts.disable_auto_compactions = value
+
+    property wal_ttl_seconds:
+        def __get__(self):
+            return self.opts.WAL_ttl_seconds
+        def __set__(self, value):
+            self.opts.WAL_ttl_seconds = value
+
+    property wal_size_limit_mb:
+        def __get__(self):
+            return self.opts.WAL_size_limit_MB
+        def __set__(self, value):
+            self.opts.WAL_size_limit_MB = value
+
+    property manifest_preallocation_size:
+        def __get__(self):
+            return self.opts.manifest_preallocation_size
+        def __set__(self, value):
+            self.opts.manifest_preallocation_size = value
+
+    property purge_redundant_kvs_while_flush:
+        def __get__(self):
+            raise_removed('Options.purge_redundant_kvs_while_flush')
+        def __set__(self, value):
+            raise_removed('Options.purge_redundant_kvs_while_flush')
+
+    property allow_os_buffer:
+        def __get__(self):
+            raise_removed('Options.allow_os_buffer')
+        def __set__(self, value):
+            raise_removed('Options.allow_os_buffer')
+
+    property allow_mmap_reads:
+        def __get__(self):
+            return self.opts.allow_mmap_reads
+        def __set__(self, value):
+            self.opts.allow_mmap_reads = value
+
+    property allow_mmap_writes:
+        def __get__(self):
+            return self.opts.allow_mmap_writes
+        def __set__(self, value):
+            self.opts.allow_mmap_writes = value
+
+    property is_fd_close_on_exec:
+        def __get__(self):
+            return self.opts.is_fd_close_on_exec
+        def __set__(self, value):
+            self.opts.is_fd_close_on_exec = value
+
+    property skip_log_error_on_recovery:
+        def __get__(self):
+            raise_removed('Options.skip_log_error_on_recovery')
+        def __set__(self, value):
+            raise_removed('Options.skip_log_error_on_recovery')
+
+    property stats_dump_period_sec:
+        def __get__(self):
+            return self.opts.stats_dump_period_sec
+        def __set__(self, value):
+            self.opts.stats_dump_period_sec = value
+
+    property advise_random_on_open:
+        def __get__(self):
+            return self.opts.advise_random_on_open
+        def __set__(self, value):
+            self.opts.advise_random_on_open = value
+
+    property use_adaptive_mutex:
+        def __get__(self):
+            return self.opts.use_adaptive_mutex
+        def __set__(self, value):
+            self.opts.use_adaptive_mutex = value
+
+    property bytes_per_sync:
+        def __get__(self):
+            return self.opts.bytes_per_sync
+        def __set__(self, value):
+            self.opts.bytes_per_sync = value
+
+    property verify_checksums_in_compaction:
+        def __get__(self):
+            raise_removed('Options.verify_checksums_in_compaction')
+        def __set__(self, value):
+            raise_removed('Options.verify_checksums_in_compaction')
+
+    property compaction_style:
+        def __get__(self):
+            if self.opts.compaction_style == kCompactionStyleLevel:
+                return 'level'
+            if self.opts.compaction_style == kCompactionStyleUniversal:
+                return 'universal'
+            raise Exception("Unknown compaction_style")
+
+        def __set__(self, str value):
+            if value == 'level':
+                self.opts.compaction_style = kCompactionStyleLevel
+            elif value == 'universal':
+                self.opts.compaction_style = kCompactionStyleUniversal
+            else:
+                raise Exception("Unknown compaction style")
+
+    property compaction_options_universal:
+        def __get__(self):
+            cdef universal_compaction.CompactionOptionsUniversal uopts
+            cdef dict ret_ob = {}
+
+            uopts = self.opts.compaction_options_universal
+
+            ret_ob['size_ratio'] = uopts.size_ratio
+            ret_ob['min_merge_width'] = uopts.min_merge_width
+            ret_ob['max_merge_width'] = uopts.max_merge_width
+            ret_ob['max_size_amplification_percent'] = uopts.max_size_amplification_percent
+            ret_ob['compression_size_percent'] = uopts.compression_size_percent
+
+            if uopts.stop_style == kCompactionStopStyleSimilarSize:
+                ret_ob['stop_style'] = 'similar_size'
+            elif uopts.stop_style == kCompactionStopStyleTotalSize:
+                ret_ob['stop_style'] = 'total_size'
+            else:
+                raise Exception("Unknown compaction style")
+
+            return ret_ob
+
+        def __set__(self, dict value):
+            cdef universal_compaction.CompactionOptionsUniversal* uopts
+            uopts = cython.address(self.opts.compaction_options_universal)
+
+            if 'size_ratio' in value:
+                uopts.size_ratio  = value['size_ratio']
+
+            if 'min_merge_width' in value:
+                uopts.min_merge_width = value['min_merge_width']
+
+            if 'max_merge_width' in value:
+                uopts.max_merge_width = value['max_merge_width']
+
+            if 'max_size_amplification_percent' in value:
+                uopts.max_size_amplification_percent = value['max_size_amplification_percent']
+
+            if 'compression_size_percent' in value:
+                uopts.compression_size_percent = value['compression_size_percent']
+
+            if 'stop_style' in value:
+                if value['stop_style'] == 'similar_size':
+                    uopts.stop_style = kCompactionStopStyleSimilarSize
+                elif value['stop_style'] == 'total_size':
+                    uopts.stop_style = kCompactionStopStyleTotalSize
+                else:
+                    raise Exception("Unknown compaction style")
+
+    property filter_deletes:
+        def __get__(self):
+            raise_removed('Options.filter_deletes')
+        def __set__(self, value):
+            raise_removed('Options.filter_deletes')
+
+    property max_sequential_skip_in_iterations:
+        def __get__(self):
+            return self.opts.max_sequential_skip_in_iterations
+        def __set__(self, value):
+            self.opts.max_sequential_skip_in_iterations = value
+
+    property inplace_update_support:
+        def __get__(self):
+            return self.opts.inplace_update_support
+        def __set__(self, value):
+            self.opts.inplace_update_support = value
+
+    property table_factory:
+        def __get__(self):
+            return self.py_table_factory
+
+        def __set__(self, PyTableFactory value):
+            self.py_table_factory = value
+            self.opts.table_factory = value.get_table_factory()
+
+    property memtable_factory:
+        def __get__(self):
+            return self.py_memtable_factory
+
+        def __set__(self, PyMemtableFactory value):
+            self.py_memtable_factory = value
+            self.opts.memtable_factory = value.get_memtable_factory()
+
+    property inplace_update_num_locks:
+        def __get__(self):
+            return self.opts.inplace_update_num_locks
+        def __set__(self, value):
+            self.opts.inplace_update_num_locks = value
+
+    property comparator:
+        def __get__(self):
+            return self.py_comparator.get_ob()
+
+        def __set__(self, value):
+            if isinstance(value, PyComparator):
+                if (<PyComparator?>value).get_comparator() == NULL:
+                    raise Exception("Cannot set %s as comparator" % value)
+                else:
+                    self.py_comparator = value
+            else:
+                self.py_comparator = PyGenericComparator(value)
+
+            self.opts.comparator = self.py_comparator.get_comparator()
+
+    property merge_operator:
+        def __get__(self):
+            if self.py_merge_operator is None:
+                return None
+            return self.py_merge_operator.get_ob()
+
+        def __set__(self, value):
+            if isinstance(value, PyMergeOperator):
+                self.py_merge_operator = value
+            else:
+                self.py_merge_operator = PyGenericMergeOperator(value)
+
+            self.opts.merge_operator = self.py_merge_operator.get_operator()
+
+    property compaction_filter:
+        def __get__(self):
+            if self.py_compaction_filter is None:
+                return None
+            return self.py_compaction_filter.get_ob()
+
+        def __set__(self, value):
+            if value is None:
+                self.py_compaction_filter = None
+                self.opts.compaction_filter = NULL
+                return
+
+            if isinstance(value, PyCompactionFilter):
+                self.py_compaction_filter = value
+            else:
+                self.py_compaction_filter = PyGenericCompactionFilter(value)
+
+            self.opts.compaction_filter = self.py_compaction_filter.get_filter().get()
+
+    property compaction_filter_factory:
+        def __get__(self):
+            if self.py_compaction_filter_factory is None:
+                return None
+            return self.py_compaction_filter_factory.get_ob()
+
+        def __set__(self, value):
+            if value is None:
+                self.py_compaction_filter_factory = None
+                self.opts.compaction_filter_factory.reset()
+                return
+
+            self.py_compaction_filter_factory = PyCompactionFilterFactory(value)
+            self.opts.compaction_filter_factory = self.py_compaction_filter_factory.get_factory()
+
+    property prefix_extractor:
+        def __get__(self):
+            if self.py_prefix_extractor is None:
+                return None
+            return self.py_prefix_extractor.get_ob()
+
+        def __set__(self, value):
+            if isinstance(value, PySliceTransform):
+                self.py_prefix_extractor = value
+            else:
+                self.py_prefix_extractor = PyGenericSliceTransform(value)
+
+            self.opts.prefix_extractor = self.py_prefix_extractor.get_transformer()
+
+    property row_cache:
+        def __get__(self):
+            return self.py_row_cache
+
+        def __set__(self, value):
+            if value is None:
+                self.py_row_cache = None
+                self.opts.row_cache.reset()
+            elif not isinstance(value, PyCache):
+                raise Exception("row_cache must be a Cache object")
+            else:
+                self.py_row_cache = value
+                self.opts.row_cache = self.py_row_cache.get_cache()
+
+    property write_buffer_manager:
+        def __get__(self):
+            return self.py_write_buffer_manager
+
+        def __set__(self, value):
+            if value is None:
+                self.py_write_buffer_manager = None
+                self.opts.write_buffer_manager.reset()
+            elif not isinstance(value, PyWriteBufferManager):
+                raise Exception("write_buffer_manager must be a WriteBufferManager object")
+            else:
+                self.py_write_buffer_manager = value
+                self.opts.write_buffer_manager = self.py_write_buffer_manager.get_manager()
+
+    property statistics:
+        def __get__(self):
+            return self.py_statistics
+
+        def __set__(self, value):
+            if value is None:
+                self.py_statistics = None
+                self.opts.statistics.reset()
+            elif not isinstance(value, PyStatistics):
+                raise Exception("statistics must be a Statistics object")
+            else:
+                self.py_statistics = value
+                self.opts.statistics = self.py_statistics.get_statistics()
+
+
+## Here comes the KeyCodec
+# Tags of the encoded fields. Fields of different types are ordered by their
+# tag. Descending fields are stored with all bits inverted, this inverts the
+# tag too, so decoding works without knowing which fields are descending.
+cdef enum:
+    KEY_TAG_NONE = 0x01
+    KEY_TAG_INT = 0x02
+    KEY_TAG_FLOAT = 0x03
+    KEY_TAG_BYTES = 0x04
+    KEY_TAG_UNICODE = 0x05
+
+cdef uint64_t KEY_SIGN_BIT = (<uint64_t>1) << 63
+
+cdef void key_append_uint64(string& out, uint64_t value):
+    cdef int shift
+    for shift in range(56, -8, -8):
+        out.push_back(<char>((value >> shift) & 0xFF))
+
+cdef uint64_t key_read_uint64(const unsigned char* data, unsigned char mask):
+    cdef uint64_t ret = 0
+    cdef int i
+    for i in range(8):
+        ret = (ret << 8) | (data[i] ^ mask)
+    return ret
+
+# 0x00 is escaped as 0x00 0xFF and the end is marked by 0x00 0x01,
+# so a string sorts before all strings it is a prefix of.
+cdef void key_append_escaped(string& out, const char* data, Py_ssize_t size):
+    cdef Py_ssize_t i
+    for i in range(size):
+        out.push_back(data[i])
+        if data[i] == 0:
+            out.push_back(<char>0xFF)
+    out.push_back(0)
+    out.push_back(1)
+
+# Returns the position after the end marker.
+cdef size_t key_read_escaped(
+        const unsigned char* data,
+        size_t size,
+        size_t pos,
+        unsigned char mask,
+        string& out) except 0:
+
+    cdef unsigned char c
+
+    while pos + 1 < size:
+        c = data[pos] ^ mask
+        if c != 0:
+            out.push_back(<char>c)
+            pos += 1
+        elif data[pos + 1] ^ mask == 0xFF:
+            out.push_back(0)
+            pos += 2
+        elif data[pos + 1] ^ mask == 0x01:
+            return pos + 2
+        else:
+            break
+
+    raise ValueError("Invalid key encoding: unterminated string")
+
+cdef key_encode_field(string& out, value, cpp_bool descending):
+    cdef size_t start = out.size()
+    cdef size_t i
+    cdef int64_t int_value
+    cdef double float_value
+    cdef uint64_t bits
+
+    if value is None:
+        out.push_back(KEY_TAG_NONE)
+    elif isinstance(value, int):
+        int_value = value
+        out.push_back(KEY_TAG_INT)
+        key_append_uint64(out, (<uint64_t>int_value) ^ KEY_SIGN_BIT)
+    elif isinstance(value, float):
+        float_value = value
+        memcpy(cython.address(bits), cython.address(float_value), sizeof(double))
+        # Negative numbers are ordered reverse by their bits.
+        if bits & KEY_SIGN_BIT:
+            bits = ~bits
+        else:
+            bits |= KEY_SIGN_BIT
+        out.push_back(KEY_TAG_FLOAT)
+        key_append_uint64(out, bits)
+    elif isinstance(value, bytes):
+        out.push_back(KEY_TAG_BYTES)
+        key_append_escaped(out, PyBytes_AS_STRING(value), PyBytes_GET_SIZE(value))
+    elif isinstance(value, unicode):
+        value = value.encode('utf8')
+        out.push_back(KEY_TAG_UNICODE)
+        key_append_escaped(out, PyBytes_AS_STRING(value), PyBytes_GET_SIZE(value))
+    else:
+        raise TypeError("Can't encode %r into a key" % (value,))
+
+    if descending:
+        for i in range(start, out.size()):
+            out[i] = <char>(~(<unsigned char>out[i]))
+
+cdef tuple key_decode(const unsigned char* data, size_t size):
+    cdef list ret = []
+    cdef size_t pos = 0
+    cdef unsigned char tag
+    cdef unsigned char mask
+    cdef uint64_t bits
+    cdef double float_value
+    cdef string buf
+
+    while pos < size:
+        tag = data[pos]
+        pos += 1
+        mask = 0
+        if tag & 0x80:
+            mask = 0xFF
+            tag = tag ^ mask
+
+        if tag == KEY_TAG_NONE:
+            ret.append(None)
+        elif tag == KEY_TAG_INT or tag == KEY_TAG_FLOAT:
+            if size - pos < 8:
+                raise ValueError("Invalid key encoding: truncated number")
+            bits = key_read_uint64(data + pos, mask)
+            pos += 8
+
+            if tag == KEY_TAG_INT:
+                ret.append(<int64_t>(bits ^ KEY_SIGN_BIT))
+            else:
+                if bits & KEY_SIGN_BIT:
+                    bits ^= KEY_SIGN_BIT
+                else:
+                    bits = ~bits
+                memcpy(cython.address(float_value), cython.address(bits), sizeof(double))
+                ret.append(float_value)
+        elif tag == KEY_TAG_BYTES or tag == KEY_TAG_UNICODE:
+            buf.clear()
+            pos = key_read_escaped(data, size, pos, mask, buf)
+            if tag == KEY_TAG_BYTES:
+                ret.append(string_to_bytes(buf))
+            else:
+                ret.append(PyUnicode_Decode(buf.c_str(), buf.size(), "utf8", "strict"))
+        else:
+            raise ValueError("Invalid key encoding: unknown tag %i" % tag)
+
+    return tuple(ret)
+
+cdef class KeyCodec(object):
+    # descending[i] is True if the field at position i is ordered descending.
+    cdef vector[cpp_bool] descending
+
+    def __cinit__(self, descending=()):
+        cdef size_t index
+        for index in descending:
+            if index >= self.descending.size():
+                self.descending.resize(index + 1, False)
+            self.descending[index] = True
+
+    property descending_fields:
+        def __get__(self):
+            cdef size_t i
+            return tuple(i for i in range(self.descending.size()) if self.descending[i])
+
+    cdef encode_into(self, string& out, tuple key):
+        cdef Py_ssize_t i
+        cdef cpp_bool descending
+
+        for i in range(len(key)):
+            descending = <size_t>i < self.descending.size() and self.descending[i]
+            key_encode_field(out, key[i], descending)
+
+    cpdef bytes encode(self, tuple key):
+        cdef string out
+        self.encode_into(out, key)
+        return string_to_bytes(out)
+
+    cpdef tuple decode(self, key):
+        cdef Slice c_key = bytes_to_slice(key)
+        return key_decode(<const unsigned char*>c_key.data(), c_key.size())
+
+    def encode_many(self, keys):
+        cdef string out
+        cdef list ret = []
+        for key in keys:
+            out.clear()
+            self.encode_into(out, key)
+            ret.append(string_to_bytes(out))
+        return ret
+
+    def decode_many(self, keys):
+        return [self.decode(key) for key in keys]
+
+
+# Forward declaration
+cdef class Snapshot
+cdef class PinnedSlice
+cdef class ScanBuffer
+
+cdef class KeysIterator
+cdef class ValuesIterator
+cdef class ItemsIterator
+cdef class ReversedIterator
+cdef class UpdatesIterator
+
+@cython.internal
+cdef class ColumnFamilyHandle(object):
+    # The C++ handle is owned by the DB, which destroys it on close or when
+    # the column family is dropped. Afterwards 'handle' is NULL.
+    cdef db.ColumnFamilyHandle* handle
+    cdef cpp_bool owned
+    cdef bytes cf_name
+    cdef Options opts
+
+    def __cinit__(self):
+        self.handle = NULL
+        self.owned = False
+        self.cf_name = None
+        self.opts = None
+
+    property name:
+        def __get__(self):
+            return self.cf_name
+
+    property id:
+        def __get__(self):
+            return self.get_handle().GetID()
+
+    property is_valid:
+        def __get__(self):
+            return self.handle != NULL
+
+    property options:
+        def __get__(self):
+            return self.opts
+
+    def __repr__(self):
+        return "<ColumnFamilyHandle name=%r valid=%s>" % (
+            self.cf_name,
+            self.handle != NULL)
+
+    cdef db.ColumnFamilyHandle* get_handle(self) except NULL:
+        if self.handle == NULL:
+            raise ValueError("Column family %r is not valid anymore" % self.cf_name)
+        return self.handle
+
+    cdef release(self, db.DB* c_db):
+        if self.handle != NULL and self.owned:
+            with nogil:
+                c_db.DestroyColumnFamilyHandle(self.handle)
+        self.handle = NULL
+
+        if self.opts is not None:
+            self.opts.in_use = False
+
+# Forward declaration
+cdef class WriteBatchIterator
+cdef class WriteBatchWithIndex
+cdef class DB
+cdef class Transaction
+
+cdef class WriteBatch(object):
+    cdef db.WriteBatch* batch
+
+    def __cinit__(self, data=None):
+        self.batch = NULL
+        if data is not None:
+            self.batch = new db.WriteBatch(bytes_to_string(data))
+        else:
+            self.batch = new db.WriteBatch()
+
+    def __dealloc__(self):
+        if not self.batch == NULL:
+            del self.batch
+
+    def put(self, key, value, ColumnFamilyHandle column_family=None):
+        if column_family is None:
+            self.batch.Put(bytes_to_slice(key), bytes_to_slice(value))
+        else:
+            self.batch.Put(
+                column_family.get_handle(),
+                bytes_to_slice(key),
+                bytes_to_slice(value))
+
+    def merge(self, key, value, ColumnFamilyHandle column_family=None):
+        if column_family is None:
+            self.batch.Merge(bytes_to_slice(key), bytes_to_slice(value))
+        else:
+            self.batch.Merge(
+                column_family.get_handle(),
+                bytes_to_slice(key),
+                bytes_to_slice(value))
+
+    def delete(self, key, ColumnFamilyHandle column_family=None):
+        if column_family is None:
+            self.batch.Delete(bytes_to_slice(key))
+        else:
+            self.batch.Delete(column_family.get_handle(), bytes_to_slice(key))
+
+    def clear(self):
+        self.batch.Clear()
+
+    def data(self):
+        return string_to_bytes(self.batch.Data())
+
+    def count(self):
+        return self.batch.Count()
+
+    def put_array(self, keys, values, ColumnFamilyHandle column_family=None):
+        cdef Py_buffer keys_view
+        cdef Py_buffer values_view
+        cdef size_t key_size
+        cdef size_t value_size
+        cdef size_t n
+        cdef size_t n_values
+        cdef CColumnFamilyHandle* cf = NULL
+
+        if column_family is not None:
+            cf = column_family.get_handle()
+
+        n = get_array_buffer(
+            keys,
+            cython.address(keys_view),
+            cython.address(key_size),
+            PyBUF_SIMPLE)
+        try:
+            n_values = get_array_buffer(
+                values,
+                cython.address(values_view),
+                cython.address(value_size),
+                PyBUF_SIMPLE)
+
+            try:
+                if n_values != n:
+                    raise ValueError("keys and values have a different length")
+
+                with nogil:
+                    db.array_put(
+                        self.batch,
+                        cf,
+                        <const char*>keys_view.buf,
+                        key_size,
+                        <const char*>values_view.buf,
+                        value_size,
+                        n)
+            finally:
+                PyBuffer_Release(cython.address(values_view))
+        finally:
+            PyBuffer_Release(cython.address(keys_view))
+
+    def iterator(self, with_column_family=False):
+        return WriteBatchIterator(self, with_column_family)
+
+    def __iter__(self):
+        return WriteBatchIterator(self)
+
+
+cdef class WriteBatchWithIndex(object):
+    cdef write_batch_with_index.WriteBatchWithIndex* batch
+    cdef PyComparator py_comparator
+    cdef cpp_bool overwrite_key
+
+    def __cinit__(self, overwrite_key=True, comparator=None):
+        self.batch = NULL
+        self.overwrite_key = overwrite_key
+
+        if comparator is None:
+            self.py_comparator = BytewiseComparator()
+        elif isinstance(comparator, PyComparator):
+            self.py_comparator = comparator
+        else:
+            self.py_comparator = PyGenericComparator(comparator)
+
+        self.batch = new write_batch_with_index.WriteBatchWithIndex(
+            self.py_comparator.get_comparator(),
+            0,
+            self.overwrite_key)
+
+    def __dealloc__(self):
+        if not self.batch == NULL:
+            del self.batch
+
+    def put(self, key, value, ColumnFamilyHandle column_family=None):
+        cdef Status st
+
+        if column_family is None:
+            st = self.batch.Put(bytes_to_slice(key), bytes_to_slice(value))
+        else:
+            st = self.batch.Put(
+                column_family.get_handle(),
+                bytes_to_slice(key),
+                bytes_to_slice(value))
+        check_status(st)
+
+    def merge(self, key, value, ColumnFamilyHandle column_family=None):
+        cdef Status st
+
+        if column_family is None:
+            st = self.batch.Merge(bytes_to_slice(key), bytes_to_slice(value))
+        else:
+            st = self.batch.Merge(
+                column_family.get_handle(),
+                bytes_to_slice(key),
+                bytes_to_slice(value))
+        check_status(st)
+
+    def delete(self, key, ColumnFamilyHandle column_family=None):
+        cdef Status st
+
+        if column_family is None:
+            st = self.batch.Delete(bytes_to_slice(key))
+        else:
+            st = self.batch.Delete(
+                column_family.get_handle(),
+                bytes_to_slice(key))
+        check_status(st)
+
+    def clear(self):
+        self.batch.Clear()
+
+    def data(self):
+        return string_to_bytes(self.batch.GetWriteBatch().Data())
+
+    def count(self):
+        return self.batch.GetWriteBatch().Count()
+
+    def iterator(self, with_column_family=False):
+        return WriteBatchIterator(self, with_column_family)
+
+    def __iter__(self):
+        return WriteBatchIterator(self)
+
+    def get_from_batch(self, key, ColumnFamilyHandle column_family=None):
+        cdef Status st
+        cdef string value
+        cdef options.DBOptions opts
+        cdef CColumnFamilyHandle* cf = NULL
+
+        if column_family is not None:
+            cf = column_family.get_handle()
+
+        st = self.batch.GetFromBatch(
+            cf,
+            opts,
+            bytes_to_slice(key),
+            cython.address(value))
+
+        if st.ok():
+            return string_to_bytes(value)
+        elif st.IsNotFound():
+            return None
+        else:
+            check_status(st)
+
+    def get_from_batch_and_db(
+            self,
+            DB db,
+            key,
+            *args,
+            column_family=None,
+            **kwargs):
+
+        cdef Status st
+        cdef string value
+        cdef options.ReadOptions opts
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef CColumnFamilyHandle* cf = db.get_cf_handle(column_family)
+
+        opts = db.read_opts_from_args(args, kwargs)
+
+        with nogil:
+            st = self.batch.GetFromBatchAndDB(
+                db.db,
+                opts,
+                cf,
+                c_key,
+                cython.address(value))
+
+        if st.ok():
+            return string_to_bytes(value)
+        elif st.IsNotFound():
+            return None
+        else:
+            check_status(st)
+
+    def iterkeys(self, DB db, *args, column_family=None, **kwargs):
+        self.check_iterable()
+        it = db.iterkeys(*args, column_family=column_family, **kwargs)
+        return self.with_base_iterator(db, it, column_family)
+
+    def itervalues(self, DB db, *args, column_family=None, **kwargs):
+        self.check_iterable()
+        it = db.itervalues(*args, column_family=column_family, **kwargs)
+        return self.with_base_iterator(db, it, column_family)
+
+    def iteritems(self, DB db, *args, column_family=None, **kwargs):
+        self.check_iterable()
+        it = db.iteritems(*args, column_family=column_family, **kwargs)
+        return self.with_base_iterator(db, it, column_family)
+
+    # rocksdb supports NewIteratorWithBase only for indexes which keep
+    # the latest update of a key.
+    cdef check_iterable(self):
+        if not self.overwrite_key:
+            raise errors.NotSupported(
+                "Iterating needs a WriteBatchWithIndex with overwrite_key=True")
+
+    # Replaces the DB iterator of 'it' by one which merges
+    # the entries of this batch over the ones of the DB.
+    cdef BaseIterator with_base_iterator(
+            self,
+            DB db,
+            BaseIterator it,
+            column_family):
+
+        cdef CColumnFamilyHandle* cf = db.get_cf_handle(column_family)
+        cdef iterator.Iterator* base = it.ptr
+
+        # The new iterator takes the ownership of 'base'.
+        it.ptr = NULL
+        with nogil:
+            it.ptr = self.batch.NewIteratorWithBase(cf, base)
+
+        it.parent = self
+        return it
+
+
+# WriteBatch and WriteBatchWithIndex are accepted wherever a batch is read.
+cdef db.WriteBatch* get_write_batch(object batch) except NULL:
+    if isinstance(batch, WriteBatch):
+        return (<WriteBatch>batch).batch
+
+    if isinstance(batch, WriteBatchWithIndex):
+        return (<WriteBatchWithIndex>batch).batch.GetWriteBatch()
+
+    msg = "%s is not of this types %s"
+    raise TypeError(msg % (batch, (WriteBatch, WriteBatchWithIndex)))
+
+
+@cython.internal
+cdef class WriteBatchIterator(object):
+    # Need a reference to the WriteBatch.
+    # The BatchItems are only pointers to the memory in WriteBatch.
+    cdef object batch
+    cdef vector[db.BatchItem] items
+    cdef size_t pos
+    cdef cpp_bool with_column_family
+
+    def __init__(self, batch, with_column_family=False):
+        cdef Status st
+
+        self.batch = batch
+        self.pos = 0
+        self.with_column_family = with_column_family
+
+        st = db.get_batch_items(
+            get_write_batch(batch),
+            cython.address(self.items))
+        check_status(st)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.pos == self.items.size():
+            raise StopIteration()
+
+        cdef str op
+
+        if self.items[self.pos].op == db.BatchItemOpPut:
+            op = "Put"
+        elif self.items[self.pos].op == db.BatchItemOpMerge:
+            op = "Merge"
+        elif self.items[self.pos].op == db.BatchItemOpDelte:
+            op = "Delete"
+
+        if self.with_column_family:
+            ret = (
+                op,
+                slice_to_bytes(self.items[self.pos].key),
+                slice_to_bytes(self.items[self.pos].value),
+                self.items[self.pos].column_family_id)
+        else:
+            ret = (
+                op,
+                slice_to_bytes(self.items[self.pos].key),
+                slice_to_bytes(self.items[self.pos].value))
+
+        self.pos += 1
+        return ret
+
+# Inject the loggers into the python callbacks
+cdef inject_info_log(Options opts, shared_ptr[logger.Logger] info_log):
+    if opts.py_comparator is not None:
+        opts.py_comparator.set_info_log(info_log)
+
+    if opts.py_table_factory is not None:
+        opts.py_table_factory.set_info_log(info_log)
+
+    if opts.py_prefix_extractor is not None:
+        opts.py_prefix_extractor.set_info_log(info_log)
+
+    if opts.py_compaction_filter is not None:
+        opts.py_compaction_filter.set_info_log(info_log)
+
+    if opts.py_compaction_filter_factory is not None:
+        opts.py_compaction_filter_factory.set_info_log(info_log)
+
+@cython.no_gc_clear
+cdef class DB(object):
+    cdef Options opts
+    cdef db.DB* db
+    # Maps the name of a column family to its ColumnFamilyHandle
+    cdef dict cf_handles
+    # Only set for secondary instances, see open_as_secondary.
+    cdef string secondary_path
+    # Set to stop the thread started by start_catch_up.
+    cdef object catch_up_stopped
+    # The error of the last attempt of this thread, None if it succeeded.
+    cdef object catch_up_error
+    # Encodes tuple keys, see the key_codec property.
+    cdef KeyCodec codec
+    cdef object __weakref__
+
+    def __cinit__(self, *args, **kwargs):
+        self.db = NULL
+        self.opts = None
+        self.cf_handles = {}
+        self.catch_up_stopped = None
+        self.catch_up_error = None
+        self.codec = None
+
+    # Opening happens here and not in __cinit__, so subclasses like
+    # TransactionDB get their 'open_db' called.
+    def __init__(
+            self,
+            db_name,
+            Options opts,
+            read_only=False,
+            column_families=None):
+
+        cdef Status st
+        cdef string db_path
+        cdef cpp_bool c_read_only = read_only
+        cdef vector[db.ColumnFamilyDescriptor] c_descriptors
+        cdef vector[db.ColumnFamilyHandle*] c_handles
+        cdef Options cf_opts
+        cdef size_t index
+
+        if self.db != NULL:
+            raise Exception("DB is already open")
+
+        if opts.in_use:
+            raise Exception("Options object is already used by another DB")
+
+        db_path = path_to_string(db_name)
+
+        if column_families is None:
+            st = self.open_db(opts, db_path, c_read_only, NULL, NULL)
+            check_status(st)
+
+            self.add_cf_handle(
+                string_to_bytes(db.kDefaultColumnFamilyName),
+                None,
+                self.db.DefaultColumnFamily(),
+                False)
+        else:
+            py_column_families = []
+            default_name = string_to_bytes(db.kDefaultColumnFamilyName)
+            if default_name not in column_families:
+                py_column_families.append((default_name, opts))
+
+            for name, cf_opts in column_families.items():
+                if cf_opts is None:
+                    cf_opts = Options()
+                elif cf_opts is not opts and cf_opts.in_use:
+                    raise Exception("Options object is already used by another DB")
+                py_column_families.append((name, cf_opts))
+
+            for name, cf_opts in py_column_families:
+                c_descriptors.push_back(
+                    db.ColumnFamilyDescriptor(
+                        bytes_to_string(name),
+                        options.ColumnFamilyOptions(deref(cf_opts.opts))))
+
+            st = self.open_db(
+                opts,
+                db_path,
+                c_read_only,
+                cython.address(c_descriptors),
+                cython.address(c_handles))
+            check_status(st)
+
+            for index in range(c_handles.size()):
+                name, cf_opts = py_column_families[index]
+                if cf_opts is opts:
+                    cf_opts = None
+                self.add_cf_handle(name, cf_opts, c_handles[index], True)
+
+        self.opts = opts
+        self.opts.in_use = True
+        inject_info_log(self.opts, self.db.GetOptions().info_log)
+
+    # Opens the database into 'self.db'. Without 'descriptors' only
+    # the default column family is opened.
+    cdef Status open_db(
+            self,
+            Options opts,
+            const string& db_path,
+            cpp_bool read_only,
+            vector[CColumnFamilyDescriptor]* descriptors,
+            vector[CColumnFamilyHandle*]* handles):
+
+        cdef Status st
+
+        if not self.secondary_path.empty():
+            if descriptors == NULL:
+                with nogil:
+                    st = db.DB_OpenAsSecondary(
+                        deref(opts.opts),
+                        db_path,
+                        self.secondary_path,
+                        cython.address(self.db))
+            else:
+                with nogil:
+                    st = db.DB_OpenColumnFamiliesAsSecondary(
+                        deref(opts.opts),
+                        db_path,
+                        self.secondary_path,
+                        deref(descriptors),
+                        handles,
+                        cython.address(self.db))
+        elif descriptors == NULL:
+            if read_only:
+                with nogil:
+                    st = db.DB_OpenForReadOnly(
+                        deref(opts.opts),
+                        db_path,
+                        cython.address(self.db),
+                        False)
+            else:
+                with nogil:
+                    st = db.DB_Open(
+                        deref(opts.opts),
+                        db_path,
+                        cython.address(self.db))
+        else:
+            if read_only:
+                with nogil:
+                    st = db.DB_OpenColumnFamiliesForReadOnly(
+                        deref(opts.opts),
+                        db_path,
+                        deref(descriptors),
+                        handles,
+                        cython.address(self.db),
+                        False)
+            else:
+                with nogil:
+                    st = db.DB_OpenColumnFamilies(
+                        deref(opts.opts),
+                        db_path,
+                        deref(descriptors),
+                        handles,
+                        cython.address(self.db))
+        return st
+
+    def __dealloc__(self):
+        cdef ColumnFamilyHandle cf
+
+        if self.catch_up_stopped is not None:
+            self.catch_up_stopped.set()
+
+        if not self.db == NULL:
+            for cf in self.cf_handles.values():
+                cf.release(self.db)
+
+            with nogil:
+                del self.db
+
+        if self.opts is not None:
+            self.opts.in_use = False
+
+    property key_codec:
+        def __get__(self):
+            return self.codec
+
+        def __set__(self, value):
+            if value is not None and not isinstance(value, KeyCodec):
+                raise Exception("key_codec must be a KeyCodec object")
+            self.codec = value
+
+    cdef object encode_key(self, key):
+        if self.codec is None:
+            return key
+        # The iterators decode every key, so raw keys would break them.
+        if not isinstance(key, tuple):
+            raise TypeError("Keys must be tuples while key_codec is set, got %r" % (key,))
+        return self.codec.encode(key)
+
+    cdef object decode_key(self, bytes key):
+        if self.codec is None:
+            return key
+        return self.codec.decode(key)
+
+    # The array and buffer methods work on the raw bytes of the keys,
+    # they can't encode or decode them.
+    cdef check_raw_keys(self, name):
+        if self.codec is not None:
+            raise errors.NotSupported("%s doesn't support key_codec" % name)
+
+    @staticmethod
+    def open_as_secondary(
+            primary_path,
+            secondary_path,
+            Options opts,
+            column_families=None,
+            catch_up_interval=None):
+
+        cdef DB ret = DB.__new__(DB)
+        ret.secondary_path = path_to_string(secondary_path)
+        DB.__init__(ret, primary_path, opts, column_families=column_families)
+
+        if catch_up_interval is not None:
+            ret.start_catch_up(catch_up_interval)
+        return ret
+
+    def try_catch_up_with_primary(self):
+        cdef Status st
+        with nogil:
+            st = self.db.TryCatchUpWithPrimary()
+        check_status(st)
+
+    def start_catch_up(self, interval):
+        if self.secondary_path.empty():
+            raise Exception("Only a secondary instance can catch up with the primary")
+
+        self.stop_catch_up()
+        self.catch_up_stopped = threading.Event()
+        self.catch_up_error = None
+
+        thread = threading.Thread(
+            target=_catch_up_with_primary,
+            args=(weakref.ref(self), interval, self.catch_up_stopped))
+        thread.daemon = True
+        thread.start()
+
+    def stop_catch_up(self):
+        if self.catch_up_stopped is not None:
+            self.catch_up_stopped.set()
+            self.catch_up_stopped = None
+
+    property last_catch_up_error:
+        def __get__(self):
+            return self.catch_up_error
+
+    cdef ColumnFamilyHandle add_cf_handle(
+            self,
+            bytes name,
+            Options cf_opts,
+            CColumnFamilyHandle* handle,
+            cpp_bool owned):
+
+        cdef ColumnFamilyHandle cf = ColumnFamilyHandle()
+        cf.handle = handle
+        cf.owned = owned
+        cf.cf_name = name
+        cf.opts = cf_opts
+
+        if cf_opts is not None:
+            cf_opts.in_use = True
+            inject_info_log(cf_opts, self.db.GetOptions().info_log)
+
+        self.cf_handles[name] = cf
+        return cf
+
+    cdef CColumnFamilyHandle* get_cf_handle(self, column_family) except NULL:
+        cdef ColumnFamilyHandle cf
+
+        if column_family is None:
+            return self.db.DefaultColumnFamily()
+
+        cf = column_family
+        if self.cf_handles.get(cf.cf_name) is not cf:
+            raise ValueError("%r does not belong to this DB" % cf)
+        return cf.get_handle()
+
+    def create_column_family(self, name, Options opts):
+        cdef Status st
+        cdef string c_name
+        cdef options.ColumnFamilyOptions c_opts
+        cdef db.ColumnFamilyHandle* handle
+
+        if opts.in_use:
+            raise Exception("Options object is already used by another DB")
+
+        c_name = bytes_to_string(name)
+        c_opts = options.ColumnFamilyOptions(deref(opts.opts))
+
+        with nogil:
+            st = self.db.CreateColumnFamily(
+                c_opts,
+                c_name,
+                cython.address(handle))
+        check_status(st)
+
+        return self.add_cf_handle(name, opts, handle, True)
+
+    def drop_column_family(self, ColumnFamilyHandle column_family not None):
+        cdef Status st
+        cdef db.ColumnFamilyHandle* handle
+
+        handle = self.get_cf_handle(column_family)
+        with nogil:
+            st = self.db.DropColumnFamily(handle)
+        check_status(st)
+
+        del self.cf_handles[column_family.cf_name]
+        column_family.release(self.db)
+
+    def get_column_family(self, name):
+        return self.cf_handles.get(name)
+
+    property column_families:
+        def __get__(self):
+            return list(self.cf_handles.values())
+
+    def put(
+            self,
+            key,
+            value,
+            sync=False,
+            disable_wal=False,
+            column_family=None):
+
+        cdef uint64_t started = call_started()
+        cdef Status st
+        cdef options.WriteOptions opts
+        opts.sync = sync
+        opts.disableWAL = disable_wal
+
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+        key = self.encode_key(key)
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef Slice c_value = hold_slice(value, holds)
+
+        with nogil:
+            st = self.db.Put(opts, cf, c_key, c_value)
+        call_finished(CALL_DB_PUT, started, 0, status_failed(st))
+        check_status(st)
+
+    def delete(self, key, sync=False, disable_wal=False, column_family=None):
+        cdef uint64_t started = call_started()
+        cdef Status st
+        cdef options.WriteOptions opts
+        opts.sync = sync
+        opts.disableWAL = disable_wal
+
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+        key = self.encode_key(key)
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+        with nogil:
+            st = self.db.Delete(opts, cf, c_key)
+        call_finished(CALL_DB_DELETE, started, 0, status_failed(st))
+        check_status(st)
+
+    def merge(
+            self,
+            key,
+            value,
+            sync=False,
+            disable_wal=False,
+            column_family=None):
+
+        cdef uint64_t started = call_started()
+        cdef Status st
+        cdef options.WriteOptions opts
+        opts.sync = sync
+        opts.disableWAL = disable_wal
+
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+        key = self.encode_key(key)
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef Slice c_value = hold_slice(value, holds)
+        with nogil:
+            st = self.db.Merge(opts, cf, c_key, c_value)
+        call_finished(CALL_DB_MERGE, started, 0, status_failed(st))
+        check_status(st)
 
-    property max_background_compactions:
-        def __get__(self):
-            return self.opts.max_background_compactions
-        def __set__(self, value):
-            self.opts.max_background_compactions = value
+    def put_array(
+            self,
+            keys,
+            values,
+            sync=False,
+            disable_wal=False,
+            column_family=None):
 
-    property max_background_flushes:
-        def __get__(self):
-            return self.opts.max_background_flushes
-        def __set__(self, value):
-            self.opts.max_background_flushes = value
+        cdef Status st
+        cdef options.WriteOptions opts
+        cdef db.WriteBatch batch
+        cdef Py_buffer keys_view
+        cdef Py_buffer values_view
+        cdef size_t key_size
+        cdef size_t value_size
+        cdef size_t n
+        cdef size_t n_values
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+
+        self.check_raw_keys('put_array')
+        opts.sync = sync
+        opts.disableWAL = disable_wal
 
-    property max_log_file_size:
-        def __get__(self):
-            return self.opts.max_log_file_size
-        def __set__(self, value):
-            self.opts.max_log_file_size = value
+        n = get_array_buffer(
+            keys,
+            cython.address(keys_view),
+            cython.address(key_size),
+            PyBUF_SIMPLE)
+        try:
+            n_values = get_array_buffer(
+                values,
+                cython.address(values_view),
+                cython.address(value_size),
+                PyBUF_SIMPLE)
+
+            try:
+                if n_values != n:
+                    raise ValueError("keys and values have a different length")
+
+                with nogil:
+                    db.array_put(
+                        cython.address(batch),
+                        cf,
+                        <const char*>keys_view.buf,
+                        key_size,
+                        <const char*>values_view.buf,
+                        value_size,
+                        n)
+                    st = self.db.Write(opts, cython.address(batch))
+            finally:
+                PyBuffer_Release(cython.address(values_view))
+        finally:
+            PyBuffer_Release(cython.address(keys_view))
 
-    property log_file_time_to_roll:
-        def __get__(self):
-            return self.opts.log_file_time_to_roll
-        def __set__(self, value):
-            self.opts.log_file_time_to_roll = value
+        check_status(st)
 
-    property keep_log_file_num:
-        def __get__(self):
-            return self.opts.keep_log_file_num
-        def __set__(self, value):
-            self.opts.keep_log_file_num = value
+    def write(self, batch, sync=False, disable_wal=False):
+        cdef uint64_t started = call_started()
+        cdef Status st
+        cdef options.WriteOptions opts
+        cdef db.WriteBatch* c_batch = get_write_batch(batch)
+        opts.sync = sync
+        opts.disableWAL = disable_wal
 
-    property soft_rate_limit:
-        def __get__(self):
-            return self.opts.soft_rate_limit
-        def __set__(self, value):
-            self.opts.soft_rate_limit = value
+        with nogil:
+            st = self.db.Write(opts, c_batch)
+        call_finished(CALL_DB_WRITE, started, 0, status_failed(st))
+        check_status(st)
 
-    property hard_rate_limit:
-        def __get__(self):
-            return self.opts.hard_rate_limit
-        def __set__(self, value):
-            self.opts.hard_rate_limit = value
+    def get(self, key, *args, column_family=None, **kwargs):
+        cdef uint64_t started = call_started()
+        cdef string res
+        cdef Status st
+        cdef options.ReadOptions opts
 
-    property rate_limit_delay_max_milliseconds:
-        def __get__(self):
-            return self.opts.rate_limit_delay_max_milliseconds
-        def __set__(self, value):
-            self.opts.rate_limit_delay_max_milliseconds = value
+        opts = self.read_opts_from_args(args, kwargs)
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+        key = self.encode_key(key)
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
 
-    property max_manifest_file_size:
-        def __get__(self):
-            return self.opts.max_manifest_file_size
-        def __set__(self, value):
-            self.opts.max_manifest_file_size = value
+        with nogil:
+            st = self.db.Get(opts, cf, c_key, cython.address(res))
+        call_finished(CALL_DB_GET, started, 0, status_failed(st))
 
-    property table_cache_numshardbits:
-        def __get__(self):
-            return self.opts.table_cache_numshardbits
-        def __set__(self, value):
-            self.opts.table_cache_numshardbits = value
+        if st.ok():
+            return string_to_bytes(res)
+        elif st.IsNotFound():
+            return None
+        else:
+            check_status(st)
 
-    property arena_block_size:
-        def __get__(self):
-            return self.opts.arena_block_size
-        def __set__(self, value):
-            self.opts.arena_block_size = value
+    def get_pinned(self, key, *args, column_family=None, **kwargs):
+        cdef uint64_t started = call_started()
+        cdef Status st
+        cdef options.ReadOptions opts
+        cdef PinnedSlice pinned
 
-    property disable_auto_compactions:
-        def __get__(self):
-            return self.opts.disable_auto_compactions
-        def __set__(self, value):
-            self.opts.disable_auto_compactions = value
+        opts = self.read_opts_from_args(args, kwargs)
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+        key = self.encode_key(key)
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+        pinned = PinnedSlice(self)
 
-    property wal_ttl_seconds:
-        def __get__(self):
-            return self.opts.WAL_ttl_seconds
-        def __set__(self, value):
-            self.opts.WAL_ttl_seconds = value
+        with nogil:
+            st = self.db.Get(
+                opts,
+                cf,
+                c_key,
+                pinned.ptr)
+        call_finished(CALL_DB_GET_PINNED, started, 0, status_failed(st))
 
-    property wal_size_limit_mb:
-        def __get__(self):
-            return self.opts.WAL_size_limit_MB
-        def __set__(self, value):
-            self.opts.WAL_size_limit_MB = value
+        if st.ok():
+            return pinned
+        elif st.IsNotFound():
+            return None
+        else:
+            check_status(st)
 
-    property manifest_preallocation_size:
-        def __get__(self):
-            return self.opts.manifest_preallocation_size
-        def __set__(self, value):
-            self.opts.manifest_preallocation_size = value
+    def get_into(self, key, buf, *args, column_family=None, **kwargs):
+        cdef uint64_t started = call_started()
+        cdef Status st
+        cdef options.ReadOptions opts
+        cdef PinnableSlice value
+        cdef Py_buffer view
+        cdef cpp_bool fits = False
+
+        opts = self.read_opts_from_args(args, kwargs)
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+        key = self.encode_key(key)
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+
+        PyObject_GetBuffer(
+            buf,
+            cython.address(view),
+            PyBUF_SIMPLE | PyBUF_WRITABLE)
+
+        try:
+            with nogil:
+                st = self.db.Get(
+                    opts,
+                    cf,
+                    c_key,
+                    cython.address(value))
+
+                if st.ok() and value.size() <= <size_t>view.len:
+                    fits = True
+                    memcpy(view.buf, value.data(), value.size())
+        finally:
+            PyBuffer_Release(cython.address(view))
+        call_finished(CALL_DB_GET_INTO, started, 0, status_failed(st))
+
+        if st.IsNotFound():
+            return None
+
+        check_status(st)
+        if not fits:
+            msg = "Buffer too small, value needs %i bytes, buffer has %i"
+            raise ValueError(msg % (value.size(), view.len))
+        return value.size()
+
+    def multi_get(self, keys, *args, column_family=None, **kwargs):
+        cdef uint64_t started = call_started()
+        cdef vector[string] values
+        values.resize(len(keys))
+
+        # Keeps the encoded keys alive while the slices point into them.
+        cdef list encoded_keys = [self.encode_key(key) for key in keys]
+        cdef list holds = []
+        cdef vector[Slice] c_keys
+        for key in encoded_keys:
+            c_keys.push_back(hold_slice(key, holds))
+
+        cdef vector[CColumnFamilyHandle*] c_cfs
+        c_cfs.resize(c_keys.size(), self.get_cf_handle(column_family))
+
+        cdef options.ReadOptions opts
+        opts = self.read_opts_from_args(args, kwargs)
+
+        cdef vector[Status] res
+        with nogil:
+            res = self.db.MultiGet(
+                opts,
+                c_cfs,
+                c_keys,
+                cython.address(values))
+        call_finished(CALL_DB_MULTI_GET, started, 0, False)
+
+        cdef dict ret_dict = {}
+        for index in range(len(keys)):
+            if res[index].ok():
+                ret_dict[keys[index]] = string_to_bytes(values[index])
+            elif res[index].IsNotFound():
+                ret_dict[keys[index]] = None
+            else:
+                check_status(res[index])
+
+        return ret_dict
+
+    def multi_get_array(
+            self,
+            keys,
+            *args,
+            value_dtype=None,
+            sorted_input=False,
+            column_family=None,
+            **kwargs):
+
+        cdef options.ReadOptions opts
+        cdef db.ArrayMultiGet* lookup
+        cdef Py_buffer keys_view
+        cdef Py_buffer values_view
+        cdef Py_buffer found_view
+        cdef size_t key_size
+        cdef size_t value_size
+        cdef size_t item_size
+        cdef size_t n
+        cdef int64_t index
+        cdef cpp_bool c_sorted_input = sorted_input
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+
+        self.check_raw_keys('multi_get_array')
+        import numpy
+
+        opts = self.read_opts_from_args(args, kwargs)
+
+        n = get_array_buffer(
+            keys,
+            cython.address(keys_view),
+            cython.address(key_size),
+            PyBUF_SIMPLE)
+        try:
+            lookup = new db.ArrayMultiGet(n)
+        except:
+            PyBuffer_Release(cython.address(keys_view))
+            raise
+
+        try:
+            try:
+                with nogil:
+                    lookup.run(
+                        self.db,
+                        opts,
+                        cf,
+                        <const char*>keys_view.buf,
+                        key_size,
+                        c_sorted_input)
+            finally:
+                PyBuffer_Release(cython.address(keys_view))
+
+            index = lookup.first_error()
+            if index >= 0:
+                check_status(lookup.status(index))
+
+            if value_dtype is None:
+                value_dtype = 'S%i' % max(1, lookup.max_value_size())
+
+            values = numpy.empty(n, dtype=value_dtype)
+            found = numpy.empty(n, dtype=numpy.bool_)
+            value_size = values.dtype.itemsize
+
+            get_array_buffer(
+                found,
+                cython.address(found_view),
+                cython.address(item_size),
+                PyBUF_WRITABLE)
+            try:
+                get_array_buffer(
+                    values,
+                    cython.address(values_view),
+                    cython.address(item_size),
+                    PyBUF_WRITABLE)
+                try:
+                    with nogil:
+                        index = lookup.copy_values(
+                            <char*>values_view.buf,
+                            value_size,
+                            <unsigned char*>found_view.buf)
+                finally:
+                    PyBuffer_Release(cython.address(values_view))
+            finally:
+                PyBuffer_Release(cython.address(found_view))
+
+            if index >= 0:
+                msg = "Value of key %i has %i bytes, value_dtype only %i"
+                raise ValueError(msg % (index, lookup.value_size(index), value_size))
+        finally:
+            del lookup
+
+        return values, found
+
+    def key_may_exist(
+            self,
+            key,
+            fetch=False,
+            *args,
+            column_family=None,
+            **kwargs):
+
+        cdef uint64_t started = call_started()
+        cdef string value
+        cdef cpp_bool value_found
+        cdef cpp_bool exists
+        cdef options.ReadOptions opts
+        cdef Slice c_key
+        cdef CColumnFamilyHandle* cf
+        opts = self.read_opts_from_args(args, kwargs)
+
+        cdef list holds = []
+        cf = self.get_cf_handle(column_family)
+        key = self.encode_key(key)
+        c_key = hold_slice(key, holds)
+        exists = False
+
+        if fetch:
+            value_found = False
+            with nogil:
+                exists = self.db.KeyMayExist(
+                    opts,
+                    cf,
+                    c_key,
+                    cython.address(value),
+                    cython.address(value_found))
+            call_finished(CALL_DB_KEY_MAY_EXIST, started, 0, False)
+
+            if exists:
+                if value_found:
+                    return (True, string_to_bytes(value))
+                else:
+                    return (True, None)
+            else:
+                return (False, None)
+        else:
+            with nogil:
+                exists = self.db.KeyMayExist(
+                    opts,
+                    cf,
+                    c_key,
+                    cython.address(value),
+                    NULL)
+            call_finished(CALL_DB_KEY_MAY_EXIST, started, 0, False)
+
+            return (exists, None)
+
+    def iterkeys(
+            self,
+            *args,
+            column_family=None,
+            batch_size=0,
+            iterate_upper_bound=None,
+            **kwargs):
+
+        cdef options.ReadOptions opts
+        cdef KeysIterator it
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+
+        opts = self.read_opts_from_args(args, kwargs)
+        it = KeysIterator(self)
+        it.batch_size = batch_size
+        it.set_upper_bound(cython.address(opts), iterate_upper_bound)
+
+        with nogil:
+            it.ptr = self.db.NewIterator(opts, cf)
+        return it
+
+    def itervalues(
+            self,
+            *args,
+            column_family=None,
+            batch_size=0,
+            iterate_upper_bound=None,
+            **kwargs):
+
+        cdef options.ReadOptions opts
+        cdef ValuesIterator it
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+
+        opts = self.read_opts_from_args(args, kwargs)
+        it = ValuesIterator(self)
+        it.batch_size = batch_size
+        it.set_upper_bound(cython.address(opts), iterate_upper_bound)
+
+        with nogil:
+            it.ptr = self.db.NewIterator(opts, cf)
+        return it
+
+    def iteritems(
+            self,
+            *args,
+            column_family=None,
+            batch_size=0,
+            iterate_upper_bound=None,
+            **kwargs):
+
+        cdef options.ReadOptions opts
+        cdef ItemsIterator it
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+
+        opts = self.read_opts_from_args(args, kwargs)
+        it = ItemsIterator(self)
+        it.batch_size = batch_size
+        it.set_upper_bound(cython.address(opts), iterate_upper_bound)
+
+        with nogil:
+            it.ptr = self.db.NewIterator(opts, cf)
+        return it
+
+    def scan_to_buffers(
+            self,
+            start=None,
+            end=None,
+            prefix=None,
+            limit=None,
+            snapshot=None,
+            keys=True,
+            values=True,
+            projection=None,
+            batch_size=65536,
+            fill_cache=True,
+            column_family=None):
+
+        cdef Status st
+        cdef options.ReadOptions opts
+        cdef iterator.Iterator* it
+        cdef Slice c_start
+        cdef Slice c_end
+        cdef Slice c_prefix
+        cdef const Slice* prefix_ptr = NULL
+        cdef size_t remaining
+        cdef size_t n
+        cdef size_t count
+        cdef ScanBuffer key_data
+        cdef ScanBuffer key_offsets
+        cdef ScanBuffer value_data
+        cdef ScanBuffer value_offsets
+        cdef string* key_data_ptr
+        cdef string* value_data_ptr
+        cdef vector[int64_t]* key_offsets_ptr
+        cdef vector[int64_t]* value_offsets_ptr
+        cdef cpp_bool has_start = start is not None
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+
+        self.check_raw_keys('scan_to_buffers')
+        if prefix is not None and start is not None:
+            raise ValueError("Only one of start and prefix can be given")
+
+        if limit is None:
+            remaining = <size_t>-1
+        else:
+            remaining = limit
+
+        if projection is not None and batch_size < 1:
+            raise ValueError("batch_size must be positive")
+
+        opts = self.read_opts_from_args(
+            (), {'fill_cache': fill_cache, 'snapshot': snapshot})
+
+        # Copies, because the iterator uses them after the buffers of
+        # other objects would be released.
+        if start is not None:
+            start = slice_to_bytes(bytes_to_slice(start))
+            c_start = bytes_to_slice(start)
+
+        if prefix is not None:
+            prefix = slice_to_bytes(bytes_to_slice(prefix))
+            c_prefix = bytes_to_slice(prefix)
+            prefix_ptr = cython.address(c_prefix)
+
+        if end is not None:
+            end = slice_to_bytes(bytes_to_slice(end))
+            c_end = bytes_to_slice(end)
+            opts.iterate_upper_bound = cython.address(c_end)
+
+        with nogil:
+            it = self.db.NewIterator(opts, cf)
+
+        try:
+            with nogil:
+                if prefix_ptr != NULL:
+                    it.Seek(c_prefix)
+                elif has_start:
+                    it.Seek(c_start)
+                else:
+                    it.SeekToFirst()
+            check_status(it.status())
+
+            results = []
+            while True:
+                n = remaining
+                if projection is not None and n > <size_t>batch_size:
+                    n = batch_size
+
+                key_data = key_offsets = value_data = value_offsets = None
+                key_data_ptr = value_data_ptr = NULL
+                key_offsets_ptr = value_offsets_ptr = NULL
+
+                if keys:
+                    key_data = ScanBuffer()
+                    key_offsets = ScanBuffer()
+                    key_offsets.is_offsets = True
+                    key_data_ptr = cython.address(key_data.data)
+                    key_offsets_ptr = cython.address(key_offsets.offsets)
+
+                if values:
+                    value_data = ScanBuffer()
+                    value_offsets = ScanBuffer()
+                    value_offsets.is_offsets = True
+                    value_data_ptr = cython.address(value_data.data)
+                    value_offsets_ptr = cython.address(value_offsets.offsets)
+
+                with nogil:
+                    st = iterator.iterator_next_batch(
+                        it,
+                        n,
+                        False,
+                        prefix_ptr,
+                        key_data_ptr,
+                        key_offsets_ptr,
+                        value_data_ptr,
+                        value_offsets_ptr,
+                        cython.address(count))
+                check_status(st)
+                remaining -= count
+
+                batch = {
+                    'count': count,
+                    'keys': key_data,
+                    'key_offsets': key_offsets,
+                    'values': value_data,
+                    'value_offsets': value_offsets}
+
+                if projection is None:
+                    return batch
+
+                if count > 0:
+                    results.append(projection(batch))
+
+                if count < n or remaining == 0:
+                    return results
+        finally:
+            with nogil:
+                del it
+
+    def snapshot(self):
+        return Snapshot(self)
+
+    def get_property(self, prop, column_family=None):
+        cdef string value
+        cdef list holds = []
+        cdef Slice c_prop = hold_slice(prop, holds)
+        cdef cpp_bool ret = False
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
+
+        with nogil:
+            ret = self.db.GetProperty(cf, c_prop, cython.address(value))
+
+        if ret:
+            return string_to_bytes(value)
+        else:
+            return None
+
+    def get_statistics(self):
+        if self.opts.py_statistics is None:
+            return None
+        return self.opts.py_statistics.snapshot()
+
+    def get_live_files_metadata(self):
+        cdef vector[db.LiveFileMetaData] metadata
+
+        with nogil:
+            self.db.GetLiveFilesMetaData(cython.address(metadata))
+
+        ret = []
+        for ob in metadata:
+            t = {}
+            t['column_family_name'] = string_to_bytes(ob.column_family_name)
+            t['name'] = string_to_path(ob.name)
+            t['level'] = ob.level
+            t['size'] = ob.size
+            t['smallestkey'] = string_to_bytes(ob.smallestkey)
+            t['largestkey'] = string_to_bytes(ob.largestkey)
+            t['smallest_seqno'] = ob.smallest_seqno
+            t['largest_seqno'] = ob.largest_seqno
 
-    property purge_redundant_kvs_while_flush:
-        def __get__(self):
-            return self.opts.purge_redundant_kvs_while_flush
-        def __set__(self, value):
-            self.opts.purge_redundant_kvs_while_flush = value
+            ret.append(t)
 
-    property allow_os_buffer:
-        def __get__(self):
-            return self.opts.allow_os_buffer
-        def __set__(self, value):
-            self.opts.allow_os_buffer = value
+        return ret
 
-    property allow_mmap_reads:
+    property latest_sequence_number:
         def __get__(self):
-            return self.opts.allow_mmap_reads
-        def __set__(self, value):
-            self.opts.allow_mmap_reads = value
+            return self.db.GetLatestSequenceNumber()
 
-    property allow_mmap_writes:
-        def __get__(self):
-            return self.opts.allow_mmap_writes
-        def __set__(self, value):
-            self.opts.allow_mmap_writes = value
+    def get_sorted_wal_files(self):
+        cdef Status st
+        cdef transaction_log.VectorLogPtr files
+        cdef size_t i
+        cdef transaction_log.LogFile* log_file
 
-    property is_fd_close_on_exec:
-        def __get__(self):
-            return self.opts.is_fd_close_on_exec
-        def __set__(self, value):
-            self.opts.is_fd_close_on_exec = value
+        with nogil:
+            st = self.db.GetSortedWalFiles(files)
+        check_status(st)
 
-    property skip_log_error_on_recovery:
-        def __get__(self):
-            return self.opts.skip_log_error_on_recovery
-        def __set__(self, value):
-            self.opts.skip_log_error_on_recovery = value
+        ret = []
+        for i in range(files.size()):
+            log_file = files[i].get()
+            t = {}
+            t['path_name'] = string_to_path(log_file.PathName())
+            t['log_number'] = log_file.LogNumber()
+            if log_file.Type() == transaction_log.kArchivedLogFile:
+                t['type'] = 'archived'
+            else:
+                t['type'] = 'alive'
+            t['start_sequence'] = log_file.StartSequence()
+            t['size_file_bytes'] = log_file.SizeFileBytes()
+            ret.append(t)
 
-    property stats_dump_period_sec:
-        def __get__(self):
-            return self.opts.stats_dump_period_sec
-        def __set__(self, value):
-            self.opts.stats_dump_period_sec = value
+        return ret
 
-    property advise_random_on_open:
-        def __get__(self):
-            return self.opts.advise_random_on_open
-        def __set__(self, value):
-            self.opts.advise_random_on_open = value
+    def get_updates_since(self, sequence, batch_size=1000):
+        return UpdatesIterator(self, sequence, batch_size)
 
-    property use_adaptive_mutex:
-        def __get__(self):
-            return self.opts.use_adaptive_mutex
-        def __set__(self, value):
-            self.opts.use_adaptive_mutex = value
+    def get_approximate_sizes(
+            self,
+            ranges,
+            include_memtables=False,
+            column_family=None):
 
-    property bytes_per_sync:
-        def __get__(self):
-            return self.opts.bytes_per_sync
-        def __set__(self, value):
-            self.opts.bytes_per_sync = value
+        cdef vector[CRange] c_ranges
+        cdef vector[uint64_t] sizes
+        cdef options.SizeApproximationOptions size_opts
+        cdef Status st
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
 
-    property verify_checksums_in_compaction:
-        def __get__(self):
-            return self.opts.verify_checksums_in_compaction
-        def __set__(self, value):
-            self.opts.verify_checksums_in_compaction = value
+        size_opts.include_files = True
+        size_opts.include_memtables = bool(include_memtables)
 
-    property compaction_style:
-        def __get__(self):
-            if self.opts.compaction_style == kCompactionStyleLevel:
-                return 'level'
-            if self.opts.compaction_style == kCompactionStyleUniversal:
-                return 'universal'
-            raise Exception("Unknown compaction_style")
+        # The slices point into the keys, 'ranges' keeps them alive.
+        ranges = [(self.encode_key(begin), self.encode_key(end)) for begin, end in ranges]
+        cdef list holds = []
+        for begin, end in ranges:
+            c_ranges.push_back(
+                db.Range(hold_slice(begin, holds), hold_slice(end, holds)))
 
-        def __set__(self, str value):
-            if value == 'level':
-                self.opts.compaction_style = kCompactionStyleLevel
-            elif value == 'universal':
-                self.opts.compaction_style = kCompactionStyleUniversal
-            else:
-                raise Exception("Unknown compaction style")
+        if c_ranges.empty():
+            return []
 
-    property compaction_options_universal:
-        def __get__(self):
-            cdef universal_compaction.CompactionOptionsUniversal uopts
-            cdef dict ret_ob = {}
+        sizes.resize(c_ranges.size())
+        with nogil:
+            st = self.db.GetApproximateSizes(
+                size_opts,
+                cf,
+                c_ranges.data(),
+                c_ranges.size(),
+                sizes.data())
+        check_status(st)
 
-            uopts = self.opts.compaction_options_universal
+        return [size for size in sizes]
 
-            ret_ob['size_ratio'] = uopts.size_ratio
-            ret_ob['min_merge_width'] = uopts.min_merge_width
-            ret_ob['max_merge_width'] = uopts.max_merge_width
-            ret_ob['max_size_amplification_percent'] = uopts.max_size_amplification_percent
-            ret_ob['compression_size_percent'] = uopts.compression_size_percent
+    def split_key_ranges(self, size_t n, column_family=None):
+        cdef vector[string] boundaries
+        cdef Status st
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
 
-            if uopts.stop_style == kCompactionStopStyleSimilarSize:
-                ret_ob['stop_style'] = 'similar_size'
-            elif uopts.stop_style == kCompactionStopStyleTotalSize:
-                ret_ob['stop_style'] = 'total_size'
+        with nogil:
+            st = db.split_key_ranges(self.db, cf, n, cython.address(boundaries))
+        check_status(st)
+
+        keys = [None]
+        keys.extend([self.decode_key(string_to_bytes(key)) for key in boundaries])
+        keys.append(None)
+        return list(zip(keys[:-1], keys[1:]))
+
+    def parallel_scan(
+            self,
+            func,
+            n_workers=None,
+            ranges=None,
+            column_family=None,
+            batch_size=1000,
+            **kwargs):
+
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+
+        if ranges is None:
+            ranges = self.split_key_ranges(n_workers, column_family)
+
+        def scan(key_range):
+            begin, end = key_range
+            it = self.iteritems(
+                column_family=column_family,
+                batch_size=batch_size,
+                iterate_upper_bound=end,
+                **kwargs)
+
+            if begin is None:
+                it.seek_to_first()
             else:
-                raise Exception("Unknown compaction style")
+                it.seek(begin)
+            return func(it)
+
+        # The iterators read their batches without the GIL,
+        # so the threads scan in parallel.
+        pool = ThreadPool(n_workers)
+        try:
+            return pool.map(scan, ranges, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+    def flush(self, wait=True, column_family=None):
+        cdef Status st
+        cdef options.FlushOptions c_options
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
 
-            return ret_ob
+        c_options.wait = wait
+        with nogil:
+            st = self.db.Flush(c_options, cf)
+        check_status(st)
 
-        def __set__(self, dict value):
-            cdef universal_compaction.CompactionOptionsUniversal* uopts
-            uopts = cython.address(self.opts.compaction_options_universal)
+    def ingest_external_file(
+            self,
+            paths,
+            move_files=False,
+            snapshot_consistency=True,
+            allow_global_seqno=True,
+            allow_blocking_flush=True,
+            column_family=None):
 
-            if 'size_ratio' in value:
-                uopts.size_ratio  = value['size_ratio']
+        cdef Status st
+        cdef vector[string] c_paths
+        cdef options.IngestExternalFileOptions c_options
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
 
-            if 'min_merge_width' in value:
-                uopts.min_merge_width = value['min_merge_width']
+        if isinstance(paths, (bytes, unicode)):
+            paths = [paths]
 
-            if 'max_merge_width' in value:
-                uopts.max_merge_width = value['max_merge_width']
+        for path in paths:
+            c_paths.push_back(path_to_string(path))
 
-            if 'max_size_amplification_percent' in value:
-                uopts.max_size_amplification_percent = value['max_size_amplification_percent']
+        c_options.move_files = move_files
+        c_options.snapshot_consistency = snapshot_consistency
+        c_options.allow_global_seqno = allow_global_seqno
+        c_options.allow_blocking_flush = allow_blocking_flush
 
-            if 'compression_size_percent' in value:
-                uopts.compression_size_percent = value['compression_size_percent']
+        with nogil:
+            st = self.db.IngestExternalFile(cf, c_paths, c_options)
+        check_status(st)
 
-            if 'stop_style' in value:
-                if value['stop_style'] == 'similar_size':
-                    uopts.stop_style = kCompactionStopStyleSimilarSize
-                elif value['stop_style'] == 'total_size':
-                    uopts.stop_style = kCompactionStopStyleTotalSize
-                else:
-                    raise Exception("Unknown compaction style")
+    def compact_range(
+            self,
+            begin=None,
+            end=None,
+            column_family=None,
+            background=False,
+            **py_options):
 
-    property filter_deletes:
-        def __get__(self):
-            return self.opts.filter_deletes
-        def __set__(self, value):
-            self.opts.filter_deletes = value
+        cdef options.CompactRangeOptions c_options
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
 
-    property max_sequential_skip_in_iterations:
-        def __get__(self):
-            return self.opts.max_sequential_skip_in_iterations
-        def __set__(self, value):
-            self.opts.max_sequential_skip_in_iterations = value
+        if background:
+            return _run_in_background(
+                self.compact_range,
+                begin,
+                end,
+                column_family,
+                **py_options)
 
-    property inplace_update_support:
-        def __get__(self):
-            return self.opts.inplace_update_support
-        def __set__(self, value):
-            self.opts.inplace_update_support = value
+        c_options.change_level = py_options.get('change_level', False)
+        c_options.target_level = py_options.get('target_level', -1)
 
-    property table_factory:
-        def __get__(self):
-            return self.py_table_factory
+        blc = py_options.get('bottommost_level_compaction', 'if_compaction_filter')
+        if blc == 'skip':
+            c_options.bottommost_level_compaction = options.blc_skip
+        elif blc == 'if_compaction_filter':
+            c_options.bottommost_level_compaction = options.blc_is_filter
+        elif blc == 'force':
+            c_options.bottommost_level_compaction = options.blc_force
+        else:
+            raise ValueError("bottommost_level_compaction is not valid")
 
-        def __set__(self, PyTableFactory value):
-            self.py_table_factory = value
-            self.opts.table_factory = value.get_table_factory()
+        cdef Status st
+        cdef Slice begin_val
+        cdef Slice end_val
 
-    property memtable_factory:
-        def __get__(self):
-            return self.py_memtable_factory
+        cdef Slice* begin_ptr
+        cdef Slice* end_ptr
 
-        def __set__(self, PyMemtableFactory value):
-            self.py_memtable_factory = value
-            self.opts.memtable_factory = value.get_memtable_factory()
+        cdef list holds = []
+        begin_ptr = NULL
+        end_ptr = NULL
 
-    property inplace_update_num_locks:
-        def __get__(self):
-            return self.opts.inplace_update_num_locks
-        def __set__(self, value):
-            self.opts.inplace_update_num_locks = value
+        if begin is not None:
+            begin = self.encode_key(begin)
+            begin_val = hold_slice(begin, holds)
+            begin_ptr = cython.address(begin_val)
 
-    property comparator:
-        def __get__(self):
-            return self.py_comparator.get_ob()
+        if end is not None:
+            end = self.encode_key(end)
+            end_val = hold_slice(end, holds)
+            end_ptr = cython.address(end_val)
 
-        def __set__(self, value):
-            if isinstance(value, PyComparator):
-                if (<PyComparator?>value).get_comparator() == NULL:
-                    raise Exception("Cannot set %s as comparator" % value)
-                else:
-                    self.py_comparator = value
-            else:
-                self.py_comparator = PyGenericComparator(value)
+        with nogil:
+            st = self.db.CompactRange(c_options, cf, begin_ptr, end_ptr)
+        check_status(st)
 
-            self.opts.comparator = self.py_comparator.get_comparator()
+    def compact_files(
+            self,
+            files,
+            int output_level,
+            output_file_size_limit=None,
+            column_family=None):
 
-    property merge_operator:
-        def __get__(self):
-            if self.py_merge_operator is None:
-                return None
-            return self.py_merge_operator.get_ob()
+        cdef Status st
+        cdef vector[string] c_files
+        cdef vector[string] output_files
+        cdef options.CompactionOptions c_options
+        cdef CColumnFamilyHandle* cf = self.get_cf_handle(column_family)
 
-        def __set__(self, value):
-            self.py_merge_operator = PyMergeOperator(value)
-            self.opts.merge_operator = self.py_merge_operator.get_operator()
+        for path in files:
+            c_files.push_back(path_to_string(path))
 
-    property prefix_extractor:
-        def __get__(self):
-            if self.py_prefix_extractor is None:
-                return None
-            return self.py_prefix_extractor.get_ob()
+        if output_file_size_limit is not None:
+            c_options.output_file_size_limit = output_file_size_limit
 
-        def __set__(self, value):
-            self.py_prefix_extractor = PySliceTransform(value)
-            self.opts.prefix_extractor = self.py_prefix_extractor.get_transformer()
+        with nogil:
+            st = self.db.CompactFiles(
+                c_options,
+                cf,
+                c_files,
+                output_level,
+                -1,
+                cython.address(output_files))
+        check_status(st)
 
-    property row_cache:
-        def __get__(self):
-            return self.py_row_cache
+        return [string_to_path(path) for path in output_files]
 
-        def __set__(self, value):
-            if value is None:
-                self.py_row_cache = None
-                self.opts.row_cache.reset()
-            elif not isinstance(value, PyCache):
-                raise Exception("row_cache must be a Cache object")
-            else:
-                self.py_row_cache = value
-                self.opts.row_cache = self.py_row_cache.get_cache()
+    def pause_background_work(self):
+        cdef Status st
+        with nogil:
+            st = self.db.PauseBackgroundWork()
+        check_status(st)
 
+    def continue_background_work(self):
+        cdef Status st
+        with nogil:
+            st = self.db.ContinueBackgroundWork()
+        check_status(st)
 
-# Forward declaration
-cdef class Snapshot
+    def wait_for_compact(self, timeout=None, flush=False):
+        cdef Status st
+        cdef int64_t timeout_micros = -1
+        cdef cpp_bool c_flush = flush
 
-cdef class KeysIterator
-cdef class ValuesIterator
-cdef class ItemsIterator
-cdef class ReversedIterator
+        if timeout is not None:
+            timeout_micros = <int64_t>(timeout * 1000000)
 
-# Forward declaration
-cdef class WriteBatchIterator
+        with nogil:
+            st = db.wait_for_compact(self.db, timeout_micros, c_flush)
 
-cdef class WriteBatch(object):
-    cdef db.WriteBatch* batch
+        if st.IsTimedOut():
+            return False
+        check_status(st)
+        return True
 
-    def __cinit__(self, data=None):
-        self.batch = NULL
-        if data is not None:
-            self.batch = new db.WriteBatch(bytes_to_string(data))
-        else:
-            self.batch = new db.WriteBatch()
+    @staticmethod
+    def __parse_read_opts(
+        verify_checksums=False,
+        fill_cache=True,
+        snapshot=None,
+        read_tier="all"):
 
-    def __dealloc__(self):
-        if not self.batch == NULL:
-            del self.batch
+        # TODO: Is this really effiencet ?
+        return locals()
 
-    def put(self, key, value):
-        self.batch.Put(bytes_to_slice(key), bytes_to_slice(value))
+    # Used by the objects reading through this DB, like WriteBatchWithIndex.
+    cdef options.ReadOptions read_opts_from_args(self, tuple args, dict kwargs):
+        cdef uint64_t started = call_started()
+        cdef options.ReadOptions opts
+        opts = self.build_read_opts(self.__parse_read_opts(*args, **kwargs))
+        call_finished(CALL_DB_READ_OPTS, started, 0, False)
+        return opts
 
-    def merge(self, key, value):
-        self.batch.Merge(bytes_to_slice(key), bytes_to_slice(value))
+    cdef options.ReadOptions build_read_opts(self, dict py_opts):
+        cdef options.ReadOptions opts
+        opts.verify_checksums = py_opts['verify_checksums']
+        opts.fill_cache = py_opts['fill_cache']
+        if py_opts['snapshot'] is not None:
+            opts.snapshot = (<Snapshot?>(py_opts['snapshot'])).ptr
 
-    def delete(self, key):
-        self.batch.Delete(bytes_to_slice(key))
+        if py_opts['read_tier'] == "all":
+            opts.read_tier = options.kReadAllTier
+        elif py_opts['read_tier'] == 'cache':
+            opts.read_tier = options.kBlockCacheTier
+        else:
+            raise ValueError("Invalid read_tier")
 
-    def clear(self):
-        self.batch.Clear()
+        return opts
 
-    def data(self):
-        return string_to_bytes(self.batch.Data())
+    property options:
+        def __get__(self):
+            return self.opts
 
-    def count(self):
-        return self.batch.Count()
 
-    def __iter__(self):
-        return WriteBatchIterator(self)
+@cython.no_gc_clear
+cdef class TransactionDB(DB):
+    cdef transaction_db.TransactionDB* txn_db
+    cdef transaction_db.TransactionDBOptions txn_db_opts
 
+    def __cinit__(self, *args, **kwargs):
+        self.txn_db = NULL
 
-@cython.internal
-cdef class WriteBatchIterator(object):
-    # Need a reference to the WriteBatch.
-    # The BatchItems are only pointers to the memory in WriteBatch.
-    cdef WriteBatch batch
-    cdef vector[db.BatchItem] items
-    cdef size_t pos
+    def __init__(
+            self,
+            db_name,
+            Options opts,
+            column_families=None,
+            max_num_locks=-1,
+            num_stripes=16,
+            transaction_lock_timeout=1000,
+            default_lock_timeout=1000):
+
+        self.txn_db_opts.max_num_locks = max_num_locks
+        self.txn_db_opts.num_stripes = num_stripes
+        self.txn_db_opts.transaction_lock_timeout = transaction_lock_timeout
+        self.txn_db_opts.default_lock_timeout = default_lock_timeout
+
+        DB.__init__(self, db_name, opts, column_families=column_families)
+
+    cdef Status open_db(
+            self,
+            Options opts,
+            const string& db_path,
+            cpp_bool read_only,
+            vector[CColumnFamilyDescriptor]* descriptors,
+            vector[CColumnFamilyHandle*]* handles):
 
-    def __init__(self, WriteBatch batch):
         cdef Status st
 
-        self.batch = batch
-        self.pos = 0
+        if descriptors == NULL:
+            with nogil:
+                st = transaction_db.TransactionDB_Open(
+                    deref(opts.opts),
+                    self.txn_db_opts,
+                    db_path,
+                    cython.address(self.txn_db))
+        else:
+            with nogil:
+                st = transaction_db.TransactionDB_OpenColumnFamilies(
+                    deref(opts.opts),
+                    self.txn_db_opts,
+                    db_path,
+                    deref(descriptors),
+                    handles,
+                    cython.address(self.txn_db))
 
-        st = db.get_batch_items(batch.batch, cython.address(self.items))
-        check_status(st)
+        self.db = self.txn_db
+        return st
 
-    def __iter__(self):
-        return self
+    def begin_transaction(
+            self,
+            sync=False,
+            disable_wal=False,
+            set_snapshot=False,
+            lock_timeout=-1,
+            deadlock_detect=False,
+            expiration=-1):
+
+        cdef options.WriteOptions write_opts
+        cdef transaction_db.TransactionOptions txn_opts
+        cdef Transaction txn = Transaction(self)
+
+        write_opts.sync = sync
+        write_opts.disableWAL = disable_wal
+        txn_opts.set_snapshot = set_snapshot
+        txn_opts.lock_timeout = lock_timeout
+        txn_opts.deadlock_detect = deadlock_detect
+        txn_opts.expiration = expiration
 
-    def __next__(self):
-        if self.pos == self.items.size():
-            raise StopIteration()
+        with nogil:
+            txn.ptr = self.txn_db.BeginTransaction(write_opts, txn_opts)
+        return txn
 
-        cdef str op
 
-        if self.items[self.pos].op == db.BatchItemOpPut:
-            op = "Put"
-        elif self.items[self.pos].op == db.BatchItemOpMerge:
-            op = "Merge"
-        elif self.items[self.pos].op == db.BatchItemOpDelte:
-            op = "Delete"
+@cython.no_gc_clear
+cdef class OptimisticTransactionDB(DB):
+    cdef transaction_db.OptimisticTransactionDB* txn_db
 
-        ret = (
-            op,
-            slice_to_bytes(self.items[self.pos].key),
-            slice_to_bytes(self.items[self.pos].value))
+    def __cinit__(self, *args, **kwargs):
+        self.txn_db = NULL
 
-        self.pos += 1
-        return ret
+    def __init__(self, db_name, Options opts, column_families=None):
+        DB.__init__(self, db_name, opts, column_families=column_families)
 
-@cython.no_gc_clear
-cdef class DB(object):
-    cdef Options opts
-    cdef db.DB* db
+    cdef Status open_db(
+            self,
+            Options opts,
+            const string& db_path,
+            cpp_bool read_only,
+            vector[CColumnFamilyDescriptor]* descriptors,
+            vector[CColumnFamilyHandle*]* handles):
 
-    def __cinit__(self, db_name, Options opts, read_only=False):
         cdef Status st
-        cdef string db_path
-        self.db = NULL
-        self.opts = None
-
-        if opts.in_use:
-            raise Exception("Options object is already used by another DB")
 
-        db_path = path_to_string(db_name)
-        if read_only:
+        if descriptors == NULL:
             with nogil:
-                st = db.DB_OpenForReadOnly(
+                st = transaction_db.OptimisticTransactionDB_Open(
                     deref(opts.opts),
                     db_path,
-                    cython.address(self.db),
-                    False)
+                    cython.address(self.txn_db))
         else:
             with nogil:
-                st = db.DB_Open(
+                st = transaction_db.OptimisticTransactionDB_OpenColumnFamilies(
                     deref(opts.opts),
                     db_path,
-                    cython.address(self.db))
-        check_status(st)
+                    deref(descriptors),
+                    handles,
+                    cython.address(self.txn_db))
 
-        # Inject the loggers into the python callbacks
-        cdef shared_ptr[logger.Logger] info_log = self.db.GetOptions().info_log
-        if opts.py_comparator is not None:
-            opts.py_comparator.set_info_log(info_log)
+        self.db = self.txn_db
+        return st
 
-        if opts.py_table_factory is not None:
-            opts.py_table_factory.set_info_log(info_log)
+    def begin_transaction(self, sync=False, disable_wal=False, set_snapshot=False):
+        cdef options.WriteOptions write_opts
+        cdef transaction_db.OptimisticTransactionOptions txn_opts
+        cdef Transaction txn = Transaction(self)
 
-        if opts.prefix_extractor is not None:
-            opts.py_prefix_extractor.set_info_log(info_log)
+        write_opts.sync = sync
+        write_opts.disableWAL = disable_wal
+        txn_opts.set_snapshot = set_snapshot
 
-        self.opts = opts
-        self.opts.in_use = True
+        with nogil:
+            txn.ptr = self.txn_db.BeginTransaction(write_opts, txn_opts)
+        return txn
 
-    def __dealloc__(self):
-        if not self.db == NULL:
-            with nogil:
-                del self.db
 
-        if self.opts is not None:
-            self.opts.in_use = False
+@cython.no_gc_clear
+@cython.internal
+cdef class Transaction(object):
+    cdef transaction_db.Transaction* ptr
+    cdef DB db
+    cdef cpp_bool finished
 
-    def put(self, key, value, sync=False, disable_wal=False):
-        cdef Status st
-        cdef options.WriteOptions opts
-        opts.sync = sync
-        opts.disableWAL = disable_wal
+    def __cinit__(self, DB db):
+        self.db = db
+        self.ptr = NULL
+        self.finished = False
 
-        cdef Slice c_key = bytes_to_slice(key)
-        cdef Slice c_value = bytes_to_slice(value)
+    def __dealloc__(self):
+        # A transaction which is neither committed nor rolled back
+        # is rolled back by the destructor.
+        if not self.ptr == NULL:
+            with nogil:
+                del self.ptr
 
-        with nogil:
-            st = self.db.Put(opts, c_key, c_value)
-        check_status(st)
+    cdef check_active(self):
+        if self.finished:
+            raise Exception("Transaction is already committed or rolled back")
+
+    # Without an explicit snapshot the reads use the one of the transaction.
+    cdef options.ReadOptions read_opts_from_args(self, tuple args, dict kwargs):
+        cdef options.ReadOptions opts = self.db.read_opts_from_args(args, kwargs)
+        if opts.snapshot == NULL:
+            opts.snapshot = self.ptr.GetSnapshot()
+        return opts
 
-    def delete(self, key, sync=False, disable_wal=False):
+    def put(self, key, value, column_family=None):
         cdef Status st
-        cdef options.WriteOptions opts
-        opts.sync = sync
-        opts.disableWAL = disable_wal
+        cdef list holds = []
+        key = self.db.encode_key(key)
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef Slice c_value = hold_slice(value, holds)
+        cdef CColumnFamilyHandle* cf = self.db.get_cf_handle(column_family)
 
-        cdef Slice c_key = bytes_to_slice(key)
+        self.check_active()
         with nogil:
-            st = self.db.Delete(opts, c_key)
+            st = self.ptr.Put(cf, c_key, c_value)
         check_status(st)
 
-    def merge(self, key, value, sync=False, disable_wal=False):
+    def merge(self, key, value, column_family=None):
         cdef Status st
-        cdef options.WriteOptions opts
-        opts.sync = sync
-        opts.disableWAL = disable_wal
+        cdef list holds = []
+        key = self.db.encode_key(key)
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef Slice c_value = hold_slice(value, holds)
+        cdef CColumnFamilyHandle* cf = self.db.get_cf_handle(column_family)
 
-        cdef Slice c_key = bytes_to_slice(key)
-        cdef Slice c_value = bytes_to_slice(value)
+        self.check_active()
         with nogil:
-            st = self.db.Merge(opts, c_key, c_value)
+            st = self.ptr.Merge(cf, c_key, c_value)
         check_status(st)
 
-    def write(self, WriteBatch batch, sync=False, disable_wal=False):
+    def delete(self, key, column_family=None):
         cdef Status st
-        cdef options.WriteOptions opts
-        opts.sync = sync
-        opts.disableWAL = disable_wal
+        cdef list holds = []
+        key = self.db.encode_key(key)
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef CColumnFamilyHandle* cf = self.db.get_cf_handle(column_family)
 
+        self.check_active()
         with nogil:
-            st = self.db.Write(opts, batch.batch)
+            st = self.ptr.Delete(cf, c_key)
         check_status(st)
 
-    def get(self, key, *args, **kwargs):
+    def get(self, key, *args, column_family=None, **kwargs):
         cdef string res
         cdef Status st
         cdef options.ReadOptions opts
+        cdef list holds = []
+        key = self.db.encode_key(key)
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef CColumnFamilyHandle* cf = self.db.get_cf_handle(column_family)
 
-        opts = self.build_read_opts(self.__parse_read_opts(*args, **kwargs))
-        cdef Slice c_key = bytes_to_slice(key)
+        self.check_active()
+        opts = self.read_opts_from_args(args, kwargs)
 
         with nogil:
-            st = self.db.Get(opts, c_key, cython.address(res))
+            st = self.ptr.Get(opts, cf, c_key, cython.address(res))
 
         if st.ok():
             return string_to_bytes(res)
@@ -1431,209 +4558,241 @@ cdef class DB(object):
         else:
             check_status(st)
 
-    def multi_get(self, keys, *args, **kwargs):
-        cdef vector[string] values
-        values.resize(len(keys))
-
-        cdef vector[Slice] c_keys
-        for key in keys:
-            c_keys.push_back(bytes_to_slice(key))
+    def get_for_update(
+            self,
+            key,
+            *args,
+            exclusive=True,
+            column_family=None,
+            **kwargs):
 
+        cdef string res
+        cdef Status st
         cdef options.ReadOptions opts
-        opts = self.build_read_opts(self.__parse_read_opts(*args, **kwargs))
+        cdef list holds = []
+        key = self.db.encode_key(key)
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef cpp_bool c_exclusive = exclusive
+        cdef CColumnFamilyHandle* cf = self.db.get_cf_handle(column_family)
 
-        cdef vector[Status] res
+        self.check_active()
+        opts = self.read_opts_from_args(args, kwargs)
+
+        # Waiting for the lock happens without the GIL.
         with nogil:
-            res = self.db.MultiGet(
+            st = self.ptr.GetForUpdate(
                 opts,
-                c_keys,
-                cython.address(values))
-
-        cdef dict ret_dict = {}
-        for index in range(len(keys)):
-            if res[index].ok():
-                ret_dict[keys[index]] = string_to_bytes(values[index])
-            elif res[index].IsNotFound():
-                ret_dict[keys[index]] = None
-            else:
-                check_status(res[index])
-
-        return ret_dict
-
-    def key_may_exist(self, key, fetch=False, *args, **kwargs):
-        cdef string value
-        cdef cpp_bool value_found
-        cdef cpp_bool exists
-        cdef options.ReadOptions opts
-        cdef Slice c_key
-        opts = self.build_read_opts(self.__parse_read_opts(*args, **kwargs))
-
-        c_key = bytes_to_slice(key)
-        exists = False
-
-        if fetch:
-            value_found = False
-            with nogil:
-                exists = self.db.KeyMayExist(
-                    opts,
-                    c_key,
-                    cython.address(value),
-                    cython.address(value_found))
+                cf,
+                c_key,
+                cython.address(res),
+                c_exclusive)
 
-            if exists:
-                if value_found:
-                    return (True, string_to_bytes(value))
-                else:
-                    return (True, None)
-            else:
-                return (False, None)
+        if st.ok():
+            return string_to_bytes(res)
+        elif st.IsNotFound():
+            return None
         else:
-            with nogil:
-                exists = self.db.KeyMayExist(
-                    opts,
-                    c_key,
-                    cython.address(value))
+            check_status(st)
 
-            return (exists, None)
+    def iterkeys(
+            self,
+            *args,
+            column_family=None,
+            batch_size=0,
+            iterate_upper_bound=None,
+            **kwargs):
+
+        cdef KeysIterator it = KeysIterator(self.db)
+        it.batch_size = batch_size
+        return self.init_iterator(
+            it,
+            args,
+            kwargs,
+            column_family,
+            iterate_upper_bound)
+
+    def itervalues(
+            self,
+            *args,
+            column_family=None,
+            batch_size=0,
+            iterate_upper_bound=None,
+            **kwargs):
+
+        cdef ValuesIterator it = ValuesIterator(self.db)
+        it.batch_size = batch_size
+        return self.init_iterator(
+            it,
+            args,
+            kwargs,
+            column_family,
+            iterate_upper_bound)
+
+    def iteritems(
+            self,
+            *args,
+            column_family=None,
+            batch_size=0,
+            iterate_upper_bound=None,
+            **kwargs):
+
+        cdef ItemsIterator it = ItemsIterator(self.db)
+        it.batch_size = batch_size
+        return self.init_iterator(
+            it,
+            args,
+            kwargs,
+            column_family,
+            iterate_upper_bound)
+
+    # The iterator sees the writes of this transaction merged over the DB.
+    cdef BaseIterator init_iterator(
+            self,
+            BaseIterator it,
+            tuple args,
+            dict kwargs,
+            column_family,
+            iterate_upper_bound):
 
-    def iterkeys(self, *args, **kwargs):
         cdef options.ReadOptions opts
-        cdef KeysIterator it
+        cdef CColumnFamilyHandle* cf = self.db.get_cf_handle(column_family)
 
-        opts = self.build_read_opts(self.__parse_read_opts(*args, **kwargs))
-        it = KeysIterator(self)
+        self.check_active()
+        opts = self.read_opts_from_args(args, kwargs)
+        it.set_upper_bound(cython.address(opts), iterate_upper_bound)
 
         with nogil:
-            it.ptr = self.db.NewIterator(opts)
-        return it
-
-    def itervalues(self, *args, **kwargs):
-        cdef options.ReadOptions opts
-        cdef ValuesIterator it
-
-        opts = self.build_read_opts(self.__parse_read_opts(*args, **kwargs))
+            it.ptr = self.ptr.GetIterator(opts, cf)
 
-        it = ValuesIterator(self)
-
-        with nogil:
-            it.ptr = self.db.NewIterator(opts)
+        it.parent = self
         return it
 
-    def iteritems(self, *args, **kwargs):
-        cdef options.ReadOptions opts
-        cdef ItemsIterator it
-
-        opts = self.build_read_opts(self.__parse_read_opts(*args, **kwargs))
+    def set_snapshot(self):
+        self.check_active()
+        with nogil:
+            self.ptr.SetSnapshot()
 
-        it = ItemsIterator(self)
+    def set_lock_timeout(self, int64_t timeout):
+        self.check_active()
+        self.ptr.SetLockTimeout(timeout)
 
+    def set_savepoint(self):
+        self.check_active()
         with nogil:
-            it.ptr = self.db.NewIterator(opts)
-        return it
-
-    def snapshot(self):
-        return Snapshot(self)
+            self.ptr.SetSavePoint()
 
-    def get_property(self, prop):
-        cdef string value
-        cdef Slice c_prop = bytes_to_slice(prop)
-        cdef cpp_bool ret = False
+    def rollback_to_savepoint(self):
+        cdef Status st
+        self.check_active()
+        with nogil:
+            st = self.ptr.RollbackToSavePoint()
+        check_status(st)
 
+    def pop_savepoint(self):
+        cdef Status st
+        self.check_active()
         with nogil:
-            ret = self.db.GetProperty(c_prop, cython.address(value))
+            st = self.ptr.PopSavePoint()
+        check_status(st)
 
-        if ret:
-            return string_to_bytes(value)
-        else:
-            return None
+    def commit(self):
+        cdef Status st
+        self.check_active()
+        with nogil:
+            st = self.ptr.Commit()
 
-    def get_live_files_metadata(self):
-        cdef vector[db.LiveFileMetaData] metadata
+        # A failed commit leaves nothing to retry, the caller has to
+        # start a new transaction.
+        self.finished = True
+        check_status(st)
 
+    def rollback(self):
+        cdef Status st
+        self.check_active()
         with nogil:
-            self.db.GetLiveFilesMetaData(cython.address(metadata))
-
-        ret = []
-        for ob in metadata:
-            t = {}
-            t['name'] = string_to_path(ob.name)
-            t['level'] = ob.level
-            t['size'] = ob.size
-            t['smallestkey'] = string_to_bytes(ob.smallestkey)
-            t['largestkey'] = string_to_bytes(ob.largestkey)
-            t['smallest_seqno'] = ob.smallest_seqno
-            t['largest_seqno'] = ob.largest_seqno
+            st = self.ptr.Rollback()
 
-            ret.append(t)
+        self.finished = True
+        check_status(st)
 
-        return ret
+    property num_keys:
+        def __get__(self):
+            return self.ptr.GetNumKeys()
 
-    def compact_range(self, begin=None, end=None, **py_options):
-        cdef options.CompactRangeOptions c_options
+    def __enter__(self):
+        return self
 
-        c_options.change_level = py_options.get('change_level', False)
-        c_options.target_level = py_options.get('target_level', -1)
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.finished:
+            return
 
-        blc = py_options.get('bottommost_level_compaction', 'if_compaction_filter')
-        if blc == 'skip':
-            c_options.bottommost_level_compaction = options.blc_skip
-        elif blc == 'if_compaction_filter':
-            c_options.bottommost_level_compaction = options.blc_is_filter
-        elif blc == 'force':
-            c_options.bottommost_level_compaction = options.blc_force
+        if exc_type is None:
+            self.commit()
         else:
-            raise ValueError("bottommost_level_compaction is not valid")
+            self.rollback()
+
+
+# Runs 'func' in a new thread and returns a future for its result.
+def _run_in_background(func, *args, **kwargs):
+    # Not available on python2 without the 'futures' backport.
+    from concurrent.futures import Future
 
-        cdef Status st
-        cdef Slice begin_val
-        cdef Slice end_val
+    future = Future()
 
-        cdef Slice* begin_ptr
-        cdef Slice* end_ptr
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
 
-        begin_ptr = NULL
-        end_ptr = NULL
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
 
-        if begin is not None:
-            begin_val = bytes_to_slice(begin)
-            begin_ptr = cython.address(begin_val)
+    thread = threading.Thread(target=run)
+    thread.daemon = True
+    thread.start()
+    return future
 
-        if end is not None:
-            end_val = bytes_to_slice(end)
-            end_ptr = cython.address(end_val)
 
-        st = self.db.CompactRange(c_options, begin_ptr, end_ptr)
-        check_status(st)
+# Runs on the thread started by DB.start_catch_up. It holds only a weak
+# reference, so the database is still closed when the last user reference
+# goes away.
+def _catch_up_with_primary(ref, interval, stopped):
+    cdef DB db
 
-    @staticmethod
-    def __parse_read_opts(
-        verify_checksums=False,
-        fill_cache=True,
-        snapshot=None,
-        read_tier="all"):
+    while not stopped.wait(interval):
+        db = ref()
+        if db is None:
+            return
 
-        # TODO: Is this really effiencet ?
-        return locals()
+        try:
+            db.try_catch_up_with_primary()
+            db.catch_up_error = None
+        except Exception as error:
+            # The primary may delete files while they are read,
+            # the next attempt sees the new state. Persistent errors
+            # are visible in last_catch_up_error.
+            db.catch_up_error = error
+        finally:
+            db = None
 
-    cdef options.ReadOptions build_read_opts(self, dict py_opts):
-        cdef options.ReadOptions opts
-        opts.verify_checksums = py_opts['verify_checksums']
-        opts.fill_cache = py_opts['fill_cache']
-        if py_opts['snapshot'] is not None:
-            opts.snapshot = (<Snapshot?>(py_opts['snapshot'])).ptr
 
-        if py_opts['read_tier'] == "all":
-            opts.read_tier = options.kReadAllTier
-        elif py_opts['read_tier'] == 'cache':
-            opts.read_tier = options.kBlockCacheTier
-        else:
-            raise ValueError("Invalid read_tier")
+def list_column_families(db_name, Options opts):
+    cdef Status st
+    cdef string db_path
+    cdef vector[string] column_families
 
-        return opts
+    db_path = path_to_string(db_name)
+    with nogil:
+        st = db.DB_ListColumnFamilies(
+            deref(opts.opts),
+            db_path,
+            cython.address(column_families))
+    check_status(st)
 
-    property options:
-        def __get__(self):
-            return self.opts
+    return [string_to_bytes(name) for name in column_families]
 
 
 def repair_db(db_name, Options opts):
@@ -1663,14 +4822,149 @@ cdef class Snapshot(object):
                 self.db.db.ReleaseSnapshot(self.ptr)
 
 
+@cython.no_gc_clear
+@cython.internal
+cdef class PinnedSlice(object):
+    # Holds the memory of a value returned by DB.get_pinned. As long as
+    # this object is alive the underlying block stays pinned in the block
+    # cache (or memtable), so the value is exposed without any copy.
+    cdef PinnableSlice* ptr
+    cdef DB db
+    cdef Py_ssize_t exports
+
+    def __cinit__(self, DB db):
+        self.db = db
+        self.exports = 0
+        self.ptr = new PinnableSlice()
+
+    def __dealloc__(self):
+        if not self.ptr == NULL:
+            with nogil:
+                del self.ptr
+
+    def __len__(self):
+        return self.ptr.size()
+
+    def __getbuffer__(self, Py_buffer* view, int flags):
+        PyBuffer_FillInfo(
+            view,
+            self,
+            <void*>self.ptr.data(),
+            self.ptr.size(),
+            1,
+            flags)
+        self.exports += 1
+
+    def __releasebuffer__(self, Py_buffer* view):
+        self.exports -= 1
+
+    def tobytes(self):
+        return PyBytes_FromStringAndSize(self.ptr.data(), self.ptr.size())
+
+    def release(self):
+        if self.exports > 0:
+            raise BufferError("PinnedSlice has %i exported buffers" % self.exports)
+        with nogil:
+            self.ptr.Reset()
+
+
+@cython.internal
+cdef class ScanBuffer(object):
+    # Owns the data or offsets buffer filled by DB.scan_to_buffers and
+    # exposes it without copying. Offsets are int64 like the ones of the
+    # arrow large_binary type.
+    cdef string data
+    cdef vector[int64_t] offsets
+    cdef cpp_bool is_offsets
+    cdef Py_ssize_t shape[1]
+    cdef Py_ssize_t strides[1]
+
+    def __cinit__(self):
+        self.is_offsets = False
+
+    def __len__(self):
+        if self.is_offsets:
+            return self.offsets.size()
+        return self.data.size()
+
+    def __getbuffer__(self, Py_buffer* view, int flags):
+        if flags & PyBUF_WRITABLE:
+            raise BufferError("ScanBuffer is read-only")
+
+        view.format = NULL
+        if self.is_offsets:
+            view.buf = <void*>self.offsets.data()
+            view.itemsize = sizeof(int64_t)
+            if flags & PyBUF_FORMAT:
+                view.format = "q"
+        else:
+            view.buf = <void*>self.data.data()
+            view.itemsize = 1
+            if flags & PyBUF_FORMAT:
+                view.format = "B"
+
+        self.shape[0] = len(self)
+        self.strides[0] = view.itemsize
+
+        view.obj = self
+        view.len = self.shape[0] * view.itemsize
+        view.readonly = 1
+        view.ndim = 1
+        view.shape = self.shape
+        view.strides = self.strides
+        view.suboffsets = NULL
+        view.internal = NULL
+
+    def __releasebuffer__(self, Py_buffer* view):
+        pass
+
+    def tobytes(self):
+        if self.is_offsets:
+            return PyBytes_FromStringAndSize(
+                <const char*>self.offsets.data(),
+                self.offsets.size() * sizeof(int64_t))
+        return string_to_bytes(self.data)
+
+
+# Splits a buffer filled by iterator_next_batch into a list of bytes.
+cdef list split_batch_buffer(
+    const string& buf,
+    const vector[size_t]& offsets,
+    size_t count):
+
+    cdef size_t index
+    cdef const char* data = buf.data()
+    return [
+        PyBytes_FromStringAndSize(
+            data + offsets[index],
+            offsets[index + 1] - offsets[index])
+        for index in range(count)]
+
 @cython.internal
 cdef class BaseIterator(object):
     cdef iterator.Iterator* ptr
     cdef DB db
+    # The WriteBatchWithIndex or Transaction this iterator reads from, if any.
+    cdef object parent
+    # The key 'iterate_upper_bound' of the read options points to.
+    cdef bytes upper_bound
+    cdef Slice c_upper_bound
+
+    # Entries which are read by batch but not consumed yet.
+    cdef list batch
+    cdef Py_ssize_t batch_pos
+    cdef size_t batch_size
+    cdef cpp_bool with_keys
+    cdef cpp_bool with_values
 
     def __cinit__(self, DB db):
         self.db = db
         self.ptr = NULL
+        self.batch = []
+        self.batch_pos = 0
+        self.batch_size = 0
+        self.with_keys = False
+        self.with_values = False
 
     def __dealloc__(self):
         if not self.ptr == NULL:
@@ -1680,6 +4974,9 @@ cdef class BaseIterator(object):
         return self
 
     def __next__(self):
+        if self.batch_size > 0:
+            return self.next_buffered(False)
+
         if not self.ptr.Valid():
             raise StopIteration()
 
@@ -1690,38 +4987,162 @@ cdef class BaseIterator(object):
         return ret
 
     def __reversed__(self):
+        self.unread_batch(False)
         return ReversedIterator(self)
 
     cpdef seek_to_first(self):
+        self.reset_batch()
         with nogil:
             self.ptr.SeekToFirst()
         check_status(self.ptr.status())
 
     cpdef seek_to_last(self):
+        self.reset_batch()
         with nogil:
             self.ptr.SeekToLast()
         check_status(self.ptr.status())
 
     cpdef seek(self, key):
-        cdef Slice c_key = bytes_to_slice(key)
+        cdef uint64_t started = call_started()
+        key = self.db.encode_key(key)
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+        self.reset_batch()
         with nogil:
             self.ptr.Seek(c_key)
+        call_finished(CALL_ITERATOR_SEEK, started, 0, status_failed(self.ptr.status()))
         check_status(self.ptr.status())
 
+    def next_batch(self, size_t n):
+        return self.take_batch(n, False)
+
+    # Must be called before the iterator is created from 'opts'.
+    cdef set_upper_bound(self, options.ReadOptions* opts, upper_bound):
+        if upper_bound is None:
+            return
+
+        self.upper_bound = slice_to_bytes(bytes_to_slice(self.db.encode_key(upper_bound)))
+        self.c_upper_bound = Slice(
+            PyBytes_AS_STRING(self.upper_bound),
+            PyBytes_GET_SIZE(self.upper_bound))
+        opts.iterate_upper_bound = cython.address(self.c_upper_bound)
+
     cdef object get_ob(self):
         return None
 
+    cdef object batch_to_list(
+            self,
+            const string& keys,
+            const vector[size_t]& key_offsets,
+            const string& values,
+            const vector[size_t]& value_offsets,
+            size_t count):
+        return None
+
+    cdef reset_batch(self):
+        self.batch = []
+        self.batch_pos = 0
+
+    # Used when the direction changes. The rocksdb iterator is positioned
+    # behind the whole buffer, while the caller has only seen the entries
+    # up to 'batch_pos'. Moves it back to the first entry not returned yet,
+    # where it would be without the buffer. 'reverse' is the direction the
+    # buffer was read in.
+    cdef unread_batch(self, cpp_bool reverse):
+        cdef Status st
+        cdef size_t pending = len(self.batch) - self.batch_pos
+
+        self.reset_batch()
+        with nogil:
+            st = iterator.iterator_unread(self.ptr, pending, reverse)
+        check_status(st)
+
+    cdef list read_batch(self, size_t n, cpp_bool reverse):
+        cdef Status st
+        cdef size_t count = 0
+        cdef string keys
+        cdef string values
+        cdef vector[size_t] key_offsets
+        cdef vector[size_t] value_offsets
+        cdef string* keys_ptr = NULL
+        cdef string* values_ptr = NULL
+
+        if self.with_keys:
+            keys_ptr = cython.address(keys)
+
+        if self.with_values:
+            values_ptr = cython.address(values)
+
+        with nogil:
+            st = iterator.iterator_next_batch(
+                self.ptr,
+                n,
+                reverse,
+                NULL,
+                keys_ptr,
+                cython.address(key_offsets),
+                values_ptr,
+                cython.address(value_offsets),
+                cython.address(count))
+        check_status(st)
+
+        return self.batch_to_list(
+            keys,
+            key_offsets,
+            values,
+            value_offsets,
+            count)
+
+    # Returns up to n entries, pending entries of the buffer come first.
+    cdef list take_batch(self, size_t n, cpp_bool reverse):
+        cdef list ret = self.batch[self.batch_pos:self.batch_pos + n]
+        self.batch_pos += len(ret)
+
+        if <size_t>len(ret) < n:
+            ret.extend(self.read_batch(n - len(ret), reverse))
+        return ret
+
+    cdef object next_buffered(self, cpp_bool reverse):
+        if self.batch_pos == len(self.batch):
+            self.batch = self.read_batch(self.batch_size, reverse)
+            self.batch_pos = 0
+
+            if not self.batch:
+                raise StopIteration()
+
+        cdef object ret = self.batch[self.batch_pos]
+        self.batch_pos += 1
+        return ret
+
 @cython.internal
 cdef class KeysIterator(BaseIterator):
+    def __cinit__(self, DB db):
+        self.with_keys = True
+
     cdef object get_ob(self):
         cdef Slice c_key
         with nogil:
             c_key = self.ptr.key()
         check_status(self.ptr.status())
-        return slice_to_bytes(c_key)
+        return self.db.decode_key(slice_to_bytes(c_key))
+
+    cdef object batch_to_list(
+            self,
+            const string& keys,
+            const vector[size_t]& key_offsets,
+            const string& values,
+            const vector[size_t]& value_offsets,
+            size_t count):
+        ret = split_batch_buffer(keys, key_offsets, count)
+        if self.db.codec is not None:
+            ret = self.db.codec.decode_many(ret)
+        return ret
 
 @cython.internal
 cdef class ValuesIterator(BaseIterator):
+    def __cinit__(self, DB db):
+        self.with_values = True
+
     cdef object get_ob(self):
         cdef Slice c_value
         with nogil:
@@ -1729,8 +5150,21 @@ cdef class ValuesIterator(BaseIterator):
         check_status(self.ptr.status())
         return slice_to_bytes(c_value)
 
+    cdef object batch_to_list(
+            self,
+            const string& keys,
+            const vector[size_t]& key_offsets,
+            const string& values,
+            const vector[size_t]& value_offsets,
+            size_t count):
+        return split_batch_buffer(values, value_offsets, count)
+
 @cython.internal
 cdef class ItemsIterator(BaseIterator):
+    def __cinit__(self, DB db):
+        self.with_keys = True
+        self.with_values = True
+
     cdef object get_ob(self):
         cdef Slice c_key
         cdef Slice c_value
@@ -1738,7 +5172,21 @@ cdef class ItemsIterator(BaseIterator):
             c_key = self.ptr.key()
             c_value = self.ptr.value()
         check_status(self.ptr.status())
-        return (slice_to_bytes(c_key), slice_to_bytes(c_value))
+        return (self.db.decode_key(slice_to_bytes(c_key)), slice_to_bytes(c_value))
+
+    cdef object batch_to_list(
+            self,
+            const string& keys,
+            const vector[size_t]& key_offsets,
+            const string& values,
+            const vector[size_t]& value_offsets,
+            size_t count):
+        ret_keys = split_batch_buffer(keys, key_offsets, count)
+        if self.db.codec is not None:
+            ret_keys = self.db.codec.decode_many(ret_keys)
+        return list(zip(
+            ret_keys,
+            split_batch_buffer(values, value_offsets, count)))
 
 @cython.internal
 cdef class ReversedIterator(object):
@@ -1756,13 +5204,20 @@ cdef class ReversedIterator(object):
     def seek(self, key):
         self.it.seek(key)
 
+    def next_batch(self, size_t n):
+        return self.it.take_batch(n, True)
+
     def __iter__(self):
         return self
 
     def __reversed__(self):
+        self.it.unread_batch(True)
         return self.it
 
     def __next__(self):
+        if self.it.batch_size > 0:
+            return self.it.next_buffered(True)
+
         if not self.it.ptr.Valid():
             raise StopIteration()
 
@@ -1772,35 +5227,348 @@ cdef class ReversedIterator(object):
         check_status(self.it.ptr.status())
         return ret
 
+cdef class UpdatesIterator(object):
+    cdef DB db
+    cdef unique_ptr[transaction_log.TransactionLogIterator] it
+    # Sequence number of the first write not returned yet.
+    cdef uint64_t next_sequence
+
+    # Updates which are read by batch but not consumed yet.
+    cdef list batch
+    cdef Py_ssize_t batch_pos
+    cdef size_t batch_size
+
+    def __cinit__(self, DB db, uint64_t sequence, size_t batch_size):
+        self.db = db
+        self.next_sequence = sequence
+        self.batch = []
+        self.batch_pos = 0
+        self.batch_size = max(batch_size, 1)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.batch_pos >= len(self.batch):
+            self.batch = self.read_updates(self.batch_size)
+            self.batch_pos = 0
+
+        if not self.batch:
+            raise StopIteration()
+
+        ret = self.batch[self.batch_pos]
+        self.batch_pos += 1
+        return ret
+
+    property next_sequence:
+        def __get__(self):
+            return self.next_sequence
+
+    def next_batch(self, size_t n):
+        cdef list ret = self.batch[self.batch_pos:self.batch_pos + n]
+        self.batch_pos += len(ret)
+
+        if len(ret) < n:
+            ret.extend(self.read_updates(n - len(ret)))
+        return ret
+
+    def wait_for_updates(self, timeout=None):
+        cdef cpp_bool done
+        cdef int64_t timeout_micros = -1
+
+        if self.batch_pos < len(self.batch):
+            return True
+
+        if timeout is not None:
+            timeout_micros = <int64_t>(timeout * 1000000)
+
+        with nogil:
+            done = db.wait_for_sequence(
+                self.db.db,
+                self.next_sequence,
+                timeout_micros,
+                1000)
+        return done
+
+    cdef list read_updates(self, size_t n):
+        cdef Status st
+        cdef vector[uint64_t] sequences
+        cdef vector[string] batches
+        cdef size_t i
+
+        with nogil:
+            st = db.read_updates(
+                self.db.db,
+                cython.address(self.it),
+                cython.address(self.next_sequence),
+                n,
+                cython.address(sequences),
+                cython.address(batches))
+        check_status(st)
+
+        return [
+            (sequences[i], WriteBatch(string_to_bytes(batches[i])))
+            for i in range(batches.size())]
+
+cdef class SstFileWriter(object):
+    cdef sst_file_writer.SstFileWriter* writer
+    cdef Options opts
+
+    def __cinit__(self, Options opts):
+        cdef env.EnvOptions env_opts
+        self.writer = NULL
+
+        # Keep the python objects (comparator, merge_operator, ...)
+        # referenced by the options alive.
+        self.opts = opts
+        self.writer = new sst_file_writer.SstFileWriter(
+            env_opts,
+            deref(opts.opts),
+            NULL)
+
+    def __dealloc__(self):
+        if not self.writer == NULL:
+            with nogil:
+                del self.writer
+
+    def open(self, path):
+        cdef Status st
+        cdef string c_path = path_to_string(path)
+
+        with nogil:
+            st = self.writer.Open(c_path)
+        check_status(st)
+
+    def put(self, key, value):
+        cdef Status st
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef Slice c_value = hold_slice(value, holds)
+
+        with nogil:
+            st = self.writer.Put(c_key, c_value)
+        check_status(st)
+
+    def merge(self, key, value):
+        cdef Status st
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+        cdef Slice c_value = hold_slice(value, holds)
+
+        with nogil:
+            st = self.writer.Merge(c_key, c_value)
+        check_status(st)
+
+    def delete(self, key):
+        cdef Status st
+        cdef list holds = []
+        cdef Slice c_key = hold_slice(key, holds)
+
+        with nogil:
+            st = self.writer.Delete(c_key)
+        check_status(st)
+
+    def put_many(self, items, size_t batch_size=10000):
+        cdef vector[Slice] c_keys
+        cdef vector[Slice] c_values
+        # References the keys and values of the current batch and holds
+        # their buffers, the slices point into their memory.
+        cdef list pending = []
+
+        for key, value in items:
+            pending.append((key, value))
+            c_keys.push_back(hold_slice(key, pending))
+            c_values.push_back(hold_slice(value, pending))
+
+            if c_keys.size() >= batch_size:
+                self.put_slices(c_keys, c_values)
+                del pending[:]
+
+        self.put_slices(c_keys, c_values)
+
+    cdef put_slices(self, vector[Slice]& keys, vector[Slice]& values):
+        cdef Status st
+        cdef size_t i
+
+        with nogil:
+            for i in range(keys.size()):
+                st = self.writer.Put(keys[i], values[i])
+                if not st.ok():
+                    break
+
+            keys.clear()
+            values.clear()
+
+        check_status(st)
+
+    def finish(self):
+        cdef Status st
+        cdef sst_file_writer.ExternalSstFileInfo info
+
+        with nogil:
+            st = self.writer.Finish(cython.address(info))
+        check_status(st)
+
+        return {
+            'file_path': string_to_path(info.file_path),
+            'smallest_key': string_to_bytes(info.smallest_key),
+            'largest_key': string_to_bytes(info.largest_key),
+            'file_size': info.file_size,
+            'num_entries': info.num_entries
+        }
+
+    property file_size:
+        def __get__(self):
+            return self.writer.FileSize()
+
+@cython.internal
+cdef class BackupProgress(object):
+    cdef object callback
+    cdef object error
+    cdef backup.BackupEngine* engine
+
+cdef void backup_progress_callback(void* ctx) with gil:
+    cdef BackupProgress progress = <BackupProgress>ctx
+
+    if progress.error is not None:
+        return
+
+    try:
+        progress.callback()
+    except BaseException as error:
+        # Abort the backup, the error is raised by create_backup.
+        progress.error = error
+        progress.engine.StopBackup()
+
 cdef class BackupEngine(object):
     cdef backup.BackupEngine* engine
+    cdef backup.BackupEngineOptions* backup_opts
+    # StopBackup sets a flag of the engine which is never cleared, every
+    # later backup would fail. So the engine is reopened before the next one.
+    cdef cpp_bool stopped
+
+    def  __cinit__(
+            self,
+            backup_dir,
+            max_background_operations=None,
+            backup_rate_limit=None,
+            restore_rate_limit=None,
+            share_table_files=None,
+            share_files_with_checksum=None,
+            sync=None,
+            destroy_old_data=None,
+            backup_log_files=None,
+            callback_trigger_interval_size=None):
 
-    def  __cinit__(self, backup_dir):
-        cdef Status st
         cdef string c_backup_dir
         self.engine = NULL
+        self.backup_opts = NULL
+        self.stopped = False
 
         c_backup_dir = path_to_string(backup_dir)
-        st = backup.BackupEngine_Open(
-            env.Env_Default(),
-            backup.BackupableDBOptions(c_backup_dir),
-            cython.address(self.engine))
+        self.backup_opts = new backup.BackupEngineOptions(c_backup_dir)
 
-        check_status(st)
+        # If the following options are None use the rocksdb default.
+        if max_background_operations is not None:
+            self.backup_opts.max_background_operations = max_background_operations
+
+        if backup_rate_limit is not None:
+            self.backup_opts.backup_rate_limit = backup_rate_limit
+
+        if restore_rate_limit is not None:
+            self.backup_opts.restore_rate_limit = restore_rate_limit
+
+        if share_table_files is not None:
+            self.backup_opts.share_table_files = bool(share_table_files)
+
+        if share_files_with_checksum is not None:
+            self.backup_opts.share_files_with_checksum = bool(share_files_with_checksum)
+
+        if sync is not None:
+            self.backup_opts.sync = bool(sync)
+
+        if destroy_old_data is not None:
+            self.backup_opts.destroy_old_data = bool(destroy_old_data)
+
+        if backup_log_files is not None:
+            self.backup_opts.backup_log_files = bool(backup_log_files)
+
+        if callback_trigger_interval_size is not None:
+            self.backup_opts.callback_trigger_interval_size = callback_trigger_interval_size
+
+        self.open_engine()
 
     def __dealloc__(self):
         if not self.engine == NULL:
             with nogil:
                 del self.engine
 
-    def create_backup(self, DB db, flush_before_backup=False):
+        if not self.backup_opts == NULL:
+            del self.backup_opts
+
+    cdef open_engine(self):
+        cdef Status st
+        cdef backup.BackupEngine* engine = NULL
+        cdef env.Env* c_env = env.Env_Default()
+
+        with nogil:
+            st = backup.BackupEngine_Open(
+                c_env,
+                deref(self.backup_opts),
+                cython.address(engine))
+        check_status(st)
+
+        if not self.engine == NULL:
+            with nogil:
+                del self.engine
+
+        self.engine = engine
+        self.stopped = False
+        # Reopening must not wipe the backups again.
+        self.backup_opts.destroy_old_data = False
+
+    def create_backup(self, DB db, flush_before_backup=False, progress_callback=None):
         cdef Status st
         cdef cpp_bool c_flush_before_backup
+        cdef BackupProgress progress = None
+        cdef void* ctx = NULL
+        cdef backup.progress_func c_callback = NULL
 
         c_flush_before_backup = flush_before_backup
 
+        if self.stopped:
+            self.open_engine()
+
+        if progress_callback is not None:
+            progress = BackupProgress()
+            progress.callback = progress_callback
+            progress.error = None
+            progress.engine = self.engine
+            ctx = <void*>progress
+            c_callback = backup_progress_callback
+
         with nogil:
-            st = self.engine.CreateNewBackup(db.db, c_flush_before_backup)
+            st = backup.create_backup(
+                self.engine,
+                db.db,
+                c_flush_before_backup,
+                ctx,
+                c_callback)
+
+        if progress is not None and progress.error is not None:
+            self.stopped = True
+            raise progress.error
+
+        check_status(st)
+
+    def verify_backup(self, backup_id, verify_with_checksum=False):
+        cdef Status st
+        cdef backup.BackupID c_backup_id = backup_id
+        cdef cpp_bool c_verify_with_checksum = verify_with_checksum
+
+        with nogil:
+            st = self.engine.VerifyBackup(c_backup_id, c_verify_with_checksum)
+
         check_status(st)
 
     def restore_backup(self, backup_id, db_dir, wal_dir):
@@ -1835,6 +5603,7 @@ cdef class BackupEngine(object):
         check_status(st)
 
     def stop_backup(self):
+        self.stopped = True
         with nogil:
             self.engine.StopBackup()
 
@@ -1874,3 +5643,32 @@ cdef class BackupEngine(object):
             ret.append(t)
 
         return ret
+
+cdef class Checkpoint(object):
+    cdef checkpoint.Checkpoint* checkpoint
+    # Keeps the database open as long as the checkpoint object lives.
+    cdef DB db
+
+    def __cinit__(self, DB db):
+        cdef Status st
+        self.checkpoint = NULL
+        self.db = db
+
+        st = checkpoint.Checkpoint_Create(db.db, cython.address(self.checkpoint))
+        check_status(st)
+
+    def __dealloc__(self):
+        if not self.checkpoint == NULL:
+            del self.checkpoint
+
+    def create(self, checkpoint_dir, log_size_for_flush=0):
+        cdef Status st
+        cdef string c_checkpoint_dir = path_to_string(checkpoint_dir)
+        cdef uint64_t c_log_size_for_flush = log_size_for_flush
+
+        with nogil:
+            st = self.checkpoint.CreateCheckpoint(
+                c_checkpoint_dir,
+                c_log_size_for_flush)
+
+        check_status(st)
@@ -0,0 +1,261 @@
+import asyncio
+import collections
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+def _is_hashable(ob):
+    try:
+        hash(ob)
+    except TypeError:
+        return False
+    return True
+
+
+class AsyncDB(object):
+    def __init__(
+            self,
+            db,
+            executor=None,
+            max_workers=None,
+            max_pending=1024,
+            coalesce_gets=True,
+            max_get_batch=1024):
+
+        self.db = db
+        self._own_executor = executor is None
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._executor = executor
+
+        self._max_pending = max_pending
+        self._semaphore = None
+        self._coalesce_gets = coalesce_gets
+        self._max_get_batch = max_get_batch
+
+        # Maps the read options of pending gets to a list of (key, future).
+        self._pending_gets = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def close(self):
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    def _limit(self):
+        # Created lazily, so it belongs to the loop which uses this object.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_pending)
+        return self._semaphore
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        async with self._limit():
+            return await loop.run_in_executor(
+                self._executor,
+                functools.partial(func, *args, **kwargs))
+
+    async def get(self, key, **read_opts):
+        # multi_get returns a dict, so only hashable keys can be coalesced.
+        # Tuple keys of a key codec are, a bytearray is not.
+        if not self._coalesce_gets or not _is_hashable(key):
+            return await self._run(self.db.get, key, **read_opts)
+
+        # A get doesn't take a slot of 'max_pending' for itself, the whole
+        # batch takes one when it is dispatched. Otherwise no batch could
+        # become larger than 'max_pending'.
+        loop = asyncio.get_event_loop()
+        group = tuple(sorted(read_opts.items()))
+        batch = self._pending_gets.get(group)
+        if batch is None:
+            batch = self._pending_gets[group] = []
+            loop.call_soon(self._dispatch_gets, group, batch)
+
+        future = loop.create_future()
+        batch.append((key, future))
+
+        if len(batch) >= self._max_get_batch:
+            self._dispatch_gets(group, batch)
+
+        return await future
+
+    def _dispatch_gets(self, group, batch):
+        # The batch is either dispatched because it is full or by the
+        # callback at the end of the loop tick, whatever comes first.
+        if self._pending_gets.get(group) is not batch:
+            return
+        del self._pending_gets[group]
+
+        loop = asyncio.get_event_loop()
+        keys = [key for key, _ in batch]
+        task = loop.create_task(self._run(self._multi_get, keys, dict(group)))
+        task.add_done_callback(functools.partial(self._resolve_gets, batch))
+
+    def _multi_get(self, keys, read_opts):
+        if len(keys) == 1:
+            return [self.db.get(keys[0], **read_opts)]
+
+        values = self.db.multi_get(keys, **read_opts)
+        return [values[key] for key in keys]
+
+    @staticmethod
+    def _resolve_gets(batch, task):
+        if task.cancelled():
+            error = asyncio.CancelledError()
+        else:
+            error = task.exception()
+
+        if error is None:
+            values = task.result()
+        else:
+            values = [None] * len(batch)
+
+        for (key, future), value in zip(batch, values):
+            if future.done():
+                continue
+
+            if error is None:
+                future.set_result(value)
+            else:
+                future.set_exception(error)
+
+    async def multi_get(self, keys, **read_opts):
+        return await self._run(self.db.multi_get, keys, **read_opts)
+
+    async def put(self, key, value, **write_opts):
+        return await self._run(self.db.put, key, value, **write_opts)
+
+    async def delete(self, key, **write_opts):
+        return await self._run(self.db.delete, key, **write_opts)
+
+    async def merge(self, key, value, **write_opts):
+        return await self._run(self.db.merge, key, value, **write_opts)
+
+    async def write(self, batch, **write_opts):
+        return await self._run(self.db.write, batch, **write_opts)
+
+    async def flush(self, **flush_opts):
+        return await self._run(self.db.flush, **flush_opts)
+
+    async def compact_range(self, begin=None, end=None, **compact_opts):
+        return await self._run(self.db.compact_range, begin, end, **compact_opts)
+
+    def iterkeys(self, batch_size=1000, reverse=False, **read_opts):
+        it = self.db.iterkeys(**read_opts)
+        return AsyncIterator(self, it, batch_size, reverse)
+
+    def itervalues(self, batch_size=1000, reverse=False, **read_opts):
+        it = self.db.itervalues(**read_opts)
+        return AsyncIterator(self, it, batch_size, reverse)
+
+    def iteritems(self, batch_size=1000, reverse=False, **read_opts):
+        it = self.db.iteritems(**read_opts)
+        return AsyncIterator(self, it, batch_size, reverse)
+
+    def get_updates_since(self, sequence, batch_size=1000, timeout=1.0):
+        it = self.db.get_updates_since(sequence, batch_size=batch_size)
+        return AsyncUpdatesIterator(self, it, batch_size, timeout)
+
+
+# Reads chunks of 'batch_size' entries on the executor. While the entries
+# of one chunk are consumed, the next chunk is already read in the background.
+class AsyncIterator(object):
+    def __init__(self, adb, it, batch_size, reverse=False):
+        self._adb = adb
+        self._it = reversed(it) if reverse else it
+        self._batch_size = batch_size
+        self._chunk = collections.deque()
+        self._pending = None
+        self._exhausted = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._chunk:
+            chunk = await self._next_chunk()
+            if not chunk:
+                raise StopAsyncIteration()
+            self._chunk.extend(chunk)
+
+        return self._chunk.popleft()
+
+    async def _next_chunk(self):
+        if self._exhausted:
+            return []
+
+        if self._pending is None:
+            self._pending = self._fetch()
+
+        chunk = await self._pending
+        self._pending = None
+
+        if len(chunk) < self._batch_size:
+            self._exhausted = True
+        else:
+            self._pending = self._fetch()
+        return chunk
+
+    def _fetch(self):
+        return asyncio.ensure_future(
+            self._adb._run(self._it.next_batch, self._batch_size))
+
+    async def _reset(self):
+        # The rocksdb iterator is not thread safe, wait for the prefetch.
+        if self._pending is not None:
+            try:
+                await self._pending
+            finally:
+                self._pending = None
+
+        self._chunk.clear()
+        self._exhausted = False
+
+    async def seek_to_first(self):
+        await self._reset()
+        await self._adb._run(self._it.seek_to_first)
+
+    async def seek_to_last(self):
+        await self._reset()
+        await self._adb._run(self._it.seek_to_last)
+
+    async def seek(self, key):
+        await self._reset()
+        await self._adb._run(self._it.seek, key)
+
+
+# Follows the WAL: at its end the iterator waits on the executor for new
+# writes instead of stopping. 'timeout' limits how long one executor thread
+# is blocked by a single wait.
+class AsyncUpdatesIterator(object):
+    def __init__(self, adb, it, batch_size, timeout):
+        self._adb = adb
+        self._it = it
+        self._batch_size = batch_size
+        self._timeout = timeout
+        self._chunk = collections.deque()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._chunk:
+            chunk = await self._adb._run(self._it.next_batch, self._batch_size)
+            if not chunk:
+                await self._adb._run(self._it.wait_for_updates, self._timeout)
+            self._chunk.extend(chunk)
+
+        return self._chunk.popleft()
+
+    @property
+    def next_sequence(self):
+        return self._it.next_sequence
+
+    async def wait_for_updates(self, timeout=None):
+        if self._chunk:
+            return True
+        return await self._adb._run(self._it.wait_for_updates, timeout)
@@ -9,11 +9,20 @@ from status cimport Status
 from db cimport DB
 from env cimport Env
 
-cdef extern from "rocksdb/utilities/backupable_db.h" namespace "rocksdb":
+cdef extern from "rocksdb/utilities/backup_engine.h" namespace "rocksdb":
     ctypedef uint32_t BackupID
 
-    cdef cppclass BackupableDBOptions:
-        BackupableDBOptions(const string& backup_dir)
+    cdef cppclass BackupEngineOptions:
+        BackupEngineOptions(const string& backup_dir)
+        cpp_bool share_table_files
+        cpp_bool sync
+        cpp_bool destroy_old_data
+        cpp_bool backup_log_files
+        uint64_t backup_rate_limit
+        uint64_t restore_rate_limit
+        cpp_bool share_files_with_checksum
+        int max_background_operations
+        uint64_t callback_trigger_interval_size
 
     cdef struct BackupInfo:
         BackupID backup_id
@@ -28,8 +37,19 @@ cdef extern from "rocksdb/utilities/backupable_db.h" namespace "rocksdb":
         void GetBackupInfo(vector[BackupInfo]*) nogil except+
         Status RestoreDBFromBackup(BackupID, string&, string&) nogil except+
         Status RestoreDBFromLatestBackup(string&, string&) nogil except+
+        Status VerifyBackup(BackupID, cpp_bool) nogil except+
 
     cdef Status BackupEngine_Open "rocksdb::BackupEngine::Open"(
             Env*,
-            BackupableDBOptions&,
-            BackupEngine**)
+            BackupEngineOptions&,
+            BackupEngine**) nogil except+
+
+ctypedef void (*progress_func)(void*)
+
+cdef extern from "cpp/backup_helper.hpp" namespace "py_rocks":
+    cdef Status create_backup(
+        BackupEngine*,
+        DB*,
+        cpp_bool,
+        void*,
+        progress_func) nogil except+
@@ -0,0 +1,379 @@
+import gc
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import time
+
+import rocksdb
+import rocksdb.interfaces
+import rocksdb.merge_operators
+
+try:
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time
+
+
+DEFAULT_BENCHMARKS = (
+    'fillseq',
+    'fillrandom',
+    'readrandom',
+    'multi_get',
+    'seekrandom',
+    'readseq',
+    'mergerandom',
+)
+
+MERGE_OPERATORS = ('native', 'python')
+COMPARATORS = ('bytewise', 'python')
+PREFIX_EXTRACTORS = ('none', 'native', 'python')
+
+
+# The python versions of the native callbacks. They do the same work, so the
+# difference of the results is the cost of calling into python.
+class PythonUInt64Add(rocksdb.interfaces.AssociativeMergeOperator):
+    def merge(self, key, existing_value, value):
+        if existing_value is None:
+            return (True, value)
+        total = struct.unpack('<Q', existing_value)[0] + struct.unpack('<Q', value)[0]
+        return (True, struct.pack('<Q', total & 0xFFFFFFFFFFFFFFFF))
+
+    def name(self):
+        return b'benchmark.PythonUInt64Add'
+
+
+class PythonBytewiseComparator(rocksdb.interfaces.Comparator):
+    def compare(self, a, b):
+        return (a > b) - (a < b)
+
+    def name(self):
+        return b'benchmark.PythonBytewiseComparator'
+
+
+class PythonFixedPrefix(rocksdb.interfaces.SliceTransform):
+    def __init__(self, prefix_size):
+        self.prefix_size = prefix_size
+
+    def name(self):
+        return b'benchmark.PythonFixedPrefix'
+
+    def transform(self, src):
+        return (0, self.prefix_size)
+
+    def in_domain(self, src):
+        return len(src) >= self.prefix_size
+
+    def in_range(self, dst):
+        return len(dst) == self.prefix_size
+
+
+class Config(object):
+    num = 100000
+    threads = (1,)
+    key_size = 16
+    value_size = 100
+    batch_size = 100
+    seek_nexts = 10
+    merge_operator = 'native'
+    comparator = 'bytewise'
+    prefix_extractor = 'none'
+    prefix_size = 8
+    seed = 301
+
+    def __init__(self, **kwargs):
+        for name, value in kwargs.items():
+            if not hasattr(Config, name) or name.startswith('_'):
+                raise TypeError("Unknown benchmark setting %r" % name)
+            setattr(self, name, value)
+
+        self.threads = tuple(self.threads)
+        if not self.threads or min(self.threads) < 1:
+            raise ValueError("threads must be a list of numbers > 0")
+
+        for name, choices in (
+                ('merge_operator', MERGE_OPERATORS),
+                ('comparator', COMPARATORS),
+                ('prefix_extractor', PREFIX_EXTRACTORS)):
+            if getattr(self, name) not in choices:
+                raise ValueError("%s must be one of %s" % (name, ', '.join(choices)))
+
+    def to_dict(self):
+        ret = {}
+        for name in dir(Config):
+            if not name.startswith('_') and not callable(getattr(Config, name)):
+                ret[name] = getattr(self, name)
+        ret['threads'] = list(self.threads)
+        return ret
+
+    def make_options(self):
+        opts = rocksdb.Options(create_if_missing=True)
+
+        if self.merge_operator == 'native':
+            opts.merge_operator = rocksdb.merge_operators.UInt64Add()
+        else:
+            opts.merge_operator = PythonUInt64Add()
+
+        if self.comparator == 'python':
+            opts.comparator = PythonBytewiseComparator()
+
+        if self.prefix_extractor == 'native':
+            opts.prefix_extractor = rocksdb.FixedPrefixTransform(self.prefix_size)
+        elif self.prefix_extractor == 'python':
+            opts.prefix_extractor = PythonFixedPrefix(self.prefix_size)
+
+        return opts
+
+    def make_key(self, number):
+        return ('%0*d' % (self.key_size, number)).encode('ascii')
+
+
+def percentile(sorted_values, fraction):
+    """Nearest rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = int(fraction * len(sorted_values) + 0.5) - 1
+    return sorted_values[min(max(index, 0), len(sorted_values) - 1)]
+
+
+# A workload creates the operation for one thread. It gets the range of
+# keys this thread is responsible for and returns a function, which does
+# one operation and returns the number of keys it touched.
+def fillseq(db, config, rng, start, stop):
+    keys = iter(range(start, stop))
+    value = os.urandom(config.value_size)
+
+    def op():
+        db.put(config.make_key(next(keys)), value)
+        return 1
+    return op
+
+
+def fillrandom(db, config, rng, start, stop):
+    value = os.urandom(config.value_size)
+
+    def op():
+        db.put(config.make_key(rng.randrange(config.num)), value)
+        return 1
+    return op
+
+
+def readrandom(db, config, rng, start, stop):
+    def op():
+        db.get(config.make_key(rng.randrange(config.num)))
+        return 1
+    return op
+
+
+def multi_get(db, config, rng, start, stop):
+    def op():
+        db.multi_get([
+            config.make_key(rng.randrange(config.num))
+            for _ in range(config.batch_size)])
+        return config.batch_size
+    return op
+
+
+def seekrandom(db, config, rng, start, stop):
+    it = db.iteritems()
+
+    def op():
+        it.seek(config.make_key(rng.randrange(config.num)))
+        for _ in range(config.seek_nexts):
+            if next(it, None) is None:
+                break
+        return 1
+    return op
+
+
+def readseq(db, config, rng, start, stop):
+    state = {}
+
+    def restart():
+        it = db.iteritems()
+        it.seek(config.make_key(start))
+        state['it'] = it
+
+    def op():
+        if next(state['it'], None) is None:
+            restart()
+            next(state['it'], None)
+        return 1
+
+    restart()
+    return op
+
+
+def mergerandom(db, config, rng, start, stop):
+    operand = struct.pack('<Q', 1)
+
+    def op():
+        db.merge(config.make_key(rng.randrange(config.num)), operand)
+        return 1
+    return op
+
+
+# Maps the name to the workload and if it starts with an empty database.
+# The merge operands are no valid values for the fill, so mergerandom
+# starts empty too.
+WORKLOADS = {
+    'fillseq': (fillseq, True),
+    'fillrandom': (fillrandom, True),
+    'readrandom': (readrandom, False),
+    'multi_get': (multi_get, False),
+    'seekrandom': (seekrandom, False),
+    'readseq': (readseq, False),
+    'mergerandom': (mergerandom, True),
+}
+
+
+def _thread_ranges(num, threads):
+    per_thread = num // threads
+    ranges = []
+    for index in range(threads):
+        start = index * per_thread
+        stop = num if index == threads - 1 else start + per_thread
+        ranges.append((start, stop))
+    return ranges
+
+
+def _run_thread(op, count, start_event, latencies, done, errors):
+    # Only 'op' is timed, recording the latency is not.
+    touched = 0
+    try:
+        start_event.wait()
+        while touched < count:
+            begin = timer()
+            touched += op()
+            latencies.append(timer() - begin)
+    except Exception:
+        errors.append(sys.exc_info()[1])
+    finally:
+        done.append(touched)
+
+
+def run_workload(db, config, name, threads):
+    workload = WORKLOADS[name][0]
+    start_event = threading.Event()
+    latencies = []
+    done = []
+    errors = []
+    workers = []
+
+    for index, (start, stop) in enumerate(_thread_ranges(config.num, threads)):
+        rng = random.Random(config.seed + index)
+        op = workload(db, config, rng, start, stop)
+        thread_latencies = []
+        latencies.append(thread_latencies)
+        workers.append(threading.Thread(
+            target=_run_thread,
+            args=(op, stop - start, start_event, thread_latencies, done, errors)))
+
+    for worker in workers:
+        worker.start()
+
+    begin = timer()
+    start_event.set()
+    for worker in workers:
+        worker.join()
+    elapsed = timer() - begin
+
+    if errors:
+        raise errors[0]
+
+    all_latencies = sorted(value for values in latencies for value in values)
+    ops = sum(done)
+
+    def micros(value):
+        return round(value * 1e6, 3)
+
+    return {
+        'benchmark': name,
+        'threads': threads,
+        'ops': ops,
+        'seconds': round(elapsed, 6),
+        'ops_per_sec': round(ops / elapsed, 1) if elapsed > 0 else 0.0,
+        'latency_us': {
+            'mean': micros(sum(all_latencies) / len(all_latencies)) if all_latencies else 0.0,
+            'p50': micros(percentile(all_latencies, 0.5)),
+            'p99': micros(percentile(all_latencies, 0.99)),
+            'p999': micros(percentile(all_latencies, 0.999)),
+            'max': micros(all_latencies[-1]) if all_latencies else 0.0,
+        },
+    }
+
+
+class _Database(object):
+    """Opens and recreates the database the benchmarks run on."""
+
+    def __init__(self, directory, config):
+        self.directory = tempfile.mkdtemp(prefix='rocksdb-bench-', dir=directory)
+        self.config = config
+        self.db = None
+        self.has_data = False
+        self.generation = 0
+
+    def recreate(self):
+        self.close()
+        self.generation += 1
+        path = os.path.join(self.directory, 'db%i' % self.generation)
+        self.db = rocksdb.DB(path, self.config.make_options())
+        self.has_data = False
+
+    def fill(self):
+        # Fills all keys without measuring it, for the read benchmarks.
+        value = os.urandom(self.config.value_size)
+        for start in range(0, self.config.num, 1000):
+            batch = rocksdb.WriteBatch()
+            for number in range(start, min(start + 1000, self.config.num)):
+                batch.put(self.config.make_key(number), value)
+            self.db.write(batch)
+        self.has_data = True
+
+    def close(self):
+        self.db = None
+        gc.collect()
+
+    def destroy(self):
+        self.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def run_benchmarks(benchmarks=DEFAULT_BENCHMARKS, directory=None, config=None, report=None):
+    """Runs every benchmark with every number of threads of 'config'.
+
+    The databases are created in a new temporary directory inside
+    'directory', which is removed afterwards. 'report' is called with
+    every result as soon as it is available.
+    """
+    if config is None:
+        config = Config()
+
+    for name in benchmarks:
+        if name not in WORKLOADS:
+            raise ValueError("Unknown benchmark %r" % name)
+
+    database = _Database(directory, config)
+    results = []
+    try:
+        for name in benchmarks:
+            fresh = WORKLOADS[name][1]
+            for threads in config.threads:
+                if fresh or database.db is None:
+                    database.recreate()
+                if not fresh and not database.has_data:
+                    database.fill()
+
+                result = run_workload(database.db, config, name, threads)
+                if fresh:
+                    database.has_data = name == 'fillseq'
+                results.append(result)
+                if report is not None:
+                    report(result)
+    finally:
+        database.destroy()
+
+    return results
@@ -0,0 +1,115 @@
+import argparse
+import json
+import platform
+import sys
+
+from . import Config
+from . import DEFAULT_BENCHMARKS
+from . import WORKLOADS
+from . import MERGE_OPERATORS
+from . import COMPARATORS
+from . import PREFIX_EXTRACTORS
+from . import run_benchmarks
+
+
+def parse_list(value, convert=str):
+    return [convert(item) for item in value.split(',') if item]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m rocksdb.benchmarks',
+        description='db_bench like benchmarks of the python bindings.')
+
+    parser.add_argument(
+        '--benchmarks',
+        type=parse_list,
+        default=list(DEFAULT_BENCHMARKS),
+        help='Comma separated list of: %s' % ', '.join(sorted(WORKLOADS)))
+    parser.add_argument(
+        '--threads',
+        type=lambda value: parse_list(value, int),
+        default=[1],
+        help='Comma separated numbers of threads, every benchmark runs with each')
+    parser.add_argument('--num', type=int, default=Config.num,
+                        help='Number of keys, split between the threads')
+    parser.add_argument('--key-size', type=int, default=Config.key_size)
+    parser.add_argument('--value-size', type=int, default=Config.value_size)
+    parser.add_argument('--batch-size', type=int, default=Config.batch_size,
+                        help='Keys per multi_get call')
+    parser.add_argument('--seek-nexts', type=int, default=Config.seek_nexts,
+                        help='Entries read after every seek of seekrandom')
+    parser.add_argument('--merge-operator', choices=MERGE_OPERATORS,
+                        default=Config.merge_operator)
+    parser.add_argument('--comparator', choices=COMPARATORS,
+                        default=Config.comparator)
+    parser.add_argument('--prefix-extractor', choices=PREFIX_EXTRACTORS,
+                        default=Config.prefix_extractor)
+    parser.add_argument('--prefix-size', type=int, default=Config.prefix_size)
+    parser.add_argument('--seed', type=int, default=Config.seed)
+    parser.add_argument('--directory', default=None,
+                        help='Where the temporary databases are created')
+    parser.add_argument('--json', default=None, metavar='FILE',
+                        help="Write the results as JSON to FILE, '-' for stdout")
+    return parser
+
+
+def print_result(result, out):
+    latency = result['latency_us']
+    out.write('%-12s threads=%-3i %12.1f ops/s  p50=%.2fus p99=%.2fus p999=%.2fus\n' % (
+        result['benchmark'],
+        result['threads'],
+        result['ops_per_sec'],
+        latency['p50'],
+        latency['p99'],
+        latency['p999']))
+    out.flush()
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    for name in args.benchmarks:
+        if name not in WORKLOADS:
+            parser.error("unknown benchmark %r" % name)
+
+    config = Config(
+        num=args.num,
+        threads=args.threads,
+        key_size=args.key_size,
+        value_size=args.value_size,
+        batch_size=args.batch_size,
+        seek_nexts=args.seek_nexts,
+        merge_operator=args.merge_operator,
+        comparator=args.comparator,
+        prefix_extractor=args.prefix_extractor,
+        prefix_size=args.prefix_size,
+        seed=args.seed)
+
+    # The table goes to stderr if the JSON goes to stdout.
+    out = sys.stderr if args.json == '-' else sys.stdout
+    results = run_benchmarks(
+        args.benchmarks,
+        directory=args.directory,
+        config=config,
+        report=lambda result: print_result(result, out))
+
+    if args.json is not None:
+        document = {
+            'python': platform.python_implementation() + ' ' + platform.python_version(),
+            'platform': platform.platform(),
+            'config': config.to_dict(),
+            'results': results,
+        }
+        if args.json == '-':
+            json.dump(document, sys.stdout, indent=2, sort_keys=True)
+            sys.stdout.write('\n')
+        else:
+            with open(args.json, 'w') as fp:
+                json.dump(document, fp, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
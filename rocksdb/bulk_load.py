@@ -0,0 +1,66 @@
+import os
+import multiprocessing
+
+from ._rocksdb import SstFileWriter
+
+
+# Runs in the worker processes. Options and DB objects can't be pickled,
+# so the options are created by the factory inside the worker.
+def _write_sst_file(args):
+    options_factory, reader, task, path = args
+
+    items = iter(reader(task))
+    try:
+        first = next(items)
+    except StopIteration:
+        # rocksdb refuses to create an empty file.
+        return None
+
+    writer = SstFileWriter(options_factory())
+    writer.open(path)
+    writer.put(*first)
+    writer.put_many(items)
+    return writer.finish()
+
+
+def write_sst_files(tasks, reader, options_factory, directory, processes=None):
+    tasks = list(tasks)
+    jobs = []
+    for index, task in enumerate(tasks):
+        path = os.path.join(directory, '%08d.sst' % index)
+        jobs.append((options_factory, reader, task, path))
+
+    pool = multiprocessing.Pool(processes)
+    try:
+        infos = pool.map(_write_sst_file, jobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+
+    return [info for info in infos if info is not None]
+
+
+def bulk_load(
+        db,
+        tasks,
+        reader,
+        options_factory,
+        directory,
+        processes=None,
+        move_files=True,
+        column_family=None):
+
+    infos = write_sst_files(
+        tasks,
+        reader,
+        options_factory,
+        directory,
+        processes)
+
+    if infos:
+        db.ingest_external_file(
+            [info['file_path'] for info in infos],
+            move_files=move_files,
+            column_family=column_family)
+
+    return infos
@@ -1,8 +1,21 @@
+from libcpp cimport bool as cpp_bool
 from std_memory cimport shared_ptr
 
 cdef extern from "rocksdb/cache.h" namespace "rocksdb":
     cdef cppclass Cache:
-        pass
+        const char* Name() nogil except+
+        void SetCapacity(size_t) nogil except+
+        size_t GetCapacity() nogil except+
+        size_t GetUsage() nogil except+
+        size_t GetPinnedUsage() nogil except+
+        void SetStrictCapacityLimit(cpp_bool) nogil except+
+        cpp_bool HasStrictCapacityLimit() nogil except+
+        void EraseUnRefEntries() nogil except+
 
     cdef extern shared_ptr[Cache] NewLRUCache(size_t)
     cdef extern shared_ptr[Cache] NewLRUCache(size_t, int)
+    cdef extern shared_ptr[Cache] NewLRUCache(size_t, int, cpp_bool, double)
+
+    cdef cppclass HyperClockCacheOptions:
+        HyperClockCacheOptions(size_t, size_t, int, cpp_bool)
+        shared_ptr[Cache] MakeSharedCache() nogil except+
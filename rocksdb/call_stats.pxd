@@ -0,0 +1,22 @@
+from libcpp cimport bool as cpp_bool
+from libc.stdint cimport uint64_t
+
+cdef extern from "cpp/call_stats.hpp" namespace "py_rocks":
+    cdef size_t CALL_STATS_BUCKETS
+
+    uint64_t monotonic_nanos() nogil
+    uint64_t bucket_bound_nanos(size_t) nogil
+
+    cdef cppclass CallHistogram:
+        uint64_t count
+        uint64_t sum_nanos
+        uint64_t max_nanos
+        uint64_t bucket(size_t) nogil
+
+    cdef cppclass CallStats:
+        uint64_t calls
+        uint64_t errors
+        CallHistogram latency
+        CallHistogram gil_wait
+        void record(uint64_t, uint64_t, uint64_t, cpp_bool) nogil
+        void reset() nogil
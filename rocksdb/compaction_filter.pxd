@@ -0,0 +1,64 @@
+from libcpp.string cimport string
+from libcpp.vector cimport vector
+from libcpp cimport bool as cpp_bool
+from libc.stdint cimport uint32_t
+from libc.stdint cimport int64_t
+from slice_ cimport Slice
+from logger cimport Logger
+from std_memory cimport shared_ptr
+
+cdef extern from "rocksdb/compaction_filter.h" namespace "rocksdb":
+    cdef cppclass CompactionFilter:
+        cpp_bool Filter(
+            int,
+            const Slice&,
+            const Slice&,
+            string*,
+            cpp_bool*) nogil except+
+        const char* Name()
+
+    cdef cppclass CompactionFilterFactory:
+        const char* Name()
+
+ctypedef cpp_bool (*filter_func)(
+    void*,
+    Logger*,
+    int,
+    const Slice&,
+    const Slice&,
+    string*,
+    cpp_bool*)
+
+ctypedef void (*release_func)(void*)
+
+ctypedef CompactionFilter* (*create_compaction_filter_func)(
+    void*,
+    shared_ptr[Logger],
+    cpp_bool,
+    cpp_bool,
+    uint32_t)
+
+cdef extern from "cpp/compaction_filters.hpp" namespace "py_rocks":
+    cdef cppclass CompactionFilterWrapper(CompactionFilter):
+        CompactionFilterWrapper(
+            string,
+            void*,
+            filter_func,
+            release_func) nogil except+
+        void set_info_log(shared_ptr[Logger]) nogil except+
+
+    cdef cppclass SharedCompactionFilter(CompactionFilter):
+        SharedCompactionFilter(shared_ptr[CompactionFilter]) nogil except+
+
+    cdef cppclass CompactionFilterFactoryWrapper(CompactionFilterFactory):
+        CompactionFilterFactoryWrapper(
+            string,
+            void*,
+            create_compaction_filter_func) nogil except+
+        void set_info_log(shared_ptr[Logger]) nogil except+
+
+    cdef cppclass TTLFilter(CompactionFilter):
+        TTLFilter(int64_t) nogil except+
+
+    cdef cppclass PrefixDropFilter(CompactionFilter):
+        PrefixDropFilter(vector[string]) nogil except+
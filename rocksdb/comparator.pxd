@@ -9,6 +9,7 @@ cdef extern from "rocksdb/comparator.h" namespace "rocksdb":
         int Compare(const Slice&, const Slice&) const
 
     cdef extern const Comparator* BytewiseComparator() nogil except +
+    cdef extern const Comparator* ReverseBytewiseComparator() nogil except +
 
 ctypedef int (*compare_func)(
     void*,
@@ -21,3 +22,7 @@ cdef extern from "cpp/comparator_wrapper.hpp" namespace "py_rocks":
     cdef cppclass ComparatorWrapper:
         ComparatorWrapper(string, void*, compare_func) nogil except +
         void set_info_log(shared_ptr[Logger]) nogil except+
+
+cdef extern from "cpp/comparators.hpp" namespace "py_rocks":
+    cdef cppclass UInt64Comparator(Comparator):
+        UInt64Comparator() nogil except +
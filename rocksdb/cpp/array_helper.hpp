@@ -0,0 +1,142 @@
+#pragma once
+
+#include <string>
+#include <vector>
+#include <cstring>
+#include <stdint.h>
+#include "rocksdb/db.h"
+#include "rocksdb/write_batch.h"
+
+using std::vector;
+using rocksdb::DB;
+using rocksdb::ColumnFamilyHandle;
+using rocksdb::ReadOptions;
+using rocksdb::WriteBatch;
+using rocksdb::PinnableSlice;
+using rocksdb::Slice;
+using rocksdb::Status;
+
+/* Bulk operations on arrays of fixed size keys and values. An array is a
+ * contiguous block of 'n' items of 'item_size' bytes each, like the memory
+ * of a numpy array. No python object is touched, so everything here is
+ * called without holding the GIL.
+ */
+namespace py_rocks {
+
+static vector<Slice>
+array_to_slices(const char* data, size_t item_size, size_t n)
+{
+    vector<Slice> slices;
+    slices.reserve(n);
+    for (size_t i = 0; i < n; i++) {
+        slices.push_back(Slice(data + i * item_size, item_size));
+    }
+    return slices;
+}
+
+class ArrayMultiGet {
+    public:
+        ArrayMultiGet(size_t n): values(n), statuses(n) {}
+
+        void run(
+            DB* db,
+            const ReadOptions& opts,
+            ColumnFamilyHandle* cf,
+            const char* keys,
+            size_t key_size,
+            bool sorted_input)
+        {
+            vector<Slice> slices = array_to_slices(keys, key_size, this->values.size());
+
+            db->MultiGet(
+                opts,
+                cf,
+                slices.size(),
+                slices.data(),
+                this->values.data(),
+                this->statuses.data(),
+                sorted_input);
+        }
+
+        /* Index of the first lookup which failed for another reason than
+         * a missing key, -1 if there is none.
+         */
+        int64_t first_error() const {
+            for (size_t i = 0; i < this->statuses.size(); i++) {
+                if (!this->statuses[i].ok() && !this->statuses[i].IsNotFound()) {
+                    return static_cast<int64_t>(i);
+                }
+            }
+            return -1;
+        }
+
+        const Status& status(size_t i) const {
+            return this->statuses[i];
+        }
+
+        size_t max_value_size() const {
+            size_t result = 0;
+            for (size_t i = 0; i < this->values.size(); i++) {
+                if (this->statuses[i].ok() && this->values[i].size() > result) {
+                    result = this->values[i].size();
+                }
+            }
+            return result;
+        }
+
+        /* Copies the values found into 'out', which has room for 'n' values
+         * of 'value_size' bytes. Shorter values are padded with zeros.
+         * 'found' gets 1 for every key found, 0 otherwise.
+         * Returns the index of the first value larger than 'value_size',
+         * -1 if all of them fit.
+         */
+        int64_t copy_values(char* out, size_t value_size, unsigned char* found) const {
+            for (size_t i = 0; i < this->values.size(); i++) {
+                char* slot = out + i * value_size;
+                const PinnableSlice& value = this->values[i];
+
+                if (!this->statuses[i].ok()) {
+                    found[i] = 0;
+                    memset(slot, 0, value_size);
+                    continue;
+                }
+
+                if (value.size() > value_size) {
+                    return static_cast<int64_t>(i);
+                }
+
+                found[i] = 1;
+                memcpy(slot, value.data(), value.size());
+                memset(slot + value.size(), 0, value_size - value.size());
+            }
+            return -1;
+        }
+
+        size_t value_size(size_t i) const {
+            return this->values[i].size();
+        }
+
+    private:
+        vector<PinnableSlice> values;
+        vector<Status> statuses;
+};
+
+inline void
+array_put(
+    WriteBatch* batch,
+    ColumnFamilyHandle* cf,
+    const char* keys,
+    size_t key_size,
+    const char* values,
+    size_t value_size,
+    size_t n)
+{
+    for (size_t i = 0; i < n; i++) {
+        batch->Put(
+            cf,
+            Slice(keys + i * key_size, key_size),
+            Slice(values + i * value_size, value_size));
+    }
+}
+
+}
@@ -0,0 +1,37 @@
+#pragma once
+
+#include "rocksdb/db.h"
+#include "rocksdb/utilities/backup_engine.h"
+
+using rocksdb::DB;
+using rocksdb::BackupEngine;
+using rocksdb::Status;
+
+namespace py_rocks {
+
+typedef void (*progress_func)(void*);
+
+/* CreateNewBackup takes the progress callback as std::function, which
+ * cython can't construct. 'progress_callback' is called with 'ctx' every
+ * BackupEngineOptions::callback_trigger_interval_size bytes. With
+ * max_background_operations > 1 that happens on the copy threads.
+ */
+inline Status
+create_backup(
+    BackupEngine* engine,
+    DB* db,
+    bool flush_before_backup,
+    void* ctx,
+    progress_func progress_callback)
+{
+    if (progress_callback == NULL) {
+        return engine->CreateNewBackup(db, flush_before_backup);
+    }
+
+    return engine->CreateNewBackup(
+        db,
+        flush_before_backup,
+        [ctx, progress_callback]() { progress_callback(ctx); });
+}
+
+}
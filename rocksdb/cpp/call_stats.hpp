@@ -0,0 +1,105 @@
+#pragma once
+
+#include <chrono>
+#include <stdint.h>
+
+/* Counters and latency histograms of the binding itself, used by
+ * rocksdb.instrumentation. They are only updated with the GIL held,
+ * so there is no locking here.
+ */
+namespace py_rocks {
+
+/* Bucket 'i' counts durations up to 2^i microseconds, the last one
+ * everything longer.
+ */
+static const size_t CALL_STATS_BUCKETS = 24;
+
+inline uint64_t
+monotonic_nanos()
+{
+    return static_cast<uint64_t>(
+        std::chrono::duration_cast<std::chrono::nanoseconds>(
+            std::chrono::steady_clock::now().time_since_epoch()).count());
+}
+
+inline uint64_t
+bucket_bound_nanos(size_t i)
+{
+    return static_cast<uint64_t>(1000) << i;
+}
+
+class CallHistogram {
+    public:
+        CallHistogram() {
+            this->reset();
+        }
+
+        void add(uint64_t nanos) {
+            size_t i = 0;
+            while (i < CALL_STATS_BUCKETS && nanos > bucket_bound_nanos(i)) {
+                i++;
+            }
+            this->buckets[i]++;
+            this->count++;
+            this->sum_nanos += nanos;
+            if (nanos > this->max_nanos) {
+                this->max_nanos = nanos;
+            }
+        }
+
+        void reset() {
+            for (size_t i = 0; i <= CALL_STATS_BUCKETS; i++) {
+                this->buckets[i] = 0;
+            }
+            this->count = 0;
+            this->sum_nanos = 0;
+            this->max_nanos = 0;
+        }
+
+        uint64_t bucket(size_t i) const {
+            return this->buckets[i];
+        }
+
+        uint64_t count;
+        uint64_t sum_nanos;
+        uint64_t max_nanos;
+
+    private:
+        uint64_t buckets[CALL_STATS_BUCKETS + 1];
+};
+
+class CallStats {
+    public:
+        CallStats(): calls(0), errors(0) {}
+
+        /* 'acquired' is when the GIL was acquired by a callback, 0 for calls
+         * which started with the GIL held.
+         */
+        void record(uint64_t started, uint64_t acquired, uint64_t finished, bool failed) {
+            this->calls++;
+            if (failed) {
+                this->errors++;
+            }
+
+            if (acquired != 0) {
+                this->gil_wait.add(acquired - started);
+                this->latency.add(finished - acquired);
+            } else {
+                this->latency.add(finished - started);
+            }
+        }
+
+        void reset() {
+            this->calls = 0;
+            this->errors = 0;
+            this->latency.reset();
+            this->gil_wait.reset();
+        }
+
+        uint64_t calls;
+        uint64_t errors;
+        CallHistogram latency;
+        CallHistogram gil_wait;
+};
+
+}
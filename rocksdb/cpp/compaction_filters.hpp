@@ -0,0 +1,231 @@
+#pragma once
+
+#include <string>
+#include <vector>
+#include <memory>
+#include <ctime>
+#include <stdint.h>
+#include "rocksdb/env.h"
+#include "rocksdb/compaction_filter.h"
+
+using std::string;
+using std::vector;
+using rocksdb::Slice;
+using rocksdb::Logger;
+using rocksdb::CompactionFilter;
+using rocksdb::CompactionFilterFactory;
+
+namespace py_rocks {
+    /* Calls the python filter 'ctx'. If 'release_callback' is given it is
+     * called with 'ctx' on destruction, this way a reference to the python
+     * object can be owned by this filter.
+     */
+    class CompactionFilterWrapper: public CompactionFilter {
+        public:
+            typedef bool (*filter_func)(
+                void*,
+                Logger*,
+                int level,
+                const Slice& key,
+                const Slice& existing_value,
+                string* new_value,
+                bool* value_changed);
+
+            typedef void (*release_func)(void*);
+
+            CompactionFilterWrapper(
+                string name,
+                void* ctx,
+                filter_func filter_callback,
+                release_func release_callback):
+                    name(name),
+                    ctx(ctx),
+                    filter_callback(filter_callback),
+                    release_callback(release_callback)
+            {}
+
+            virtual ~CompactionFilterWrapper() {
+                if (this->release_callback != NULL) {
+                    this->release_callback(this->ctx);
+                }
+            }
+
+            virtual bool Filter(
+                int level,
+                const Slice& key,
+                const Slice& existing_value,
+                string* new_value,
+                bool* value_changed) const
+            {
+                return this->filter_callback(
+                    this->ctx,
+                    this->info_log.get(),
+                    level,
+                    key,
+                    existing_value,
+                    new_value,
+                    value_changed);
+            }
+
+            virtual const char* Name() const {
+                return this->name.c_str();
+            }
+
+            void set_info_log(std::shared_ptr<Logger> info_log) {
+                this->info_log = info_log;
+            }
+
+        private:
+            string name;
+            void* ctx;
+            filter_func filter_callback;
+            release_func release_callback;
+            std::shared_ptr<Logger> info_log;
+    };
+
+    /* Lets a compaction filter factory hand out a filter which is shared
+     * with the python object that created it.
+     */
+    class SharedCompactionFilter: public CompactionFilter {
+        public:
+            SharedCompactionFilter(std::shared_ptr<CompactionFilter> filter):
+                filter(filter)
+            {}
+
+            virtual bool Filter(
+                int level,
+                const Slice& key,
+                const Slice& existing_value,
+                string* new_value,
+                bool* value_changed) const
+            {
+                return this->filter->Filter(
+                    level,
+                    key,
+                    existing_value,
+                    new_value,
+                    value_changed);
+            }
+
+            virtual const char* Name() const {
+                return this->filter->Name();
+            }
+
+        private:
+            std::shared_ptr<CompactionFilter> filter;
+    };
+
+    class CompactionFilterFactoryWrapper: public CompactionFilterFactory {
+        public:
+            typedef CompactionFilter* (*create_func)(
+                void*,
+                std::shared_ptr<Logger>,
+                bool is_full_compaction,
+                bool is_manual_compaction,
+                uint32_t column_family_id);
+
+            CompactionFilterFactoryWrapper(
+                string name,
+                void* ctx,
+                create_func create_callback):
+                    name(name),
+                    ctx(ctx),
+                    create_callback(create_callback)
+            {}
+
+            virtual std::unique_ptr<CompactionFilter> CreateCompactionFilter(
+                const CompactionFilter::Context& context)
+            {
+                return std::unique_ptr<CompactionFilter>(
+                    this->create_callback(
+                        this->ctx,
+                        this->info_log,
+                        context.is_full_compaction,
+                        context.is_manual_compaction,
+                        context.column_family_id));
+            }
+
+            virtual const char* Name() const {
+                return this->name.c_str();
+            }
+
+            void set_info_log(std::shared_ptr<Logger> info_log) {
+                this->info_log = info_log;
+            }
+
+        private:
+            string name;
+            void* ctx;
+            create_func create_callback;
+            std::shared_ptr<Logger> info_log;
+    };
+
+    /* Removes entries whose value ends with a 4 byte little endian unix
+     * timestamp older than 'ttl' seconds. This is the same format
+     * DBWithTTL of RocksDB uses. Every value must carry the timestamp,
+     * the last 4 bytes of any value are read as one. Only values shorter
+     * than 4 bytes are kept unconditionally.
+     */
+    class TTLFilter: public CompactionFilter {
+        public:
+            TTLFilter(int64_t ttl): ttl(ttl) {}
+
+            virtual bool Filter(
+                int level,
+                const Slice& key,
+                const Slice& existing_value,
+                string* new_value,
+                bool* value_changed) const
+            {
+                if (existing_value.size() < 4) {
+                    return false;
+                }
+
+                const unsigned char* data = reinterpret_cast<const unsigned char*>(
+                    existing_value.data() + existing_value.size() - 4);
+
+                int64_t timestamp = static_cast<int64_t>(
+                    static_cast<uint32_t>(data[0]) |
+                    (static_cast<uint32_t>(data[1]) << 8) |
+                    (static_cast<uint32_t>(data[2]) << 16) |
+                    (static_cast<uint32_t>(data[3]) << 24));
+
+                return timestamp + this->ttl < static_cast<int64_t>(time(NULL));
+            }
+
+            virtual const char* Name() const {
+                return "py_rocks.TTLFilter";
+            }
+
+        private:
+            int64_t ttl;
+    };
+
+    /* Removes all entries whose key starts with one of 'prefixes'. */
+    class PrefixDropFilter: public CompactionFilter {
+        public:
+            PrefixDropFilter(vector<string> prefixes): prefixes(prefixes) {}
+
+            virtual bool Filter(
+                int level,
+                const Slice& key,
+                const Slice& existing_value,
+                string* new_value,
+                bool* value_changed) const
+            {
+                for (size_t i = 0; i < this->prefixes.size(); i++) {
+                    if (key.starts_with(this->prefixes[i])) {
+                        return true;
+                    }
+                }
+                return false;
+            }
+
+            virtual const char* Name() const {
+                return "py_rocks.PrefixDropFilter";
+            }
+
+        private:
+            vector<string> prefixes;
+    };
+}
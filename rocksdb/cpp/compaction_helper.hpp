@@ -0,0 +1,32 @@
+#pragma once
+
+#include <chrono>
+#include <stdint.h>
+#include "rocksdb/db.h"
+#include "rocksdb/options.h"
+
+using rocksdb::DB;
+using rocksdb::Status;
+
+namespace py_rocks {
+
+/* WaitForCompactOptions::timeout is a std::chrono::microseconds, which
+ * cython can't construct. A negative 'timeout_micros' waits forever,
+ * rocksdb takes zero for that. Returns TimedOut if the timeout expired
+ * first, also while the background work is paused.
+ */
+inline Status
+wait_for_compact(DB* db, int64_t timeout_micros, bool flush)
+{
+    rocksdb::WaitForCompactOptions opts;
+    opts.flush = flush;
+
+    if (timeout_micros >= 0) {
+        opts.timeout = std::chrono::microseconds(
+            timeout_micros > 0 ? timeout_micros : 1);
+    }
+
+    return db->WaitForCompact(opts);
+}
+
+}
@@ -0,0 +1,60 @@
+#pragma once
+
+#include <stdint.h>
+#include "rocksdb/comparator.h"
+
+using std::string;
+using rocksdb::Comparator;
+using rocksdb::Slice;
+
+namespace py_rocks {
+    /* Orders keys which are unsigned 64 bit integers encoded as 8 bytes
+     * little endian by their numeric value.
+     *
+     * Big endian keys don't need this, they are already ordered correctly
+     * by the BytewiseComparator.
+     *
+     * Keys of another size are sorted by their size first, so the ordering
+     * stays consistent if some of them slip in.
+     */
+    class UInt64Comparator: public Comparator {
+        public:
+            virtual int Compare(const Slice& a, const Slice& b) const {
+                if (a.size() != b.size()) {
+                    return a.size() < b.size() ? -1 : 1;
+                }
+
+                if (a.size() != sizeof(uint64_t)) {
+                    return a.compare(b);
+                }
+
+                uint64_t left = decode(a);
+                uint64_t right = decode(b);
+
+                if (left < right) {
+                    return -1;
+                }
+                if (left > right) {
+                    return 1;
+                }
+                return 0;
+            }
+
+            virtual const char* Name() const {
+                return "py_rocks.UInt64Comparator";
+            }
+
+            virtual void FindShortestSeparator(string*, const Slice&) const {}
+            virtual void FindShortSuccessor(string*) const {}
+
+        private:
+            static uint64_t decode(const Slice& value) {
+                const unsigned char* data = reinterpret_cast<const unsigned char*>(value.data());
+                uint64_t result = 0;
+                for (size_t i = 0; i < sizeof(uint64_t); i++) {
+                    result |= static_cast<uint64_t>(data[i]) << (8 * i);
+                }
+                return result;
+            }
+    };
+}
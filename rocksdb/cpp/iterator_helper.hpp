@@ -0,0 +1,114 @@
+#pragma once
+
+#include <string>
+#include <vector>
+#include "rocksdb/iterator.h"
+
+using std::string;
+using std::vector;
+using rocksdb::Iterator;
+using rocksdb::Slice;
+using rocksdb::Status;
+
+namespace py_rocks {
+
+/* Reads up to 'n' entries from 'it' and appends them to the contiguous
+ * buffers 'keys' and 'values'. Both may be NULL if the caller is not
+ * interested in them. For every entry read the end position inside the
+ * buffer is appended to 'key_offsets'/'value_offsets', entry i spans
+ * [offsets[i], offsets[i + 1]). Before the first entry the current size of
+ * the buffer is pushed, so the offsets always have 'count' + 1 elements.
+ * If 'prefix' is not NULL reading stops at the first key without it.
+ *
+ * Afterwards the iterator is positioned behind the last entry read.
+ * No python object is touched, so this is called without holding the GIL.
+ */
+template <typename Offset>
+Status
+iterator_next_batch(
+    Iterator* it,
+    size_t n,
+    bool reverse,
+    const Slice* prefix,
+    string* keys,
+    vector<Offset>* key_offsets,
+    string* values,
+    vector<Offset>* value_offsets,
+    size_t* count)
+{
+    Slice key;
+    Slice value;
+
+    *count = 0;
+
+    if (keys != NULL) {
+        key_offsets->push_back(static_cast<Offset>(keys->size()));
+    }
+
+    if (values != NULL) {
+        value_offsets->push_back(static_cast<Offset>(values->size()));
+    }
+
+    while (*count < n && it->Valid()) {
+        if (prefix != NULL && !it->key().starts_with(*prefix)) {
+            break;
+        }
+
+        if (keys != NULL) {
+            key = it->key();
+            keys->append(key.data(), key.size());
+            key_offsets->push_back(static_cast<Offset>(keys->size()));
+        }
+
+        if (values != NULL) {
+            value = it->value();
+            values->append(value.data(), value.size());
+            value_offsets->push_back(static_cast<Offset>(values->size()));
+        }
+
+        if (reverse) {
+            it->Prev();
+        } else {
+            it->Next();
+        }
+
+        (*count)++;
+    }
+
+    return it->status();
+}
+
+/* Undoes the last 'n' steps of iterator_next_batch in the direction
+ * 'reverse', so 'it' is positioned on the first of the 'n' entries again.
+ * If the batch ran off the end, the iterator is invalid and continues from
+ * the last (first for 'reverse') entry instead.
+ */
+inline Status
+iterator_unread(Iterator* it, size_t n, bool reverse)
+{
+    if (n == 0 || !it->status().ok()) {
+        return it->status();
+    }
+
+    if (!it->Valid()) {
+        if (reverse) {
+            it->SeekToFirst();
+        } else {
+            it->SeekToLast();
+        }
+        n--;
+    }
+
+    while (n > 0 && it->Valid()) {
+        if (reverse) {
+            it->Next();
+        } else {
+            it->Prev();
+        }
+        n--;
+    }
+
+    return it->status();
+}
+
+}
@@ -0,0 +1,199 @@
+#pragma once
+
+#include <string>
+#include <stdint.h>
+#include "rocksdb/env.h"
+#include "rocksdb/merge_operator.h"
+
+using std::string;
+using rocksdb::Slice;
+using rocksdb::Logger;
+using rocksdb::AssociativeMergeOperator;
+
+/* Merge operators implemented in C++. They never call back into python,
+ * so compactions and reads using them don't need the GIL.
+ */
+namespace py_rocks {
+    /* Values are unsigned 64 bit integers encoded as 8 bytes little endian,
+     * the same format as the UInt64AddOperator shipped with RocksDB.
+     * Overflows wrap around.
+     */
+    class UInt64AddOperator: public AssociativeMergeOperator {
+        public:
+            virtual bool Merge(
+                const Slice& key,
+                const Slice* existing_value,
+                const Slice& value,
+                string* new_value,
+                Logger* logger) const
+            {
+                uint64_t result = 0;
+
+                if (existing_value != NULL) {
+                    if (!decode(*existing_value, &result, logger)) {
+                        return false;
+                    }
+                }
+
+                uint64_t operand;
+                if (!decode(value, &operand, logger)) {
+                    return false;
+                }
+
+                result += operand;
+
+                new_value->resize(sizeof(uint64_t));
+                for (size_t i = 0; i < sizeof(uint64_t); i++) {
+                    (*new_value)[i] = static_cast<char>((result >> (8 * i)) & 0xff);
+                }
+                return true;
+            }
+
+            virtual const char* Name() const {
+                return "UInt64AddOperator";
+            }
+
+        private:
+            static bool decode(const Slice& value, uint64_t* result, Logger* logger) {
+                if (value.size() != sizeof(uint64_t)) {
+                    rocksdb::Log(
+                        logger,
+                        "UInt64AddOperator: value has %d bytes, expected 8",
+                        static_cast<int>(value.size()));
+                    return false;
+                }
+
+                const unsigned char* data = reinterpret_cast<const unsigned char*>(value.data());
+                *result = 0;
+                for (size_t i = 0; i < sizeof(uint64_t); i++) {
+                    *result |= static_cast<uint64_t>(data[i]) << (8 * i);
+                }
+                return true;
+            }
+    };
+
+    /* Concatenates the values, separated by 'delim'. */
+    class StringAppendOperator: public AssociativeMergeOperator {
+        public:
+            StringAppendOperator(string delim): delim(delim) {}
+
+            virtual bool Merge(
+                const Slice& key,
+                const Slice* existing_value,
+                const Slice& value,
+                string* new_value,
+                Logger* logger) const
+            {
+                new_value->clear();
+
+                if (existing_value != NULL) {
+                    new_value->reserve(existing_value->size() + this->delim.size() + value.size());
+                    new_value->assign(existing_value->data(), existing_value->size());
+                    new_value->append(this->delim);
+                }
+
+                new_value->append(value.data(), value.size());
+                return true;
+            }
+
+            virtual const char* Name() const {
+                return "StringAppendOperator";
+            }
+
+        private:
+            string delim;
+    };
+
+    /* Keeps the bytewise largest (or smallest if 'min' is set) value. */
+    class MaxOperator: public AssociativeMergeOperator {
+        public:
+            MaxOperator(bool min = false): min(min) {}
+
+            virtual bool Merge(
+                const Slice& key,
+                const Slice* existing_value,
+                const Slice& value,
+                string* new_value,
+                Logger* logger) const
+            {
+                const Slice* result = &value;
+
+                if (existing_value != NULL) {
+                    int cmp = existing_value->compare(value);
+                    if ((this->min && cmp < 0) || (!this->min && cmp > 0)) {
+                        result = existing_value;
+                    }
+                }
+
+                new_value->assign(result->data(), result->size());
+                return true;
+            }
+
+            virtual const char* Name() const {
+                if (this->min) {
+                    return "MinOperator";
+                }
+                return "MaxOperator";
+            }
+
+        private:
+            bool min;
+    };
+
+    /* Like StringAppendOperator, but only the last 'max_items' items are kept.
+     * Items are separated by 'delim', so they must not contain it.
+     * Dropping items from the front keeps this operator associative.
+     */
+    class BoundedListAppendOperator: public AssociativeMergeOperator {
+        public:
+            BoundedListAppendOperator(size_t max_items, string delim):
+                max_items(max_items),
+                delim(delim)
+            {}
+
+            virtual bool Merge(
+                const Slice& key,
+                const Slice* existing_value,
+                const Slice& value,
+                string* new_value,
+                Logger* logger) const
+            {
+                new_value->clear();
+
+                if (existing_value != NULL) {
+                    new_value->reserve(existing_value->size() + this->delim.size() + value.size());
+                    new_value->assign(existing_value->data(), existing_value->size());
+                    new_value->append(this->delim);
+                }
+
+                new_value->append(value.data(), value.size());
+
+                // Walk backwards until 'max_items' delimiters are found,
+                // everything before the last one found is dropped.
+                size_t items = 1;
+                size_t pos = new_value->size();
+                while (pos > 0) {
+                    pos = new_value->rfind(this->delim, pos - 1);
+                    if (pos == string::npos) {
+                        break;
+                    }
+
+                    if (items == this->max_items) {
+                        new_value->erase(0, pos + this->delim.size());
+                        break;
+                    }
+                    items++;
+                }
+
+                return true;
+            }
+
+            virtual const char* Name() const {
+                return "BoundedListAppendOperator";
+            }
+
+        private:
+            size_t max_items;
+            string delim;
+    };
+}
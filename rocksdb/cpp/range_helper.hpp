@@ -0,0 +1,122 @@
+#pragma once
+
+#include <string>
+#include <vector>
+#include <algorithm>
+#include <cmath>
+#include <stdint.h>
+#include "rocksdb/db.h"
+#include "rocksdb/comparator.h"
+
+using std::string;
+using std::vector;
+using rocksdb::DB;
+using rocksdb::ColumnFamilyHandle;
+using rocksdb::Comparator;
+using rocksdb::Range;
+using rocksdb::Status;
+
+namespace py_rocks {
+
+class KeyLess {
+    public:
+        KeyLess(const Comparator* cmp): cmp(cmp) {}
+
+        bool operator()(const string& a, const string& b) const {
+            return this->cmp->Compare(a, b) < 0;
+        }
+
+    private:
+        const Comparator* cmp;
+};
+
+class KeyEqual {
+    public:
+        KeyEqual(const Comparator* cmp): cmp(cmp) {}
+
+        bool operator()(const string& a, const string& b) const {
+            return this->cmp->Compare(a, b) == 0;
+        }
+
+    private:
+        const Comparator* cmp;
+};
+
+/* Splits the keys of 'cf' into at most 'n' ranges of roughly the same size
+ * in bytes. The boundaries are chosen from the smallest and largest keys of
+ * the SST files, so a DB with few files gives less ranges.
+ * 'result' gets the boundaries between the ranges in ascending order.
+ */
+inline Status
+split_key_ranges(DB* db, ColumnFamilyHandle* cf, size_t n, vector<string>* result)
+{
+    vector<rocksdb::LiveFileMetaData> metadata;
+    vector<string> keys;
+    const Comparator* cmp = cf->GetComparator();
+
+    db->GetLiveFilesMetaData(&metadata);
+    for (size_t i = 0; i < metadata.size(); i++) {
+        if (metadata[i].column_family_name == cf->GetName()) {
+            keys.push_back(metadata[i].smallestkey);
+            keys.push_back(metadata[i].largestkey);
+        }
+    }
+
+    std::sort(keys.begin(), keys.end(), KeyLess(cmp));
+    keys.erase(std::unique(keys.begin(), keys.end(), KeyEqual(cmp)), keys.end());
+
+    if (n < 2 || keys.size() < 3) {
+        return Status::OK();
+    }
+
+    vector<Range> ranges;
+    for (size_t i = 1; i < keys.size(); i++) {
+        ranges.push_back(Range(keys[i - 1], keys[i]));
+    }
+
+    rocksdb::SizeApproximationOptions size_opts;
+    size_opts.include_files = true;
+    size_opts.include_memtables = true;
+
+    vector<uint64_t> sizes(ranges.size());
+    Status st = db->GetApproximateSizes(
+        size_opts,
+        cf,
+        ranges.data(),
+        static_cast<int>(ranges.size()),
+        sizes.data());
+
+    if (!st.ok()) {
+        return st;
+    }
+
+    // offsets[i] is the size of everything before keys[i].
+    vector<double> offsets(keys.size(), 0);
+    for (size_t i = 1; i < keys.size(); i++) {
+        offsets[i] = offsets[i - 1] + sizes[i - 1];
+    }
+
+    // For every boundary take the key closest to its ideal offset.
+    // The first and the last key are never used, the ranges before
+    // respectively after them would contain a single key only.
+    size_t pos = 1;
+    size_t last = 0;
+    for (size_t j = 1; j < n; j++) {
+        double target = offsets.back() * j / n;
+
+        while (pos + 2 < keys.size() &&
+               std::abs(offsets[pos + 1] - target) <= std::abs(offsets[pos] - target))
+        {
+            pos++;
+        }
+
+        if (pos > last) {
+            result->push_back(keys[pos]);
+            last = pos;
+        }
+    }
+
+    return Status::OK();
+}
+
+}
@@ -0,0 +1,134 @@
+#pragma once
+
+#include <string>
+#include <vector>
+#include <utility>
+#include <stdint.h>
+#include "rocksdb/statistics.h"
+#include "rocksdb/perf_context.h"
+#include "rocksdb/iostats_context.h"
+
+using std::string;
+using std::vector;
+using std::pair;
+using rocksdb::Statistics;
+using rocksdb::HistogramData;
+using rocksdb::PerfContext;
+using rocksdb::IOStatsContext;
+
+namespace py_rocks {
+
+typedef vector<pair<string, uint64_t> > counter_list;
+typedef vector<pair<string, HistogramData> > histogram_list;
+
+inline void
+get_tickers(Statistics* stats, counter_list* result)
+{
+    for (size_t i = 0; i < rocksdb::TickersNameMap.size(); i++) {
+        result->push_back(std::make_pair(
+            rocksdb::TickersNameMap[i].second,
+            stats->getTickerCount(rocksdb::TickersNameMap[i].first)));
+    }
+}
+
+inline void
+get_histograms(Statistics* stats, histogram_list* result)
+{
+    HistogramData data;
+
+    for (size_t i = 0; i < rocksdb::HistogramsNameMap.size(); i++) {
+        stats->histogramData(rocksdb::HistogramsNameMap[i].first, &data);
+        result->push_back(std::make_pair(
+            rocksdb::HistogramsNameMap[i].second,
+            data));
+    }
+}
+
+/* The perf and iostats contexts are thread local, so these have to run on
+ * the thread which did the operations of interest.
+ */
+#define PY_ROCKS_COUNTER(ctx, name) \
+    result->push_back(std::make_pair(string(#name), static_cast<uint64_t>(ctx->name)))
+
+inline void
+get_perf_context(counter_list* result)
+{
+    PerfContext* ctx = rocksdb::get_perf_context();
+
+    PY_ROCKS_COUNTER(ctx, user_key_comparison_count);
+    PY_ROCKS_COUNTER(ctx, block_cache_hit_count);
+    PY_ROCKS_COUNTER(ctx, block_read_count);
+    PY_ROCKS_COUNTER(ctx, block_read_byte);
+    PY_ROCKS_COUNTER(ctx, block_read_time);
+    PY_ROCKS_COUNTER(ctx, block_checksum_time);
+    PY_ROCKS_COUNTER(ctx, block_decompress_time);
+    PY_ROCKS_COUNTER(ctx, get_read_bytes);
+    PY_ROCKS_COUNTER(ctx, multiget_read_bytes);
+    PY_ROCKS_COUNTER(ctx, iter_read_bytes);
+    PY_ROCKS_COUNTER(ctx, internal_key_skipped_count);
+    PY_ROCKS_COUNTER(ctx, internal_delete_skipped_count);
+    PY_ROCKS_COUNTER(ctx, internal_recent_skipped_count);
+    PY_ROCKS_COUNTER(ctx, internal_merge_count);
+    PY_ROCKS_COUNTER(ctx, get_snapshot_time);
+    PY_ROCKS_COUNTER(ctx, get_from_memtable_time);
+    PY_ROCKS_COUNTER(ctx, get_from_memtable_count);
+    PY_ROCKS_COUNTER(ctx, get_post_process_time);
+    PY_ROCKS_COUNTER(ctx, get_from_output_files_time);
+    PY_ROCKS_COUNTER(ctx, seek_on_memtable_time);
+    PY_ROCKS_COUNTER(ctx, seek_on_memtable_count);
+    PY_ROCKS_COUNTER(ctx, next_on_memtable_count);
+    PY_ROCKS_COUNTER(ctx, prev_on_memtable_count);
+    PY_ROCKS_COUNTER(ctx, seek_child_seek_time);
+    PY_ROCKS_COUNTER(ctx, seek_child_seek_count);
+    PY_ROCKS_COUNTER(ctx, seek_min_heap_time);
+    PY_ROCKS_COUNTER(ctx, seek_max_heap_time);
+    PY_ROCKS_COUNTER(ctx, seek_internal_seek_time);
+    PY_ROCKS_COUNTER(ctx, find_next_user_entry_time);
+    PY_ROCKS_COUNTER(ctx, write_wal_time);
+    PY_ROCKS_COUNTER(ctx, write_memtable_time);
+    PY_ROCKS_COUNTER(ctx, write_delay_time);
+    PY_ROCKS_COUNTER(ctx, write_pre_and_post_process_time);
+    PY_ROCKS_COUNTER(ctx, db_mutex_lock_nanos);
+    PY_ROCKS_COUNTER(ctx, db_condition_wait_nanos);
+    PY_ROCKS_COUNTER(ctx, merge_operator_time_nanos);
+    PY_ROCKS_COUNTER(ctx, read_index_block_nanos);
+    PY_ROCKS_COUNTER(ctx, read_filter_block_nanos);
+    PY_ROCKS_COUNTER(ctx, new_table_block_iter_nanos);
+    PY_ROCKS_COUNTER(ctx, new_table_iterator_nanos);
+    PY_ROCKS_COUNTER(ctx, block_seek_nanos);
+    PY_ROCKS_COUNTER(ctx, find_table_nanos);
+    PY_ROCKS_COUNTER(ctx, bloom_memtable_hit_count);
+    PY_ROCKS_COUNTER(ctx, bloom_memtable_miss_count);
+    PY_ROCKS_COUNTER(ctx, bloom_sst_hit_count);
+    PY_ROCKS_COUNTER(ctx, bloom_sst_miss_count);
+    PY_ROCKS_COUNTER(ctx, env_new_sequential_file_nanos);
+    PY_ROCKS_COUNTER(ctx, env_new_random_access_file_nanos);
+}
+
+inline void
+get_iostats_context(counter_list* result)
+{
+    IOStatsContext* ctx = rocksdb::get_iostats_context();
+
+    PY_ROCKS_COUNTER(ctx, bytes_written);
+    PY_ROCKS_COUNTER(ctx, bytes_read);
+    PY_ROCKS_COUNTER(ctx, open_nanos);
+    PY_ROCKS_COUNTER(ctx, allocate_nanos);
+    PY_ROCKS_COUNTER(ctx, write_nanos);
+    PY_ROCKS_COUNTER(ctx, read_nanos);
+    PY_ROCKS_COUNTER(ctx, range_sync_nanos);
+    PY_ROCKS_COUNTER(ctx, fsync_nanos);
+    PY_ROCKS_COUNTER(ctx, prepare_write_nanos);
+    PY_ROCKS_COUNTER(ctx, logger_nanos);
+}
+
+#undef PY_ROCKS_COUNTER
+
+inline void
+reset_perf_context()
+{
+    rocksdb::get_perf_context()->Reset();
+    rocksdb::get_iostats_context()->Reset();
+}
+
+}
@@ -0,0 +1,102 @@
+#pragma once
+
+#include <string>
+#include <vector>
+#include <memory>
+#include <stdint.h>
+#include "rocksdb/db.h"
+#include "rocksdb/env.h"
+#include "rocksdb/transaction_log.h"
+
+using std::string;
+using std::vector;
+using std::unique_ptr;
+using rocksdb::DB;
+using rocksdb::Status;
+using rocksdb::SequenceNumber;
+using rocksdb::BatchResult;
+using rocksdb::TransactionLogIterator;
+
+namespace py_rocks {
+
+/* Reads up to 'max_batches' write batches from the WAL, starting at
+ * 'next_sequence' which is advanced past the batches read.
+ * A TransactionLogIterator does not see writes done after it reached the
+ * end of the WAL, so 'it' is replaced by a new one starting at
+ * 'next_sequence' once it is exhausted.
+ * With concurrent writes the iterator may stop with TryAgain, when it hit
+ * a batch which was not completely written yet. That is treated as
+ * exhausted too, the batch is read by the next iterator.
+ */
+inline Status
+read_updates(
+    DB* db,
+    unique_ptr<TransactionLogIterator>* it,
+    SequenceNumber* next_sequence,
+    size_t max_batches,
+    vector<SequenceNumber>* sequences,
+    vector<string>* batches)
+{
+    if (!*it || !(*it)->Valid()) {
+        it->reset();
+        if (*next_sequence > db->GetLatestSequenceNumber()) {
+            return Status::OK();
+        }
+
+        Status st = db->GetUpdatesSince(*next_sequence, it);
+        if (st.IsTryAgain()) {
+            it->reset();
+            return Status::OK();
+        }
+        if (!st.ok()) {
+            return st;
+        }
+    }
+
+    while ((*it)->Valid() && batches->size() < max_batches) {
+        BatchResult result = (*it)->GetBatch();
+        SequenceNumber end = result.sequence + result.writeBatchPtr->Count();
+
+        // A new iterator may start with the last batch already read.
+        if (end > *next_sequence) {
+            sequences->push_back(result.sequence);
+            batches->push_back(result.writeBatchPtr->Data());
+            *next_sequence = end;
+        }
+
+        (*it)->Next();
+    }
+
+    Status st = (*it)->status();
+    if (!(*it)->Valid() && st.IsTryAgain()) {
+        it->reset();
+        return Status::OK();
+    }
+    return st;
+}
+
+/* Waits until 'sequence' is written. A negative 'timeout_micros' waits
+ * forever. Returns false if the timeout expired first.
+ */
+inline bool
+wait_for_sequence(
+    DB* db,
+    SequenceNumber sequence,
+    int64_t timeout_micros,
+    int64_t poll_micros)
+{
+    rocksdb::Env* env = db->GetEnv();
+    uint64_t start = env->NowMicros();
+
+    while (db->GetLatestSequenceNumber() < sequence) {
+        if (timeout_micros >= 0 &&
+            env->NowMicros() - start >= static_cast<uint64_t>(timeout_micros))
+        {
+            return false;
+        }
+        env->SleepForMicroseconds(static_cast<int>(poll_micros));
+    }
+    return true;
+}
+
+}
@@ -1,20 +1,29 @@
 cimport options
+from libc.stdint cimport uint32_t
 from libc.stdint cimport uint64_t
+from libc.stdint cimport int64_t
 from status cimport Status
 from libcpp cimport bool as cpp_bool
 from libcpp.string cimport string
 from libcpp.vector cimport vector
 from slice_ cimport Slice
+from slice_ cimport PinnableSlice
 from snapshot cimport Snapshot
 from iterator cimport Iterator
+from std_memory cimport unique_ptr
+from transaction_log cimport VectorLogPtr
+from transaction_log cimport TransactionLogIterator
 
 cdef extern from "rocksdb/write_batch.h" namespace "rocksdb":
     cdef cppclass WriteBatch:
         WriteBatch() nogil except+
         WriteBatch(string) nogil except+
         void Put(const Slice&, const Slice&) nogil except+
+        void Put(ColumnFamilyHandle*, const Slice&, const Slice&) nogil except+
         void Merge(const Slice&, const Slice&) nogil except+
+        void Merge(ColumnFamilyHandle*, const Slice&, const Slice&) nogil except+
         void Delete(const Slice&) nogil except+
+        void Delete(ColumnFamilyHandle*, const Slice&) nogil except+
         void PutLogData(const Slice&) nogil except+
         void Clear() nogil except+
         const string& Data() nogil except+
@@ -28,6 +37,7 @@ cdef extern from "cpp/write_batch_iter_helper.hpp" namespace "py_rocks":
 
     cdef cppclass BatchItem "py_rocks::RecordItemsHandler::BatchItem":
         BatchItemOp op
+        uint32_t column_family_id
         Slice key
         Slice value
 
@@ -38,6 +48,7 @@ cdef extern from "rocksdb/db.h" namespace "rocksdb":
     ctypedef uint64_t SequenceNumber
 
     cdef struct LiveFileMetaData:
+        string column_family_name
         string name
         int level
         uint64_t size
@@ -47,20 +58,38 @@ cdef extern from "rocksdb/db.h" namespace "rocksdb":
         SequenceNumber largest_seqno
 
     cdef cppclass Range:
+        Range()
         Range(const Slice&, const Slice&)
 
+    cdef cppclass ColumnFamilyHandle:
+        const string& GetName() nogil except+
+        uint32_t GetID() nogil except+
+
+    cdef cppclass ColumnFamilyDescriptor:
+        ColumnFamilyDescriptor()
+        ColumnFamilyDescriptor(
+            const string&,
+            const options.ColumnFamilyOptions&)
+        string name
+        options.ColumnFamilyOptions options
+
+    cdef const string kDefaultColumnFamilyName
+
     cdef cppclass DB:
         Status Put(
             const options.WriteOptions&,
+            ColumnFamilyHandle*,
             const Slice&,
             const Slice&) nogil except+
 
         Status Delete(
             const options.WriteOptions&,
+            ColumnFamilyHandle*,
             const Slice&) nogil except+
 
         Status Merge(
             const options.WriteOptions&,
+            ColumnFamilyHandle*,
             const Slice&,
             const Slice&) nogil except+
 
@@ -70,61 +99,102 @@ cdef extern from "rocksdb/db.h" namespace "rocksdb":
 
         Status Get(
             const options.ReadOptions&,
+            ColumnFamilyHandle*,
             const Slice&,
             string*) nogil except+
 
+        Status Get(
+            const options.ReadOptions&,
+            ColumnFamilyHandle*,
+            const Slice&,
+            PinnableSlice*) nogil except+
+
         vector[Status] MultiGet(
             const options.ReadOptions&,
+            const vector[ColumnFamilyHandle*]&,
             const vector[Slice]&,
             vector[string]*) nogil except+
 
         cpp_bool KeyMayExist(
             const options.ReadOptions&,
+            ColumnFamilyHandle*,
             Slice&,
             string*,
             cpp_bool*) nogil except+
 
-        cpp_bool KeyMayExist(
-            const options.ReadOptions&,
-            Slice&,
-            string*) nogil except+
-
         Iterator* NewIterator(
-            const options.ReadOptions&) nogil except+
+            const options.ReadOptions&,
+            ColumnFamilyHandle*) nogil except+
 
         const Snapshot* GetSnapshot() nogil except+
 
         void ReleaseSnapshot(const Snapshot*) nogil except+
 
         cpp_bool GetProperty(
+            ColumnFamilyHandle*,
             const Slice&,
             string*) nogil except+
 
-        void GetApproximateSizes(
-            const Range*
+        cpp_bool GetIntProperty(
+            ColumnFamilyHandle*,
+            const Slice&,
+            uint64_t*) nogil except+
+
+        Status GetApproximateSizes(
+            const options.SizeApproximationOptions&,
+            ColumnFamilyHandle*,
+            const Range*,
             int,
             uint64_t*) nogil except+
 
         Status CompactRange(
             const options.CompactRangeOptions&,
+            ColumnFamilyHandle*,
             const Slice*,
             const Slice*) nogil except+
 
+        Status CompactFiles(
+            const options.CompactionOptions&,
+            ColumnFamilyHandle*,
+            const vector[string]&,
+            int,
+            int,
+            vector[string]*) nogil except+
+
+        Status PauseBackgroundWork() nogil except+
+        Status ContinueBackgroundWork() nogil except+
+
+        Status CreateColumnFamily(
+            const options.ColumnFamilyOptions&,
+            const string&,
+            ColumnFamilyHandle**) nogil except+
+
+        Status DropColumnFamily(ColumnFamilyHandle*) nogil except+
+        Status DestroyColumnFamilyHandle(ColumnFamilyHandle*) nogil except+
+
         int NumberLevels() nogil except+
-        int MaxMemCompactionLevel() nogil except+
         int Level0StopWriteTrigger() nogil except+
         const string& GetName() nogil except+
         const options.Options& GetOptions() nogil except+
+        ColumnFamilyHandle* DefaultColumnFamily() nogil except+
         Status Flush(const options.FlushOptions&) nogil except+
+        Status Flush(
+            const options.FlushOptions&,
+            ColumnFamilyHandle*) nogil except+
         Status DisableFileDeletions() nogil except+
         Status EnableFileDeletions() nogil except+
+        Status IngestExternalFile(
+            ColumnFamilyHandle*,
+            const vector[string]&,
+            const options.IngestExternalFileOptions&) nogil except+
 
-        # TODO: Status GetSortedWalFiles(VectorLogPtr& files)
-        # TODO: SequenceNumber GetLatestSequenceNumber()
-        # TODO: Status GetUpdatesSince(
-                  # SequenceNumber seq_number,
-                  # unique_ptr[TransactionLogIterator]*)
+        Status GetSortedWalFiles(VectorLogPtr&) nogil except+
+        SequenceNumber GetLatestSequenceNumber() nogil except+
+        Status GetUpdatesSince(
+            SequenceNumber,
+            unique_ptr[TransactionLogIterator]*) nogil except+
 
+        Status TryCatchUpWithPrimary() nogil except+
         Status DeleteFile(string) nogil except+
         void GetLiveFilesMetaData(vector[LiveFileMetaData]*) nogil except+
 
@@ -140,4 +210,91 @@ cdef extern from "rocksdb/db.h" namespace "rocksdb":
         DB**,
         cpp_bool) nogil except+
 
+    cdef Status DB_OpenColumnFamilies "rocksdb::DB::Open"(
+        const options.DBOptions&,
+        const string&,
+        const vector[ColumnFamilyDescriptor]&,
+        vector[ColumnFamilyHandle*]*,
+        DB**) nogil except+
+
+    cdef Status DB_OpenColumnFamiliesForReadOnly "rocksdb::DB::OpenForReadOnly"(
+        const options.DBOptions&,
+        const string&,
+        const vector[ColumnFamilyDescriptor]&,
+        vector[ColumnFamilyHandle*]*,
+        DB**,
+        cpp_bool) nogil except+
+
+    cdef Status DB_OpenAsSecondary "rocksdb::DB::OpenAsSecondary"(
+        const options.Options&,
+        const string&,
+        const string&,
+        DB**) nogil except+
+
+    cdef Status DB_OpenColumnFamiliesAsSecondary "rocksdb::DB::OpenAsSecondary"(
+        const options.DBOptions&,
+        const string&,
+        const string&,
+        const vector[ColumnFamilyDescriptor]&,
+        vector[ColumnFamilyHandle*]*,
+        DB**) nogil except+
+
+    cdef Status DB_ListColumnFamilies "rocksdb::DB::ListColumnFamilies"(
+        const options.DBOptions&,
+        const string&,
+        vector[string]*) nogil except+
+
     cdef Status RepairDB(const string& dbname, const options.Options&)
+
+cdef extern from "cpp/compaction_helper.hpp" namespace "py_rocks":
+    cdef Status wait_for_compact(
+        DB*,
+        int64_t,
+        cpp_bool) nogil except+
+
+cdef extern from "cpp/wal_helper.hpp" namespace "py_rocks":
+    cdef Status read_updates(
+        DB*,
+        unique_ptr[TransactionLogIterator]*,
+        uint64_t*,
+        size_t,
+        vector[uint64_t]*,
+        vector[string]*) nogil except+
+
+    cdef cpp_bool wait_for_sequence(
+        DB*,
+        uint64_t,
+        int64_t,
+        int64_t) nogil except+
+
+cdef extern from "cpp/range_helper.hpp" namespace "py_rocks":
+    cdef Status split_key_ranges(
+        DB*,
+        ColumnFamilyHandle*,
+        size_t,
+        vector[string]*) nogil except+
+
+cdef extern from "cpp/array_helper.hpp" namespace "py_rocks":
+    cdef cppclass ArrayMultiGet:
+        ArrayMultiGet(size_t) nogil except+
+        void run(
+            DB*,
+            const options.ReadOptions&,
+            ColumnFamilyHandle*,
+            const char*,
+            size_t,
+            cpp_bool) nogil except+
+        int64_t first_error() nogil
+        const Status& status(size_t) nogil
+        size_t max_value_size() nogil
+        size_t value_size(size_t) nogil
+        int64_t copy_values(char*, size_t, unsigned char*) nogil
+
+    cdef void array_put(
+        WriteBatch*,
+        ColumnFamilyHandle*,
+        const char*,
+        size_t,
+        const char*,
+        size_t,
+        size_t) nogil except+
@@ -2,4 +2,7 @@ cdef extern from "rocksdb/env.h" namespace "rocksdb":
     cdef cppclass Env:
         Env()
 
+    cdef cppclass EnvOptions:
+        EnvOptions()
+
     cdef Env* Env_Default "rocksdb::Env::Default"()
@@ -18,3 +18,15 @@ class MergeInProgress(Exception):
 
 class Incomplete(Exception):
     pass
+
+class Busy(Exception):
+    pass
+
+class TimedOut(Exception):
+    pass
+
+class TryAgain(Exception):
+    pass
+
+class Expired(Exception):
+    pass
@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+
+from ._rocksdb import _set_instrumentation
+from ._rocksdb import _get_instrumentation
+from ._rocksdb import _reset_instrumentation
+from ._rocksdb import _instrumentation_snapshot
+
+
+def enable():
+    _set_instrumentation(True)
+
+
+def disable():
+    _set_instrumentation(False)
+
+
+def is_enabled():
+    return _get_instrumentation()
+
+
+def reset():
+    _reset_instrumentation()
+
+
+def snapshot():
+    return _instrumentation_snapshot()
+
+
+@contextmanager
+def enabled(reset_first=True):
+    """Enables the instrumentation within the block, restores the old state
+    at the end. Yields a function returning the current snapshot.
+    """
+    was_enabled = is_enabled()
+    if reset_first:
+        reset()
+    enable()
+    try:
+        yield snapshot
+    finally:
+        _set_instrumentation(was_enabled)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return '%.9g' % value
+
+
+def _histogram_lines(name, labels, histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in histogram['buckets']:
+        cumulative += count
+        lines.append('%s_bucket{%s,le="%s"} %i' % (
+            name, labels, _format_value(bound), cumulative))
+    lines.append('%s_sum{%s} %s' % (name, labels, _format_value(histogram['sum_seconds'])))
+    lines.append('%s_count{%s} %i' % (name, labels, histogram['count']))
+    return lines
+
+
+def to_prometheus(stats=None, prefix='pyrocksdb'):
+    """Formats 'stats' (the current snapshot by default) in the Prometheus
+    text exposition format.
+    """
+    if stats is None:
+        stats = snapshot()
+
+    calls = []
+    errors = []
+    latency = []
+    gil_wait = []
+
+    for call in sorted(stats):
+        entry = stats[call]
+        labels = 'call="%s",type="%s"' % (call, entry['type'])
+        calls.append('%s_calls_total{%s} %i' % (prefix, labels, entry['calls']))
+        errors.append('%s_errors_total{%s} %i' % (prefix, labels, entry['errors']))
+        latency.extend(_histogram_lines(
+            prefix + '_call_duration_seconds', labels, entry['latency']))
+        if 'gil_wait' in entry:
+            gil_wait.extend(_histogram_lines(
+                prefix + '_gil_wait_seconds', labels, entry['gil_wait']))
+
+    lines = []
+    for name, kind, help_text, samples in (
+            ('calls_total', 'counter', 'Number of calls.', calls),
+            ('errors_total', 'counter',
+             'Calls which failed, exceptions for callbacks.', errors),
+            ('call_duration_seconds', 'histogram',
+             'Duration of the calls, for callbacks with the GIL held.', latency),
+            ('gil_wait_seconds', 'histogram',
+             'Time callbacks waited for the GIL.', gil_wait)):
+
+        lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+        lines.append('# TYPE %s_%s %s' % (prefix, name, kind))
+        lines.extend(samples)
+
+    return '\n'.join(lines) + '\n'
@@ -42,6 +42,8 @@ class MergeOperator:
         pass
 
 
+# Deprecated, filters can't be implemented in python since RocksDB 7.0.
+# Passing an instance to BlockBasedTableFactory raises NotSupported.
 class FilterPolicy:
     __metaclass__ = ABCMeta
 
@@ -75,3 +77,25 @@ class SliceTransform:
     @abstractmethod
     def in_range(self, dst):
         pass
+
+class CompactionFilter:
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def filter(self, level, key, existing_value):
+        pass
+
+    @abstractmethod
+    def name(self):
+        pass
+
+class CompactionFilterFactory:
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    def create_compaction_filter(self, context):
+        pass
+
+    @abstractmethod
+    def name(self):
+        pass
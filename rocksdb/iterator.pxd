@@ -1,4 +1,7 @@
 from libcpp cimport bool as cpp_bool
+from libcpp.string cimport string
+from libcpp.vector cimport vector
+from libc.stdint cimport int64_t
 from slice_ cimport Slice
 from status cimport Status
 
@@ -13,3 +16,28 @@ cdef extern from "rocksdb/iterator.h" namespace "rocksdb":
         Slice key() nogil except+
         Slice value() nogil except+
         Status status() nogil except+
+
+cdef extern from "cpp/iterator_helper.hpp" namespace "py_rocks":
+    Status iterator_next_batch(
+        Iterator*,
+        size_t,
+        cpp_bool,
+        const Slice*,
+        string*,
+        vector[size_t]*,
+        string*,
+        vector[size_t]*,
+        size_t*) nogil except+
+
+    Status iterator_next_batch(
+        Iterator*,
+        size_t,
+        cpp_bool,
+        const Slice*,
+        string*,
+        vector[int64_t]*,
+        string*,
+        vector[int64_t]*,
+        size_t*) nogil except+
+
+    Status iterator_unread(Iterator*, size_t, cpp_bool) nogil except+
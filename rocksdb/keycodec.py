@@ -0,0 +1,28 @@
+from ._rocksdb import KeyCodec
+
+
+# Codec with all fields ascending, used by the module level functions.
+_default_codec = KeyCodec()
+
+
+def _get_codec(descending):
+    if not descending:
+        return _default_codec
+    return KeyCodec(descending)
+
+
+def encode(key, descending=()):
+    return _get_codec(descending).encode(key)
+
+
+# The order of a field is part of its encoding, so decoding needs no codec.
+def decode(key):
+    return _default_codec.decode(key)
+
+
+def encode_many(keys, descending=()):
+    return _get_codec(descending).encode_many(keys)
+
+
+def decode_many(keys):
+    return _default_codec.decode_many(keys)
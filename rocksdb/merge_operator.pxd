@@ -6,7 +6,15 @@ from logger cimport Logger
 
 cdef extern from "rocksdb/merge_operator.h" namespace "rocksdb":
     cdef cppclass MergeOperator:
-        pass
+        const char* Name()
+
+    cdef cppclass AssociativeMergeOperator(MergeOperator):
+        cpp_bool Merge(
+            const Slice&,
+            const Slice*,
+            const Slice&,
+            string*,
+            Logger*) nogil except+
 
 ctypedef cpp_bool (*merge_func)(
     void*,
@@ -43,3 +51,16 @@ cdef extern from "cpp/merge_operator_wrapper.hpp" namespace "py_rocks":
             void*,
             full_merge_func,
             partial_merge_func) nogil except+
+
+cdef extern from "cpp/merge_operators.hpp" namespace "py_rocks":
+    cdef cppclass UInt64AddOperator(AssociativeMergeOperator):
+        UInt64AddOperator() nogil except+
+
+    cdef cppclass StringAppendOperator(AssociativeMergeOperator):
+        StringAppendOperator(string) nogil except+
+
+    cdef cppclass MaxOperator(AssociativeMergeOperator):
+        MaxOperator(cpp_bool) nogil except+
+
+    cdef cppclass BoundedListAppendOperator(AssociativeMergeOperator):
+        BoundedListAppendOperator(size_t, string) nogil except+
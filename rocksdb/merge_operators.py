@@ -0,0 +1,5 @@
+from ._rocksdb import UInt64AddOperator as UInt64Add
+from ._rocksdb import StringAppendOperator as StringAppend
+from ._rocksdb import MaxOperator as Max
+from ._rocksdb import MinOperator as Min
+from ._rocksdb import BoundedListAppendOperator as BoundedListAppend
@@ -14,6 +14,10 @@ from table_factory cimport TableFactory
 from memtablerep cimport MemTableRepFactory
 from universal_compaction cimport CompactionOptionsUniversal
 from cache cimport Cache
+from write_buffer_manager cimport WriteBufferManager
+from statistics cimport Statistics
+from compaction_filter cimport CompactionFilter
+from compaction_filter cimport CompactionFilterFactory
 
 cdef extern from "rocksdb/options.h" namespace "rocksdb":
     ctypedef enum CompactionStyle:
@@ -27,16 +31,34 @@ cdef extern from "rocksdb/options.h" namespace "rocksdb":
         kBZip2Compression
         kLZ4Compression
         kLZ4HCCompression
+        kXpressCompression
+        kZSTD
+        kDisableCompressionOption
+
+    cdef cppclass CompressionOptions:
+        int window_bits
+        int level
+        int strategy
+        uint32_t max_dict_bytes
+        uint32_t zstd_max_train_bytes
+        cpp_bool enabled
 
     ctypedef enum ReadTier:
         kReadAllTier
         kBlockCacheTier
 
-    cdef cppclass Options:
+    cdef cppclass DBOptions:
+        DBOptions()
+
+    cdef cppclass ColumnFamilyOptions:
+        ColumnFamilyOptions()
+        ColumnFamilyOptions(const Options&)
+
+    cdef cppclass Options(DBOptions, ColumnFamilyOptions):
         const Comparator* comparator
         shared_ptr[MergeOperator] merge_operator
-        # TODO: compaction_filter
-        # TODO: compaction_filter_factory
+        const CompactionFilter* compaction_filter
+        shared_ptr[CompactionFilterFactory] compaction_filter_factory
         cpp_bool create_if_missing
         cpp_bool error_if_exists
         cpp_bool paranoid_checks
@@ -47,24 +69,21 @@ cdef extern from "rocksdb/options.h" namespace "rocksdb":
         int min_write_buffer_number_to_merge
         int max_open_files
         CompressionType compression
-        # TODO: compression_per_level
-        # TODO: compression_opts
+        vector[CompressionType] compression_per_level
+        CompressionOptions compression_opts
+        CompressionType bottommost_compression
+        CompressionOptions bottommost_compression_opts
         shared_ptr[SliceTransform] prefix_extractor
         int num_levels
         int level0_file_num_compaction_trigger
         int level0_slowdown_writes_trigger
         int level0_stop_writes_trigger
-        int max_mem_compaction_level
         uint64_t target_file_size_base
         int target_file_size_multiplier
         uint64_t max_bytes_for_level_base
-        int max_bytes_for_level_multiplier
+        double max_bytes_for_level_multiplier
         vector[int] max_bytes_for_level_multiplier_additional
-        int expanded_compaction_factor
-        int source_compaction_factor
-        int max_grandparent_overlap_factor
-        # TODO: statistics
-        cpp_bool disableDataSync
+        shared_ptr[Statistics] statistics
         cpp_bool use_fsync
         string db_log_dir
         string wal_dir
@@ -74,9 +93,6 @@ cdef extern from "rocksdb/options.h" namespace "rocksdb":
         size_t max_log_file_size
         size_t log_file_time_to_roll
         size_t keep_log_file_num
-        double soft_rate_limit
-        double hard_rate_limit
-        unsigned int rate_limit_delay_max_milliseconds
         uint64_t max_manifest_file_size
         int table_cache_numshardbits
         size_t arena_block_size
@@ -85,21 +101,16 @@ cdef extern from "rocksdb/options.h" namespace "rocksdb":
         uint64_t WAL_ttl_seconds
         uint64_t WAL_size_limit_MB
         size_t manifest_preallocation_size
-        cpp_bool purge_redundant_kvs_while_flush
-        cpp_bool allow_os_buffer
         cpp_bool allow_mmap_reads
         cpp_bool allow_mmap_writes
         cpp_bool is_fd_close_on_exec
-        cpp_bool skip_log_error_on_recovery
         unsigned int stats_dump_period_sec
         cpp_bool advise_random_on_open
         # TODO: enum { NONE, NORMAL, SEQUENTIAL, WILLNEED } access_hint_on_compaction_start
         cpp_bool use_adaptive_mutex
         uint64_t bytes_per_sync
-        cpp_bool verify_checksums_in_compaction
         CompactionStyle compaction_style
         CompactionOptionsUniversal compaction_options_universal
-        cpp_bool filter_deletes
         uint64_t max_sequential_skip_in_iterations
         shared_ptr[MemTableRepFactory] memtable_factory
         shared_ptr[TableFactory] table_factory
@@ -107,6 +118,7 @@ cdef extern from "rocksdb/options.h" namespace "rocksdb":
         cpp_bool inplace_update_support
         size_t inplace_update_num_locks
         shared_ptr[Cache] row_cache
+        shared_ptr[WriteBufferManager] write_buffer_manager
 
     cdef cppclass WriteOptions:
         cpp_bool sync
@@ -116,6 +128,7 @@ cdef extern from "rocksdb/options.h" namespace "rocksdb":
         cpp_bool verify_checksums
         cpp_bool fill_cache
         const Snapshot* snapshot
+        const Slice* iterate_upper_bound
         ReadTier read_tier
 
     cdef cppclass FlushOptions:
@@ -131,3 +144,16 @@ cdef extern from "rocksdb/options.h" namespace "rocksdb":
         int target_level
         uint32_t target_path_id
         BottommostLevelCompaction bottommost_level_compaction
+
+    cdef cppclass SizeApproximationOptions:
+        cpp_bool include_memtables
+        cpp_bool include_files
+
+    cdef cppclass CompactionOptions:
+        uint64_t output_file_size_limit
+
+    cdef cppclass IngestExternalFileOptions:
+        cpp_bool move_files
+        cpp_bool snapshot_consistency
+        cpp_bool allow_global_seqno
+        cpp_bool allow_blocking_flush
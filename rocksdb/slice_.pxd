@@ -18,3 +18,7 @@ cdef extern from "rocksdb/slice.h" namespace "rocksdb":
         string ToString(cpp_bool) nogil
         int compare(const Slice&) nogil
         cpp_bool starts_with(const Slice&) nogil
+
+    cdef cppclass PinnableSlice(Slice):
+        PinnableSlice() nogil
+        void Reset() nogil
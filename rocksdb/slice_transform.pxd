@@ -6,7 +6,14 @@ from std_memory cimport shared_ptr
 
 cdef extern from "rocksdb/slice_transform.h" namespace "rocksdb":
     cdef cppclass SliceTransform:
-        pass
+        const char* Name()
+        Slice Transform(const Slice&) nogil except+
+        cpp_bool InDomain(const Slice&) nogil except+
+        cpp_bool InRange(const Slice&) nogil except+
+
+    cdef const SliceTransform* NewFixedPrefixTransform(size_t) nogil except+
+    cdef const SliceTransform* NewCappedPrefixTransform(size_t) nogil except+
+    cdef const SliceTransform* NewNoopTransform() nogil except+
 
 ctypedef Slice (*transform_func)(
     void*,
@@ -0,0 +1,30 @@
+from libcpp.string cimport string
+from libc.stdint cimport uint64_t
+from slice_ cimport Slice
+from status cimport Status
+from options cimport Options
+from env cimport EnvOptions
+from db cimport ColumnFamilyHandle
+from db cimport SequenceNumber
+
+cdef extern from "rocksdb/sst_file_writer.h" namespace "rocksdb":
+    cdef cppclass ExternalSstFileInfo:
+        string file_path
+        string smallest_key
+        string largest_key
+        SequenceNumber sequence_number
+        uint64_t file_size
+        uint64_t num_entries
+
+    cdef cppclass SstFileWriter:
+        SstFileWriter(
+            const EnvOptions&,
+            const Options&,
+            ColumnFamilyHandle*) nogil except+
+
+        Status Open(const string&) nogil except+
+        Status Put(const Slice&, const Slice&) nogil except+
+        Status Merge(const Slice&, const Slice&) nogil except+
+        Status Delete(const Slice&) nogil except+
+        Status Finish(ExternalSstFileInfo*) nogil except+
+        uint64_t FileSize() nogil except+
@@ -0,0 +1,53 @@
+from libcpp.string cimport string
+from libcpp.vector cimport vector
+from libcpp.utility cimport pair
+from libc.stdint cimport uint64_t
+from std_memory cimport shared_ptr
+from status cimport Status
+
+cdef extern from "rocksdb/statistics.h" namespace "rocksdb":
+    ctypedef enum StatsLevel:
+        kExceptHistogramOrTimers
+        kExceptTimers
+        kExceptDetailedTimers
+        kExceptTimeForMutex
+        kAll
+
+    cdef cppclass HistogramData:
+        double median
+        double percentile95
+        double percentile99
+        double average
+        double standard_deviation
+        double max
+        uint64_t count
+        uint64_t sum
+        double min
+
+    cdef cppclass Statistics:
+        void set_stats_level(StatsLevel) nogil
+        StatsLevel get_stats_level() nogil
+        Status Reset() nogil except+
+        string ToString() nogil except+
+
+    cdef shared_ptr[Statistics] CreateDBStatistics() nogil except+
+
+cdef extern from "rocksdb/perf_level.h" namespace "rocksdb":
+    ctypedef enum PerfLevel:
+        kDisable
+        kEnableCount
+        kEnableTimeExceptForMutex
+        kEnableTime
+
+    void SetPerfLevel(PerfLevel) nogil
+    PerfLevel GetPerfLevel() nogil
+
+ctypedef vector[pair[string, uint64_t]] counter_list
+ctypedef vector[pair[string, HistogramData]] histogram_list
+
+cdef extern from "cpp/statistics_helper.hpp" namespace "py_rocks":
+    void get_tickers(Statistics*, counter_list*) nogil except+
+    void get_histograms(Statistics*, histogram_list*) nogil except+
+    void get_perf_context(counter_list*) nogil except+
+    void get_iostats_context(counter_list*) nogil except+
+    void reset_perf_context() nogil except+
@@ -12,4 +12,8 @@ cdef extern from "rocksdb/status.h" namespace "rocksdb":
         cpp_bool IsIOError() nogil const
         cpp_bool IsMergeInProgress() nogil const
         cpp_bool IsIncomplete() nogil const
+        cpp_bool IsBusy() nogil const
+        cpp_bool IsTimedOut() nogil const
+        cpp_bool IsTryAgain() nogil const
+        cpp_bool IsExpired() nogil const
         string ToString() nogil except+
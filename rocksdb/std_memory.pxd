@@ -5,3 +5,11 @@ cdef extern from "<memory>" namespace "std":
         void reset() nogil except+
         void reset(T*) nogil except+
         T* get() nogil except+
+
+    cdef cppclass unique_ptr[T]:
+        unique_ptr() nogil except+
+        unique_ptr(T*) nogil except+
+        void reset() nogil except+
+        void reset(T*) nogil except+
+        T* get() nogil except+
+        T* release() nogil except+
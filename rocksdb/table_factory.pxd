@@ -1,4 +1,5 @@
 from libc.stdint cimport uint32_t
+from libc.stdint cimport uint64_t
 from libcpp cimport bool as cpp_bool
 from std_memory cimport shared_ptr
 
@@ -12,6 +13,11 @@ cdef extern from "rocksdb/table.h" namespace "rocksdb":
     ctypedef enum BlockBasedTableIndexType:
         kBinarySearch "rocksdb::BlockBasedTableOptions::IndexType::kBinarySearch"
         kHashSearch "rocksdb::BlockBasedTableOptions::IndexType::kHashSearch"
+        kTwoLevelIndexSearch "rocksdb::BlockBasedTableOptions::IndexType::kTwoLevelIndexSearch"
+
+    ctypedef enum DataBlockIndexType:
+        kDataBlockBinarySearch "rocksdb::BlockBasedTableOptions::DataBlockIndexType::kDataBlockBinarySearch"
+        kDataBlockBinaryAndHash "rocksdb::BlockBasedTableOptions::DataBlockIndexType::kDataBlockBinaryAndHash"
 
     ctypedef enum ChecksumType:
         kCRC32c
@@ -20,7 +26,6 @@ cdef extern from "rocksdb/table.h" namespace "rocksdb":
     cdef cppclass BlockBasedTableOptions:
         BlockBasedTableOptions()
         BlockBasedTableIndexType index_type
-        cpp_bool hash_index_allow_collision
         ChecksumType checksum
         cpp_bool no_block_cache
         size_t block_size
@@ -28,8 +33,16 @@ cdef extern from "rocksdb/table.h" namespace "rocksdb":
         int block_restart_interval
         cpp_bool whole_key_filtering
         shared_ptr[Cache] block_cache
-        shared_ptr[Cache] block_cache_compressed
         shared_ptr[FilterPolicy] filter_policy
+        cpp_bool cache_index_and_filter_blocks
+        cpp_bool cache_index_and_filter_blocks_with_high_priority
+        cpp_bool pin_l0_filter_and_index_blocks_in_cache
+        cpp_bool pin_top_level_index_and_filter
+        cpp_bool partition_filters
+        uint64_t metadata_block_size
+        uint32_t format_version
+        DataBlockIndexType data_block_index_type
+        double data_block_hash_table_util_ratio
 
     cdef TableFactory* NewBlockBasedTableFactory(const BlockBasedTableOptions&)
 
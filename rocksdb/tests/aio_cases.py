@@ -0,0 +1,148 @@
+# The tests of rocksdb.aio, imported by test_aio on python 3.5 and newer
+# only, since 'async def' is a syntax error on older versions.
+import asyncio
+import unittest
+import rocksdb
+from rocksdb.aio import AsyncDB
+from .test_db import TestHelper, int_to_bytes
+
+
+class TestAsyncDB(unittest.TestCase, TestHelper):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        self._clean()
+        self.db = rocksdb.DB("/tmp/test", opts)
+        self.adb = AsyncDB(self.db, max_workers=2, max_pending=4)
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.adb.close()
+        self.loop.close()
+        del self.adb
+        self._close_db()
+
+    def run_async(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def test_put_get(self):
+        async def run():
+            await self.adb.put(b'a', b'b')
+            self.assertEqual(b'b', await self.adb.get(b'a'))
+            self.assertIsNone(await self.adb.get(b'c'))
+
+            await self.adb.delete(b'a')
+            self.assertIsNone(await self.adb.get(b'a'))
+
+        self.run_async(run())
+
+    def test_coalesced_get(self):
+        async def run():
+            for x in range(100):
+                await self.adb.put(int_to_bytes(x), int_to_bytes(x * 2))
+
+            keys = [int_to_bytes(x) for x in range(110)]
+            gets = [self.adb.get(key) for key in keys]
+            gets.append(self.adb.get(bytearray(b'1'), fill_cache=False))
+            return await asyncio.gather(*gets)
+
+        values = self.run_async(run())
+        expected = [int_to_bytes(x * 2) for x in range(100)]
+        expected.extend([None] * 10)
+        expected.append(b'2')
+        self.assertEqual(expected, values)
+
+    def test_coalesced_get_batch_size(self):
+        # The batches are not limited by max_pending, only by max_get_batch.
+        adb = AsyncDB(self.db, max_workers=2, max_pending=4, max_get_batch=50)
+        sizes = []
+        multi_get = adb._multi_get
+
+        def counting_multi_get(keys, read_opts):
+            sizes.append(len(keys))
+            return multi_get(keys, read_opts)
+
+        adb._multi_get = counting_multi_get
+
+        async def run():
+            await adb.put(b'a', b'1')
+            gets = [adb.get(int_to_bytes(x)) for x in range(110)]
+            gets.append(adb.get(b'a'))
+            return await asyncio.gather(*gets)
+
+        try:
+            values = self.run_async(run())
+        finally:
+            adb.close()
+
+        self.assertEqual([None] * 110 + [b'1'], values)
+        self.assertEqual([11, 50, 50], sorted(sizes))
+
+    def test_coalesced_get_key_codec(self):
+        self.db.key_codec = rocksdb.KeyCodec()
+
+        async def run():
+            await self.adb.put((1, u'a'), b'1')
+            await self.adb.put((2, u'b'), b'2')
+            return await asyncio.gather(
+                self.adb.get((1, u'a')),
+                self.adb.get((2, u'b')),
+                self.adb.get((3,)))
+
+        self.assertEqual([b'1', b'2', None], self.run_async(run()))
+
+    def test_write_batch(self):
+        batch = rocksdb.WriteBatch()
+        batch.put(b"key", b"v1")
+        batch.put(b"key2", b"v2")
+
+        async def run():
+            await self.adb.write(batch)
+            return await self.adb.multi_get([b"key", b"key2"])
+
+        self.assertEqual(
+            {b"key": b"v1", b"key2": b"v2"},
+            self.run_async(run()))
+
+    def test_iteration(self):
+        async def run():
+            for x in range(10):
+                await self.adb.put(int_to_bytes(x), int_to_bytes(x))
+
+            it = self.adb.iterkeys(batch_size=3)
+            await it.seek_to_first()
+            keys = [key async for key in it]
+
+            await it.seek(b'5')
+            tail = [key async for key in it]
+
+            it = self.adb.iteritems(batch_size=4, reverse=True)
+            await it.seek_to_last()
+            items = [item async for item in it]
+            return keys, tail, items
+
+        keys, tail, items = self.run_async(run())
+        self.assertEqual([int_to_bytes(x) for x in range(10)], keys)
+        self.assertEqual([int_to_bytes(x) for x in range(5, 10)], tail)
+        self.assertEqual(
+            [(int_to_bytes(x), int_to_bytes(x)) for x in reversed(range(10))],
+            items)
+
+    def test_get_updates_since(self):
+        async def run():
+            updates = self.adb.get_updates_since(1, timeout=0.01)
+            await self.adb.put(b'a', b'1')
+            first = await updates.__anext__()
+
+            # Waits until the write below is done.
+            pending = asyncio.ensure_future(updates.__anext__())
+            await asyncio.sleep(0.05)
+            self.assertFalse(pending.done())
+            await self.adb.put(b'b', b'2')
+            second = await pending
+            return first, second
+
+        first, second = self.run_async(run())
+        self.assertEqual(1, first[0])
+        self.assertEqual([('Put', b'a', b'1')], list(first[1]))
+        self.assertEqual(2, second[0])
+        self.assertEqual([('Put', b'b', b'2')], list(second[1]))
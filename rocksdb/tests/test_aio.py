@@ -0,0 +1,6 @@
+import sys
+
+# Python 2 can't even compile the tests, so they are only imported on
+# versions which have 'async def'.
+if sys.version_info >= (3, 5):
+    from .aio_cases import TestAsyncDB
@@ -1,10 +1,24 @@
 import os
 import shutil
 import gc
+import struct
+import sys
+import threading
+import time
 import unittest
 import rocksdb
+import rocksdb.merge_operators
+import rocksdb.bulk_load
+import rocksdb.keycodec
+import rocksdb.benchmarks
+import rocksdb.instrumentation
 from itertools import takewhile
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 def int_to_bytes(ob):
     return str(ob).encode('ascii')
 
@@ -45,6 +59,63 @@ class TestDB(unittest.TestCase, TestHelper):
         self.db.put(b"a", b"b")
         self.assertEqual(b"b", self.db.get(b"a"))
 
+    def test_put_get_buffer(self):
+        self.db.put(bytearray(b"a"), memoryview(b"b"))
+        self.assertEqual(b"b", self.db.get(memoryview(b"a")))
+
+        self.db.delete(bytearray(b"a"))
+        self.assertIsNone(self.db.get(b"a"))
+
+    def test_buffer_released_after_call(self):
+        # The buffers are exported while the GIL is released, a leaked
+        # export would make resizing the bytearray fail.
+        key = bytearray(b"a")
+        value = bytearray(b"b")
+        self.db.put(key, value)
+        self.assertEqual(b"b", self.db.get(key))
+        self.assertEqual({b"a": b"b"}, self.db.multi_get([key]))
+        self.db.delete(key)
+
+        key.extend(b"c")
+        value.extend(b"d")
+        self.assertEqual(b"ac", bytes(key))
+
+    def test_iter_seek_buffer(self):
+        for x in (b'a', b'b', b'c'):
+            self.db.put(x, x)
+
+        it = self.db.iterkeys()
+        it.seek(bytearray(b'b'))
+        self.assertEqual([b'b', b'c'], list(it))
+
+        it.seek(memoryview(b'c'))
+        self.assertEqual([b'c'], list(it))
+
+    def test_get_pinned(self):
+        self.assertIsNone(self.db.get_pinned(b"a"))
+
+        self.db.put(b"a", b"x" * 1000)
+        pinned = self.db.get_pinned(b"a")
+        self.assertEqual(1000, len(pinned))
+        self.assertEqual(b"x" * 1000, pinned.tobytes())
+
+        view = memoryview(pinned)
+        self.assertEqual(b"x" * 1000, view.tobytes())
+        self.assertRaises(BufferError, pinned.release)
+        view.release()
+        pinned.release()
+
+    def test_get_into(self):
+        buf = bytearray(10)
+        self.assertIsNone(self.db.get_into(b"a", buf))
+
+        self.db.put(b"a", b"12345")
+        self.assertEqual(5, self.db.get_into(b"a", buf))
+        self.assertEqual(b"12345", bytes(buf[:5]))
+
+        self.assertRaises(ValueError, self.db.get_into, b"a", bytearray(2))
+        self.assertRaises(TypeError, self.db.get_into, b"a", b"readonly")
+
     def test_multi_get(self):
         self.db.put(b"a", b"1")
         self.db.put(b"b", b"2")
@@ -54,6 +125,39 @@ class TestDB(unittest.TestCase, TestHelper):
         ref = {b'a': b'1', b'c': b'3', b'b': b'2'}
         self.assertEqual(ref, ret)
 
+    @unittest.skipIf(numpy is None, "needs numpy")
+    def test_put_multi_get_array(self):
+        keys = numpy.arange(100, dtype='>u8')
+        self.db.put_array(keys, keys * 2)
+        self.assertEqual(struct.pack('>Q', 198), self.db.get(struct.pack('>Q', 99)))
+
+        values, found = self.db.multi_get_array(
+            numpy.array([1, 200, 99], dtype='>u8'),
+            value_dtype='>u8')
+        self.assertEqual([True, False, True], found.tolist())
+        self.assertEqual([2, 0, 198], values.tolist())
+
+        # Big endian keys sort like the bytewise comparator.
+        values, found = self.db.multi_get_array(
+            numpy.array([1, 99, 200], dtype='>u8'),
+            value_dtype='>u8',
+            sorted_input=True)
+        self.assertEqual([True, True, False], found.tolist())
+        self.assertEqual([2, 198, 0], values.tolist())
+
+        self.db.put(struct.pack('>Q', 1), b'long value')
+        values, found = self.db.multi_get_array(keys[:3])
+        self.assertEqual(numpy.dtype('S10'), values.dtype)
+        self.assertEqual(b'long value', values[1])
+        self.assertRaises(
+            ValueError,
+            self.db.multi_get_array, keys[:3], value_dtype='S4')
+
+        batch = rocksdb.WriteBatch()
+        batch.put_array(numpy.array([b'x', b'y']), numpy.zeros((2, 4), 'u1'))
+        self.assertEqual(2, batch.count())
+        self.assertRaises(ValueError, batch.put_array, keys, keys[:2])
+
     def test_delete(self):
         self.db.put(b"a", b"b")
         self.assertEqual(b"b", self.db.get(b"a"))
@@ -73,6 +177,68 @@ class TestDB(unittest.TestCase, TestHelper):
         ret = self.db.multi_get([b'key', b'a'])
         self.assertEqual(ref, ret)
 
+    def test_write_batch_buffer(self):
+        batch = rocksdb.WriteBatch()
+        batch.put(memoryview(b"a"), bytearray(b"1"))
+        batch.merge(bytearray(b"b"), memoryview(b"2"))
+        batch.delete(bytearray(b"c"))
+
+        self.db.write(batch)
+        ref = {b'a': b'1', b'b': b'2', b'c': None}
+        self.assertEqual(ref, self.db.multi_get([b'a', b'b', b'c']))
+
+    def test_get_updates_since(self):
+        self.assertEqual(0, self.db.latest_sequence_number)
+        self.db.put(b'a', b'1')
+        batch = rocksdb.WriteBatch()
+        batch.put(b'b', b'2')
+        batch.delete(b'a')
+        self.db.write(batch)
+        self.assertEqual(3, self.db.latest_sequence_number)
+
+        wal_files = self.db.get_sorted_wal_files()
+        self.assertEqual('alive', wal_files[-1]['type'])
+
+        it = self.db.get_updates_since(1, batch_size=1)
+        updates = [(seq, list(batch)) for seq, batch in it]
+        self.assertEqual(
+            [(1, [('Put', b'a', b'1')]),
+             (2, [('Put', b'b', b'2'), ('Delete', b'a', b'')])],
+            updates)
+        self.assertEqual(4, it.next_sequence)
+
+        self.assertEqual([], list(it))
+        self.assertFalse(it.wait_for_updates(0.01))
+
+        self.db.put(b'c', b'3')
+        self.assertTrue(it.wait_for_updates(0))
+        seq, batch = it.next_batch(10)[0]
+        self.assertEqual(4, seq)
+        self.assertEqual([('Put', b'c', b'3')], list(batch))
+
+    def test_get_updates_since_concurrent_writes(self):
+        # The reader runs into batches which are not completely written yet.
+        keys = [('%05d' % i).encode('ascii') for i in range(2000)]
+
+        def writer():
+            for key in keys:
+                self.db.put(key, b'v')
+
+        thread = threading.Thread(target=writer)
+        it = self.db.get_updates_since(1, batch_size=7)
+        thread.start()
+
+        seen = []
+        deadline = time.time() + 30
+        while len(seen) < len(keys) and time.time() < deadline:
+            for seq, batch in it:
+                seen.extend(key for op, key, value in batch)
+            it.wait_for_updates(0.01)
+
+        thread.join()
+        self.assertEqual(keys, seen)
+        self.assertEqual(len(keys) + 1, it.next_sequence)
+
     def test_write_batch_iter(self):
         batch = rocksdb.WriteBatch()
         self.assertEqual([], list(batch))
@@ -96,6 +262,69 @@ class TestDB(unittest.TestCase, TestHelper):
         ]
         self.assertEqual(ref, list(it))
 
+    def test_write_batch_with_index(self):
+        self.db.put(b'a', b'db')
+        self.db.put(b'b', b'db')
+        self.db.put(b'd', b'db')
+
+        batch = rocksdb.WriteBatchWithIndex()
+        batch.put(b'a', b'batch')
+        batch.delete(b'b')
+        batch.put(b'c', b'batch')
+
+        self.assertEqual(b'batch', batch.get_from_batch(b'a'))
+        self.assertIsNone(batch.get_from_batch(b'd'))
+
+        self.assertEqual(b'batch', batch.get_from_batch_and_db(self.db, b'a'))
+        self.assertIsNone(batch.get_from_batch_and_db(self.db, b'b'))
+        self.assertEqual(b'db', batch.get_from_batch_and_db(self.db, b'd'))
+
+        snapshot = self.db.snapshot()
+        self.db.put(b'd', b'new')
+        self.assertEqual(
+            b'db',
+            batch.get_from_batch_and_db(self.db, b'd', snapshot=snapshot))
+
+        it = batch.iteritems(self.db)
+        it.seek_to_first()
+        ref = [(b'a', b'batch'), (b'c', b'batch'), (b'd', b'new')]
+        self.assertEqual(ref, list(it))
+
+        it = batch.iterkeys(self.db)
+        it.seek_to_last()
+        self.assertEqual([b'd', b'c', b'a'], list(reversed(it)))
+
+        self.assertEqual(
+            [('Put', b'a', b'batch'), ('Delete', b'b', b''), ('Put', b'c', b'batch')],
+            list(batch))
+
+        self.db.write(batch)
+        self.assertEqual(
+            {b'a': b'batch', b'b': None, b'c': b'batch'},
+            self.db.multi_get([b'a', b'b', b'c']))
+
+    def test_write_batch_with_index_overwrite(self):
+        self.db.put(b'a', b'db')
+
+        batch = rocksdb.WriteBatchWithIndex()
+        batch.put(b'a', b'1')
+        batch.put(b'a', b'2')
+        batch.put(b'b', b'1')
+        batch.delete(b'b')
+        batch.put(b'b', b'2')
+
+        self.assertEqual(b'2', batch.get_from_batch(b'a'))
+        it = batch.iteritems(self.db)
+        it.seek_to_first()
+        self.assertEqual([(b'a', b'2'), (b'b', b'2')], list(it))
+
+        batch = rocksdb.WriteBatchWithIndex(overwrite_key=False)
+        batch.put(b'a', b'1')
+        batch.put(b'a', b'2')
+        self.assertEqual(b'2', batch.get_from_batch_and_db(self.db, b'a'))
+        self.assertRaises(rocksdb.errors.NotSupported, batch.iteritems, self.db)
+        self.assertRaises(rocksdb.errors.NotSupported, batch.iterkeys, self.db)
+        self.assertRaises(rocksdb.errors.NotSupported, batch.itervalues, self.db)
 
     def test_key_may_exists(self):
         self.db.put(b"a", b'1')
@@ -187,6 +416,65 @@ class TestDB(unittest.TestCase, TestHelper):
 
         self.assertEqual(ref, list(reversed(it)))
 
+    def test_iter_next_batch(self):
+        for x in range(100):
+            self.db.put(int_to_bytes(x), int_to_bytes(x * 1000))
+
+        ref = sorted([int_to_bytes(x) for x in range(100)])
+
+        it = self.db.iterkeys()
+        it.seek_to_first()
+        self.assertEqual(ref[:30], it.next_batch(30))
+        self.assertEqual(ref[30:], it.next_batch(1000))
+        self.assertEqual([], it.next_batch(10))
+
+        it = self.db.itervalues()
+        it.seek_to_first()
+        ref_values = [int_to_bytes(int(x) * 1000) for x in ref]
+        self.assertEqual(ref_values[:10], it.next_batch(10))
+
+        it = self.db.iteritems()
+        it.seek_to_last()
+        ref_items = [(x, int_to_bytes(int(x) * 1000)) for x in reversed(ref)]
+        self.assertEqual(ref_items[:10], reversed(it).next_batch(10))
+
+    def test_iter_batch_size(self):
+        for x in range(100):
+            self.db.put(int_to_bytes(x), int_to_bytes(x * 1000))
+
+        ref = sorted([int_to_bytes(x) for x in range(100)])
+        ref = [(x, int_to_bytes(int(x) * 1000)) for x in ref]
+
+        it = self.db.iteritems(batch_size=7)
+        it.seek_to_first()
+        self.assertEqual(ref, list(it))
+
+        it.seek(b'90')
+        self.assertEqual(ref[-10:], list(it))
+
+        it.seek_to_last()
+        self.assertEqual(list(reversed(ref)), list(reversed(it)))
+
+    def test_iter_batch_size_partial_reverse(self):
+        for x in range(20):
+            self.db.put(int_to_bytes(x), int_to_bytes(x * 1000))
+
+        # After a partly consumed batch reversing must continue where the
+        # iterator without batches would, in both directions.
+        for consumed in (0, 3, 7, 10, 19, 20):
+            expected = []
+            for batch_size in (0, 7):
+                it = self.db.iterkeys(batch_size=batch_size)
+                it.seek_to_first()
+                head = [next(it) for _ in range(consumed)]
+
+                rev = reversed(it)
+                back = [next(rev, None) for _ in range(2)]
+                forward = list(reversed(rev))
+                expected.append((head, back, forward))
+
+            self.assertEqual(expected[0], expected[1])
+
     def test_snapshot(self):
         self.db.put(b"a", b"1")
         self.db.put(b"b", b"2")
@@ -220,6 +508,689 @@ class TestDB(unittest.TestCase, TestHelper):
 
         self.db.compact_range()
 
+    def test_compact_range_background(self):
+        if sys.version_info[0] < 3:
+            return
+
+        for x in range(1000):
+            x = int_to_bytes(x)
+            self.db.put(x, x)
+
+        future = self.db.compact_range(background=True)
+        self.assertIsNone(future.result())
+        self.assertTrue(self.db.wait_for_compact(timeout=60))
+
+    def test_compact_files(self):
+        for x in range(3):
+            self.db.put(int_to_bytes(x), int_to_bytes(x))
+            self.db.flush()
+
+        files = [f['name'] for f in self.db.get_live_files_metadata()]
+        self.assertEqual(3, len(files))
+
+        output = self.db.compact_files(files, 1)
+        self.assertEqual(1, len(output))
+        self.assertEqual(b'2', self.db.get(b'2'))
+
+    def test_pause_background_work(self):
+        self.db.pause_background_work()
+        self.db.put(b'a', b'1')
+        self.db.flush(wait=False)
+        self.assertFalse(self.db.wait_for_compact(timeout=0.1))
+
+        self.db.continue_background_work()
+        self.assertTrue(self.db.wait_for_compact(timeout=60))
+        self.assertEqual(b'1', self.db.get(b'a'))
+
+    def test_wait_for_compact_flush(self):
+        self.db.put(b'a', b'1')
+        self.assertTrue(self.db.wait_for_compact(flush=True))
+        self.assertEqual(1, len(self.db.get_live_files_metadata()))
+
+    def test_scan_to_buffers(self):
+        for x in range(10):
+            self.db.put(b'a' + int_to_bytes(x), int_to_bytes(x * 10))
+        self.db.put(b'b', b'b')
+
+        result = self.db.scan_to_buffers(prefix=b'a', limit=3)
+        self.assertEqual(3, result['count'])
+        self.assertEqual(b'a0a1a2', result['keys'].tobytes())
+        self.assertEqual(b'01020', result['values'].tobytes())
+        offsets = struct.unpack('=4q', result['value_offsets'].tobytes())
+        self.assertEqual((0, 1, 3, 5), offsets)
+        self.assertEqual(8, memoryview(result['key_offsets']).itemsize)
+
+        result = self.db.scan_to_buffers(start=b'a8', values=False)
+        self.assertEqual(b'a8a9b', result['keys'].tobytes())
+        self.assertIsNone(result['values'])
+
+        counts = self.db.scan_to_buffers(
+            end=b'b',
+            projection=lambda batch: batch['count'],
+            batch_size=4)
+        self.assertEqual([4, 4, 2], counts)
+
+    def test_iterate_upper_bound(self):
+        for x in range(10):
+            self.db.put(int_to_bytes(x), int_to_bytes(x))
+
+        it = self.db.iterkeys(iterate_upper_bound=bytearray(b'3'))
+        it.seek(b'1')
+        self.assertEqual([b'1', b'2'], list(it))
+
+    def test_split_key_ranges(self):
+        for x in range(10000):
+            x = ('%05d' % x).encode('ascii')
+            self.db.put(x, x)
+            if x.endswith(b'999'):
+                self.db.flush()
+
+        sizes = self.db.get_approximate_sizes([(b'00000', b'05000')])
+        self.assertTrue(sizes[0] > 0)
+
+        ranges = self.db.split_key_ranges(4)
+        self.assertTrue(1 < len(ranges) <= 4)
+        self.assertIsNone(ranges[0][0])
+        self.assertIsNone(ranges[-1][1])
+        for (_, end), (begin, _) in zip(ranges, ranges[1:]):
+            self.assertEqual(end, begin)
+
+        counts = self.db.parallel_scan(
+            lambda it: sum(1 for _ in it),
+            n_workers=4,
+            ranges=ranges)
+        self.assertEqual(10000, sum(counts))
+
+
+class TestColumnFamilies(unittest.TestCase, TestHelper):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        self._clean()
+        self.db = rocksdb.DB('/tmp/test', opts)
+
+    def tearDown(self):
+        self._close_db()
+
+    def test_create_and_reopen(self):
+        cf = self.db.create_column_family(b'one', rocksdb.Options())
+        self.assertEqual(b'one', cf.name)
+        self.assertIs(cf, self.db.get_column_family(b'one'))
+        self.assertIsNone(self.db.get_column_family(b'two'))
+
+        self.db.put(b'a', b'default')
+        self.db.put(b'a', b'one', column_family=cf)
+        self.assertEqual(b'default', self.db.get(b'a'))
+        self.assertEqual(b'one', self.db.get(b'a', column_family=cf))
+
+        self._close_db()
+        self.assertFalse(cf.is_valid)
+
+        self.assertEqual(
+            [b'default', b'one'],
+            sorted(rocksdb.list_column_families('/tmp/test', rocksdb.Options())))
+
+        self.db = rocksdb.DB(
+            '/tmp/test',
+            rocksdb.Options(),
+            column_families={b'one': rocksdb.Options()})
+
+        cf = self.db.get_column_family(b'one')
+        self.assertEqual(b'one', self.db.get(b'a', column_family=cf))
+        self.assertEqual(2, len(self.db.column_families))
+
+    def test_write_batch(self):
+        cf = self.db.create_column_family(b'one', rocksdb.Options())
+
+        batch = rocksdb.WriteBatch()
+        batch.put(b'a', b'1')
+        batch.put(b'b', b'2', column_family=cf)
+        batch.delete(b'c', column_family=cf)
+        self.db.write(batch)
+
+        self.assertEqual(
+            {b'a': b'1', b'b': None},
+            self.db.multi_get([b'a', b'b']))
+
+        self.assertEqual(
+            {b'a': None, b'b': b'2'},
+            self.db.multi_get([b'a', b'b'], column_family=cf))
+
+        ref = [
+            ('Put', b'a', b'1', 0),
+            ('Put', b'b', b'2', cf.id),
+            ('Delete', b'c', b'', cf.id)
+        ]
+        self.assertEqual(ref, list(batch.iterator(with_column_family=True)))
+
+    def test_iter_and_drop(self):
+        cf = self.db.create_column_family(b'one', rocksdb.Options())
+        for x in range(10):
+            self.db.put(int_to_bytes(x), int_to_bytes(x), column_family=cf)
+
+        it = self.db.iterkeys(column_family=cf)
+        it.seek_to_first()
+        self.assertEqual([int_to_bytes(x) for x in range(10)], list(it))
+
+        it = self.db.iterkeys()
+        it.seek_to_first()
+        self.assertEqual([], list(it))
+
+        self.db.compact_range(column_family=cf)
+        self.assertIsNotNone(
+            self.db.get_property(b'rocksdb.stats', column_family=cf))
+
+        self.db.drop_column_family(cf)
+        self.assertFalse(cf.is_valid)
+        self.assertRaises(ValueError, self.db.get, b'1', column_family=cf)
+
+
+class TestStatistics(unittest.TestCase, TestHelper):
+    def setUp(self):
+        self.stats = rocksdb.Statistics()
+        opts = rocksdb.Options(create_if_missing=True, statistics=self.stats)
+        self._clean()
+        self.db = rocksdb.DB('/tmp/test', opts)
+
+    def tearDown(self):
+        self._close_db()
+
+    def test_get_statistics(self):
+        before = self.db.get_statistics()
+        self.assertIn('rocksdb.bytes.written', before['tickers'])
+        self.assertIn('rocksdb.db.get.micros', before['histograms'])
+
+        for x in range(100):
+            self.db.put(int_to_bytes(x), int_to_bytes(x))
+            self.db.get(int_to_bytes(x))
+
+        delta = self.stats.delta(before)
+        self.assertEqual(100, delta['tickers']['rocksdb.number.keys.written'])
+        self.assertEqual(100, delta['histograms']['rocksdb.db.get.micros']['count'])
+
+        self.stats.reset()
+        self.assertEqual(0, self.stats.tickers()['rocksdb.number.keys.written'])
+
+    def test_perf_context(self):
+        self.db.put(b'a', b'b')
+
+        with rocksdb.PerfContext() as perf:
+            self.db.get(b'a')
+
+        self.assertEqual(1, perf.perf['get_from_memtable_count'])
+        self.assertIn('bytes_read', perf.iostats)
+
+
+def sst_options():
+    return rocksdb.Options()
+
+
+def sst_reader(task):
+    start, stop = task
+    return ((int_to_bytes(x), int_to_bytes(x)) for x in range(start, stop))
+
+
+class TestSstFileWriter(unittest.TestCase, TestHelper):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        self._clean()
+        self.db = rocksdb.DB('/tmp/test', opts)
+        os.makedirs('/tmp/test/sst')
+
+    def tearDown(self):
+        self._close_db()
+
+    def test_write_and_ingest(self):
+        writer = rocksdb.SstFileWriter(rocksdb.Options())
+        writer.open('/tmp/test/sst/1.sst')
+        writer.put(b'a', b'1')
+        writer.put(bytearray(b'b'), memoryview(b'2'))
+        writer.put_many(((b'c', b'3'), (b'd', b'4')), batch_size=1)
+        writer.delete(b'e')
+        self.assertRaises(
+            rocksdb.errors.InvalidArgument,
+            writer.put, b'a', b'unsorted')
+
+        info = writer.finish()
+        self.assertEqual(b'a', info['smallest_key'])
+        self.assertEqual(b'e', info['largest_key'])
+
+        self.db.put(b'e', b'deleted by ingestion')
+        self.db.ingest_external_file(info['file_path'])
+
+        self.assertEqual(b'2', self.db.get(b'b'))
+        self.assertEqual(b'4', self.db.get(b'd'))
+        self.assertIsNone(self.db.get(b'e'))
+
+    def test_bulk_load(self):
+        tasks = [(1000, 2000), (2000, 2000), (2000, 5000), (5000, 6000)]
+        infos = rocksdb.bulk_load.bulk_load(
+            self.db,
+            tasks,
+            sst_reader,
+            sst_options,
+            '/tmp/test/sst',
+            processes=2)
+
+        self.assertEqual(3, len(infos))
+        self.assertEqual(b'1000', self.db.get(b'1000'))
+        self.assertEqual(b'5999', self.db.get(b'5999'))
+        self.assertIsNone(self.db.get(b'6000'))
+
+
+class TestSecondary(unittest.TestCase, TestHelper):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        self._clean()
+        self.db = rocksdb.DB('/tmp/test/db', opts)
+
+    def tearDown(self):
+        self._close_db()
+
+    def test_catch_up(self):
+        self.db.put(b'a', b'1')
+        secondary = rocksdb.DB.open_as_secondary(
+            '/tmp/test/db',
+            '/tmp/test/secondary',
+            rocksdb.Options(max_open_files=-1))
+
+        self.assertEqual(b'1', secondary.get(b'a'))
+        self.db.put(b'b', b'2')
+        self.assertIsNone(secondary.get(b'b'))
+
+        secondary.try_catch_up_with_primary()
+        self.assertEqual(b'2', secondary.get(b'b'))
+        self.assertRaises(Exception, self.db.start_catch_up, 1)
+
+    def test_catch_up_thread(self):
+        secondary = rocksdb.DB.open_as_secondary(
+            '/tmp/test/db',
+            '/tmp/test/secondary',
+            rocksdb.Options(max_open_files=-1),
+            catch_up_interval=0.01)
+
+        self.db.put(b'a', b'1')
+        for _ in range(500):
+            if secondary.get(b'a') is not None:
+                break
+            time.sleep(0.01)
+        self.assertEqual(b'1', secondary.get(b'a'))
+        self.assertIsNone(secondary.last_catch_up_error)
+
+        # Without the files of the primary every attempt fails.
+        shutil.rmtree('/tmp/test/db')
+        for _ in range(500):
+            if secondary.last_catch_up_error is not None:
+                break
+            time.sleep(0.01)
+        self.assertIsInstance(secondary.last_catch_up_error, Exception)
+
+        secondary.stop_catch_up()
+
+
+class TestKeyCodec(unittest.TestCase, TestHelper):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        self._clean()
+        self.db = rocksdb.DB("/tmp/test", opts)
+        self.db.key_codec = rocksdb.KeyCodec()
+
+    def tearDown(self):
+        self._close_db()
+
+    def test_order(self):
+        keys = [
+            (None,),
+            (-2 ** 63,),
+            (-1,),
+            (0,),
+            (1, b''),
+            (1, b'\x00'),
+            (1, b'\x00\x00'),
+            (1, b'a'),
+            (1, b'a', 1),
+            (1, b'ab'),
+            (2 ** 63 - 1,),
+            (float('-inf'),),
+            (-1.5,),
+            (0.0,),
+            (2.5,),
+            (float('inf'),),
+            (b'b',),
+            (u'a',),
+            (u'\xe4',),
+        ]
+        encoded = rocksdb.keycodec.encode_many(keys)
+        self.assertEqual(sorted(encoded), encoded)
+        self.assertEqual(keys, rocksdb.keycodec.decode_many(encoded))
+
+    def test_descending(self):
+        codec = rocksdb.KeyCodec(descending=(1,))
+        self.assertEqual((1,), codec.descending_fields)
+
+        keys = [(1, 3, b'a'), (1, 2, b'a'), (1, 2, b'b'), (2, 5, b'a')]
+        encoded = codec.encode_many(keys)
+        self.assertEqual(sorted(encoded), encoded)
+        self.assertEqual(keys, rocksdb.keycodec.decode_many(encoded))
+
+    def test_errors(self):
+        self.assertRaises(TypeError, rocksdb.keycodec.encode, ([],))
+        self.assertRaises(OverflowError, rocksdb.keycodec.encode, (2 ** 64,))
+        self.assertRaises(ValueError, rocksdb.keycodec.decode, b'\x02\x00')
+        self.assertRaises(ValueError, rocksdb.keycodec.decode, b'\x04a')
+        self.assertRaises(Exception, setattr, self.db, 'key_codec', object())
+
+    def test_db(self):
+        self.db.put((1, u'a'), b'1')
+        self.db.put((1, u'b'), b'2')
+        self.db.put((2, u'a'), b'3')
+
+        self.assertEqual(b'1', self.db.get((1, u'a')))
+        self.assertEqual(
+            {(1, u'a'): b'1', (3,): None},
+            self.db.multi_get([(1, u'a'), (3,)]))
+
+        self.db.delete((1, u'b'))
+        self.assertIsNone(self.db.get((1, u'b')))
+
+        it = self.db.iteritems()
+        it.seek((1,))
+        self.assertEqual([((1, u'a'), b'1'), ((2, u'a'), b'3')], list(it))
+
+        it = self.db.iterkeys(batch_size=10)
+        it.seek_to_first()
+        self.assertEqual([(1, u'a'), (2, u'a')], list(it))
+
+        self.assertRaises(TypeError, self.db.put, b'raw', b'4')
+        self.assertRaises(TypeError, self.db.get, b'raw')
+        self.assertEqual([(1, u'a'), (2, u'a')], list(self.db.iterkeys()))
+
+        self.db.compact_range()
+        for begin, end in self.db.split_key_ranges(4):
+            self.assertTrue(begin is None or isinstance(begin, tuple))
+            self.assertTrue(end is None or isinstance(end, tuple))
+        self.assertEqual(1, len(self.db.get_approximate_sizes([((1,), (3,))])))
+
+    def test_compact_range(self):
+        self.db.put((1, u'a'), b'1')
+        self.db.compact_range(begin=(1,), end=(2,))
+        self.assertRaises(TypeError, self.db.compact_range, begin=b'raw')
+        self.assertEqual(b'1', self.db.get((1, u'a')))
+
+    def test_raw_key_methods(self):
+        self.assertRaises(
+            rocksdb.errors.NotSupported,
+            self.db.put_array,
+            b'abcd',
+            b'abcd')
+        self.assertRaises(
+            rocksdb.errors.NotSupported,
+            self.db.multi_get_array,
+            b'abcd')
+        self.assertRaises(rocksdb.errors.NotSupported, self.db.scan_to_buffers)
+
+
+class TestBenchmarks(unittest.TestCase, TestHelper):
+    def setUp(self):
+        self._clean()
+        os.makedirs('/tmp/test')
+
+    def tearDown(self):
+        self._clean()
+
+    def test_percentile(self):
+        values = list(range(1, 1001))
+        self.assertEqual(500, rocksdb.benchmarks.percentile(values, 0.5))
+        self.assertEqual(990, rocksdb.benchmarks.percentile(values, 0.99))
+        self.assertEqual(999, rocksdb.benchmarks.percentile(values, 0.999))
+        self.assertEqual(0.0, rocksdb.benchmarks.percentile([], 0.5))
+
+    def test_run(self):
+        config = rocksdb.benchmarks.Config(
+            num=200,
+            threads=(1, 2),
+            merge_operator='python',
+            prefix_extractor='native')
+
+        results = rocksdb.benchmarks.run_benchmarks(
+            rocksdb.benchmarks.DEFAULT_BENCHMARKS,
+            directory='/tmp/test',
+            config=config)
+
+        self.assertEqual(2 * len(rocksdb.benchmarks.DEFAULT_BENCHMARKS), len(results))
+        for result in results:
+            self.assertGreaterEqual(result['ops'], 200)
+            self.assertGreater(result['ops_per_sec'], 0)
+            self.assertLessEqual(result['latency_us']['p50'], result['latency_us']['p999'])
+        self.assertEqual([], os.listdir('/tmp/test'))
+
+    def test_config(self):
+        self.assertRaises(TypeError, rocksdb.benchmarks.Config, foo=1)
+        self.assertRaises(ValueError, rocksdb.benchmarks.Config, threads=())
+        self.assertRaises(ValueError, rocksdb.benchmarks.Config, comparator='foo')
+
+
+class TestInstrumentation(unittest.TestCase, TestHelper):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        opts.merge_operator = AssocCounter()
+        self._clean()
+        self.db = rocksdb.DB("/tmp/test", opts)
+        rocksdb.instrumentation.reset()
+
+    def tearDown(self):
+        rocksdb.instrumentation.disable()
+        self._close_db()
+
+    def test_disabled(self):
+        self.db.put(b'a', b'1')
+        self.assertFalse(rocksdb.instrumentation.is_enabled())
+        self.assertEqual(0, rocksdb.instrumentation.snapshot()['DB.put']['calls'])
+
+    def test_calls(self):
+        with rocksdb.instrumentation.enabled() as snapshot:
+            self.db.put(b'a', b'1')
+            self.db.get(b'a')
+            self.db.get(b'b', fill_cache=False)
+            self.db.merge(b'a', b'2')
+            self.db.merge(b'a', b'x')
+            self.assertRaises(Exception, self.db.get, b'a')
+            stats = snapshot()
+
+        self.assertFalse(rocksdb.instrumentation.is_enabled())
+        self.assertEqual(1, stats['DB.put']['calls'])
+        self.assertEqual(3, stats['DB.get']['calls'])
+        self.assertEqual(3, stats['DB.get']['latency']['count'])
+        self.assertEqual(1, stats['DB.get']['errors'])
+        self.assertEqual(3, stats['DB.read_opts']['calls'])
+        self.assertNotIn('gil_wait', stats['DB.get'])
+
+        # The merge of b'x' raises in the operator, this fails the get.
+        merge = stats['merge']
+        self.assertEqual('callback', merge['type'])
+        self.assertGreaterEqual(merge['calls'], 2)
+        self.assertEqual(1, merge['errors'])
+        self.assertEqual(merge['calls'], merge['gil_wait']['count'])
+        self.assertEqual(
+            merge['calls'],
+            sum(count for _, count in merge['latency']['buckets']))
+
+    def test_prometheus(self):
+        rocksdb.instrumentation.enable()
+        self.db.put(b'a', b'1')
+
+        text = rocksdb.instrumentation.to_prometheus(prefix='test')
+        self.assertIn('# TYPE test_calls_total counter', text)
+        self.assertIn('test_calls_total{call="DB.put",type="method"} 1', text)
+        self.assertIn(
+            'test_call_duration_seconds_bucket{call="DB.put",type="method",le="+Inf"} 1',
+            text)
+        self.assertIn('test_gil_wait_seconds_count{call="merge",type="callback"} 0', text)
+
+
+class TestBackup(unittest.TestCase, TestHelper):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        self._clean()
+        self.db = rocksdb.DB('/tmp/test/db', opts)
+
+    def tearDown(self):
+        self._close_db()
+
+    def test_checkpoint(self):
+        self.db.put(b'a', b'1')
+        checkpoint = rocksdb.Checkpoint(self.db)
+        checkpoint.create('/tmp/test/checkpoint')
+        self.db.put(b'b', b'2')
+
+        copy = rocksdb.DB('/tmp/test/checkpoint', rocksdb.Options())
+        self.assertEqual(b'1', copy.get(b'a'))
+        self.assertIsNone(copy.get(b'b'))
+
+    def test_backup(self):
+        self.db.put(b'a', b'1')
+        engine = rocksdb.BackupEngine(
+            '/tmp/test/backup',
+            max_background_operations=4,
+            share_files_with_checksum=True,
+            callback_trigger_interval_size=1)
+
+        calls = []
+        engine.create_backup(
+            self.db,
+            flush_before_backup=True,
+            progress_callback=lambda: calls.append(1))
+        self.assertTrue(calls)
+
+        backup_id = engine.get_backup_info()[0]['backup_id']
+        engine.verify_backup(backup_id)
+        engine.verify_backup(backup_id, verify_with_checksum=True)
+        self.assertRaises(rocksdb.errors.NotFound, engine.verify_backup, 1000)
+
+        engine.restore_latest_backup('/tmp/test/restore', '/tmp/test/restore')
+        copy = rocksdb.DB('/tmp/test/restore', rocksdb.Options())
+        self.assertEqual(b'1', copy.get(b'a'))
+
+    def test_backup_progress_error(self):
+        self.db.put(b'a', b'1')
+        engine = rocksdb.BackupEngine(
+            '/tmp/test/backup',
+            callback_trigger_interval_size=1)
+
+        def progress():
+            raise ValueError("stop")
+
+        with self.assertRaises(ValueError):
+            engine.create_backup(
+                self.db,
+                flush_before_backup=True,
+                progress_callback=progress)
+
+        # Only the failed backup is aborted.
+        engine.create_backup(self.db)
+        self.assertEqual(1, len(engine.get_backup_info()))
+
+        engine.restore_latest_backup('/tmp/test/restore', '/tmp/test/restore')
+        copy = rocksdb.DB('/tmp/test/restore', rocksdb.Options())
+        self.assertEqual(b'1', copy.get(b'a'))
+
+    def test_backup_after_stop(self):
+        self.db.put(b'a', b'1')
+        engine = rocksdb.BackupEngine('/tmp/test/backup')
+        engine.stop_backup()
+        engine.create_backup(self.db, flush_before_backup=True)
+        self.assertEqual(1, len(engine.get_backup_info()))
+
+
+class TestTransactionDB(unittest.TestCase, TestHelper):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        self._clean()
+        self.db = rocksdb.TransactionDB(
+            '/tmp/test',
+            opts,
+            transaction_lock_timeout=10)
+
+    def tearDown(self):
+        self._close_db()
+
+    def test_key_codec(self):
+        self.db.key_codec = rocksdb.KeyCodec()
+        with self.db.begin_transaction() as txn:
+            txn.put((1, u'a'), b'1')
+            txn.put((1, u'b'), b'2')
+            txn.delete((1, u'c'))
+            self.assertEqual(b'1', txn.get((1, u'a')))
+            self.assertEqual(b'1', txn.get_for_update((1, u'a')))
+            self.assertEqual([(1, u'a'), (1, u'b')], list(txn.iterkeys()))
+            self.assertRaises(TypeError, txn.put, b'raw', b'3')
+
+        self.assertEqual(b'1', self.db.get((1, u'a')))
+
+    def test_commit_rollback(self):
+        txn = self.db.begin_transaction()
+        txn.put(b'a', b'1')
+        self.assertEqual(b'1', txn.get(b'a'))
+        self.assertIsNone(self.db.get(b'a'))
+        txn.commit()
+        self.assertEqual(b'1', self.db.get(b'a'))
+        self.assertRaises(Exception, txn.put, b'b', b'2')
+
+        with self.assertRaises(KeyError):
+            with self.db.begin_transaction() as txn:
+                txn.delete(b'a')
+                raise KeyError()
+        self.assertEqual(b'1', self.db.get(b'a'))
+
+        with self.db.begin_transaction() as txn:
+            txn.delete(b'a')
+        self.assertIsNone(self.db.get(b'a'))
+
+    def test_lock_timeout(self):
+        first = self.db.begin_transaction()
+        second = self.db.begin_transaction()
+
+        self.assertIsNone(first.get_for_update(b'a'))
+        self.assertRaises(rocksdb.errors.TimedOut, second.put, b'a', b'2')
+
+        first.put(b'a', b'1')
+        first.commit()
+        second.put(b'a', b'2')
+        second.commit()
+        self.assertEqual(b'2', self.db.get(b'a'))
+
+    def test_savepoint(self):
+        txn = self.db.begin_transaction()
+        txn.put(b'a', b'1')
+        txn.set_savepoint()
+        txn.put(b'b', b'2')
+        txn.rollback_to_savepoint()
+        self.assertRaises(rocksdb.errors.NotFound, txn.rollback_to_savepoint)
+
+        it = txn.iteritems()
+        it.seek_to_first()
+        self.assertEqual([(b'a', b'1')], list(it))
+        txn.commit()
+        self.assertIsNone(self.db.get(b'b'))
+
+
+class TestOptimisticTransactionDB(unittest.TestCase, TestHelper):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        self._clean()
+        self.db = rocksdb.OptimisticTransactionDB('/tmp/test', opts)
+
+    def tearDown(self):
+        self._close_db()
+
+    def test_conflict(self):
+        txn = self.db.begin_transaction(set_snapshot=True)
+        txn.get_for_update(b'a')
+        txn.put(b'a', b'1')
+
+        self.db.put(b'a', b'2')
+        self.assertRaises(rocksdb.errors.Busy, txn.commit)
+        self.assertEqual(b'2', self.db.get(b'a'))
+
 
 class AssocCounter(rocksdb.interfaces.AssociativeMergeOperator):
     def merge(self, key, existing_value, value):
@@ -280,6 +1251,138 @@ class TestFullMerge(unittest.TestCase, TestHelper):
         self.assertEqual(sum(range(1000)), int(self.db.get(b'a')))
 
 
+class TestNativeMerge(unittest.TestCase, TestHelper):
+    def setUp(self):
+        self._clean()
+
+    def tearDown(self):
+        self._close_db()
+
+    def _open(self, merge_operator):
+        opts = rocksdb.Options(create_if_missing=True)
+        opts.merge_operator = merge_operator
+        self.db = rocksdb.DB('/tmp/test', opts)
+
+    def test_uint64_add(self):
+        self._open(rocksdb.merge_operators.UInt64Add())
+        for x in range(1000):
+            self.db.merge(b"a", struct.pack('<Q', x))
+        self.assertEqual(
+            sum(range(1000)),
+            struct.unpack('<Q', self.db.get(b'a'))[0])
+
+        self.db.merge(b"a", b"invalid")
+        self.assertRaises(rocksdb.errors.Corruption, self.db.get, b'a')
+
+    def test_string_append(self):
+        self._open(rocksdb.merge_operators.StringAppend(b'|'))
+        self.db.put(b"a", b"1")
+        self.db.merge(b"a", b"2")
+        self.db.merge(b"a", b"3")
+        self.db.merge(b"b", b"x")
+        self.assertEqual(b"1|2|3", self.db.get(b"a"))
+        self.assertEqual(b"x", self.db.get(b"b"))
+
+    def test_max_min(self):
+        op = rocksdb.merge_operators.Max()
+        self.assertEqual(b"b", op.merge(b"key", b"a", b"b"))
+        self.assertEqual(b"b", op.merge(b"key", b"b", b"a"))
+        self.assertEqual(b"a", op.merge(b"key", None, b"a"))
+
+        op = rocksdb.merge_operators.Min()
+        self.assertEqual(b'MinOperator', op.name())
+        self.assertEqual(b"a", op.merge(b"key", b"a", b"b"))
+
+        self._open(op)
+        for x in (b"5", b"3", b"7"):
+            self.db.merge(b"a", x)
+        self.assertEqual(b"3", self.db.get(b"a"))
+
+    def test_bounded_list_append(self):
+        op = rocksdb.merge_operators.BoundedListAppend(3)
+        self.assertEqual(b"b,c,d", op.merge(b"key", b"a,b,c", b"d"))
+        self.assertRaises(ValueError, rocksdb.merge_operators.BoundedListAppend, 0)
+
+        self._open(op)
+        for x in range(10):
+            self.db.merge(b"a", int_to_bytes(x))
+        self.assertEqual(b"7,8,9", self.db.get(b"a"))
+
+
+class EvenFilter(rocksdb.interfaces.CompactionFilter):
+    def filter(self, level, key, existing_value):
+        if int(key) % 2 == 0:
+            return (True, None)
+        return (False, existing_value + b'!')
+
+    def name(self):
+        return b'EvenFilter'
+
+
+class FilterFactory(rocksdb.interfaces.CompactionFilterFactory):
+    def __init__(self):
+        self.contexts = []
+
+    def create_compaction_filter(self, context):
+        self.contexts.append(context)
+        if context['is_manual_compaction']:
+            return EvenFilter()
+        return rocksdb.PrefixDropFilter([b'1'])
+
+    def name(self):
+        return b'FilterFactory'
+
+
+class TestCompactionFilter(unittest.TestCase, TestHelper):
+    def setUp(self):
+        self._clean()
+
+    def tearDown(self):
+        self._close_db()
+
+    def _open(self, **kwargs):
+        opts = rocksdb.Options(create_if_missing=True, **kwargs)
+        self.db = rocksdb.DB('/tmp/test', opts)
+        for x in range(20):
+            self.db.put(int_to_bytes(x), int_to_bytes(x))
+        self.db.compact_range()
+
+    def test_python_filter(self):
+        self._open(compaction_filter=EvenFilter())
+        self.assertIsNone(self.db.get(b'2'))
+        self.assertEqual(b'3!', self.db.get(b'3'))
+
+    def test_factory(self):
+        factory = FilterFactory()
+        self._open(compaction_filter_factory=factory)
+        self.assertTrue(factory.contexts[-1]['is_manual_compaction'])
+        self.assertIsNone(self.db.get(b'2'))
+        self.assertEqual(b'3!', self.db.get(b'3'))
+
+    def test_prefix_drop_filter(self):
+        self._open(compaction_filter=rocksdb.PrefixDropFilter([b'1', b'5']))
+        self.assertIsNone(self.db.get(b'1'))
+        self.assertIsNone(self.db.get(b'15'))
+        self.assertIsNone(self.db.get(b'5'))
+        self.assertEqual(b'2', self.db.get(b'2'))
+
+    def test_ttl_filter(self):
+        ttl = rocksdb.TTLFilter(60)
+        now = int(time.time())
+        fresh = b'a' + struct.pack('<I', now)
+        old = b'a' + struct.pack('<I', now - 61)
+        self.assertEqual((False, None), ttl.filter(0, b'key', fresh))
+        self.assertEqual((True, None), ttl.filter(0, b'key', old))
+        self.assertEqual((False, None), ttl.filter(0, b'key', b'a'))
+
+        self._open(compaction_filter=ttl)
+        self.db.put(b'fresh', fresh)
+        self.db.put(b'old', old)
+        self.db.compact_range()
+        self.assertEqual(fresh, self.db.get(b'fresh'))
+        self.assertIsNone(self.db.get(b'old'))
+
+
 class SimpleComparator(rocksdb.interfaces.Comparator):
     def name(self):
         return b'mycompare'
@@ -312,6 +1415,44 @@ class TestComparator(unittest.TestCase, TestHelper):
 
         self.assertEqual(b'300', self.db.get(b'300'))
 
+class TestNativeComparator(unittest.TestCase, TestHelper):
+    def setUp(self):
+        self._clean()
+
+    def tearDown(self):
+        self._close_db()
+
+    def _open(self, comparator):
+        opts = rocksdb.Options(create_if_missing=True)
+        opts.comparator = comparator
+        self.db = rocksdb.DB('/tmp/test', opts)
+
+    def test_reverse_bytewise(self):
+        self._open(rocksdb.ReverseBytewiseComparator())
+        for x in (b'a', b'c', b'b'):
+            self.db.put(x, x)
+
+        it = self.db.iterkeys()
+        it.seek_to_first()
+        self.assertEqual([b'c', b'b', b'a'], list(it))
+
+    def test_uint64(self):
+        comparator = rocksdb.UInt64Comparator()
+        self.assertEqual(
+            -1,
+            comparator.compare(struct.pack('<Q', 255), struct.pack('<Q', 256)))
+
+        self._open(comparator)
+        for x in (256, 1, 255, 2 ** 40):
+            self.db.put(struct.pack('<Q', x), b'')
+
+        it = self.db.iterkeys()
+        it.seek_to_first()
+        self.assertEqual(
+            [1, 255, 256, 2 ** 40],
+            [struct.unpack('<Q', key)[0] for key in it])
+
+
 class StaticPrefix(rocksdb.interfaces.SliceTransform):
     def name(self):
         return b'static'
@@ -367,3 +1508,23 @@ class TestPrefixExtractor(unittest.TestCase, TestHelper):
         ref = {b'00002.z': b'z', b'00002.y': b'y', b'00002.x': b'x'}
         ret = takewhile(lambda item: item[0].startswith(b'00002'), it)
         self.assertEqual(ref, dict(ret))
+
+class TestNativePrefixExtractor(TestPrefixExtractor):
+    def setUp(self):
+        opts = rocksdb.Options(create_if_missing=True)
+        opts.prefix_extractor = rocksdb.FixedPrefixTransform(5)
+        self._clean()
+        self.db = rocksdb.DB('/tmp/test', opts)
+
+    def test_transform(self):
+        extractor = rocksdb.CappedPrefixTransform(3)
+        self.assertEqual((0, 3), extractor.transform(b'abcdef'))
+        self.assertEqual((0, 2), extractor.transform(b'ab'))
+
+        extractor = rocksdb.FixedPrefixTransform(3)
+        self.assertTrue(extractor.in_domain(b'abc'))
+        self.assertFalse(extractor.in_domain(b'ab'))
+        self.assertRaises(ValueError, extractor.transform, b'ab')
+
+        extractor = rocksdb.NoopTransform()
+        self.assertEqual((0, 6), extractor.transform(b'abcdef'))
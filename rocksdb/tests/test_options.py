@@ -1,5 +1,6 @@
 import unittest
 import rocksdb
+import rocksdb.merge_operators
 
 class TestFilterPolicy(rocksdb.interfaces.FilterPolicy):
     def create_filter(self, keys):
@@ -33,20 +34,128 @@ class TestOptions(unittest.TestCase):
         opts.merge_operator = ob
         self.assertEqual(opts.merge_operator, ob)
 
+        ob = rocksdb.merge_operators.UInt64Add()
+        opts.merge_operator = ob
+        self.assertIs(opts.merge_operator, ob)
+
         self.assertIsInstance(
             opts.comparator,
             rocksdb.BytewiseComparator)
 
+        ob = rocksdb.ReverseBytewiseComparator()
+        opts.comparator = ob
+        self.assertIs(opts.comparator, ob)
+
+        self.assertIsNone(opts.prefix_extractor)
+        ob = rocksdb.FixedPrefixTransform(4)
+        opts.prefix_extractor = ob
+        self.assertIs(opts.prefix_extractor, ob)
+
         self.assertEqual('snappy_compression', opts.compression)
         opts.compression = rocksdb.CompressionType.no_compression
         self.assertEqual('no_compression', opts.compression)
 
+    def test_compression(self):
+        opts = rocksdb.Options()
+        self.assertEqual([], opts.compression_per_level)
+        opts.compression_per_level = [
+            rocksdb.CompressionType.no_compression,
+            rocksdb.CompressionType.lz4_compression,
+            rocksdb.CompressionType.zstd_compression]
+        self.assertEqual(
+            ['no_compression', 'lz4_compression', 'zstd_compression'],
+            opts.compression_per_level)
+
+        self.assertEqual('disable_compression_option', opts.bottommost_compression)
+        opts.bottommost_compression = rocksdb.CompressionType.zstd_compression
+        self.assertEqual('zstd_compression', opts.bottommost_compression)
+        self.assertRaises(
+            TypeError,
+            setattr, opts, 'compression', 'disable_compression_option')
+
+        opts.compression_opts = {'level': 3, 'max_dict_bytes': 16384}
+        self.assertEqual(3, opts.compression_opts['level'])
+        self.assertEqual(16384, opts.compression_opts['max_dict_bytes'])
+
+        opts.bottommost_compression_opts = {
+            'max_dict_bytes': 16384,
+            'zstd_max_train_bytes': 100 * 16384,
+            'enabled': True}
+        self.assertEqual(
+            100 * 16384,
+            opts.bottommost_compression_opts['zstd_max_train_bytes'])
+        self.assertTrue(opts.bottommost_compression_opts['enabled'])
+        self.assertRaises(ValueError, setattr, opts, 'compression_opts', {'nix': 1})
+
     def test_block_options(self):
         rocksdb.BlockBasedTableFactory(
             block_size=4096,
-            filter_policy=TestFilterPolicy(),
+            filter_policy=rocksdb.BloomFilterPolicy(10),
             block_cache=rocksdb.LRUCache(100))
 
+        self.assertRaises(
+            TypeError,
+            rocksdb.BlockBasedTableFactory,
+            filter_policy=object())
+
+    def test_removed_apis(self):
+        self.assertRaises(
+            rocksdb.errors.NotSupported,
+            rocksdb.BlockBasedTableFactory,
+            filter_policy=TestFilterPolicy())
+
+        self.assertRaises(
+            rocksdb.errors.NotSupported,
+            rocksdb.BlockBasedTableFactory,
+            block_cache_compressed=rocksdb.LRUCache(100))
+
+        self.assertRaises(
+            rocksdb.errors.NotSupported,
+            rocksdb.BlockBasedTableFactory,
+            hash_index_allow_collision=False)
+        rocksdb.BlockBasedTableFactory(hash_index_allow_collision=True)
+
+        self.assertRaises(rocksdb.errors.NotSupported, rocksdb.ClockCache, 100)
+
+        opts = rocksdb.Options()
+        with self.assertRaises(rocksdb.errors.NotSupported):
+            opts.max_mem_compaction_level = 1
+        with self.assertRaises(rocksdb.errors.NotSupported):
+            opts.filter_deletes
+        self.assertRaises(
+            rocksdb.errors.NotSupported,
+            rocksdb.Options,
+            soft_rate_limit=1.0)
+
+    def test_block_options_point_lookups(self):
+        rocksdb.BlockBasedTableFactory(
+            index_type='two_level_index_search',
+            filter_policy=rocksdb.RibbonFilterPolicy(10, bloom_before_level=1),
+            block_cache=rocksdb.LRUCache(1024 * 1024),
+            cache_index_and_filter_blocks=True,
+            cache_index_and_filter_blocks_with_high_priority=True,
+            pin_l0_filter_and_index_blocks_in_cache=True,
+            pin_top_level_index_and_filter=True,
+            partition_filters=True,
+            metadata_block_size=4096,
+            format_version=5,
+            data_block_index_type='binary_and_hash',
+            data_block_hash_table_util_ratio=0.75)
+
+        rocksdb.BlockBasedTableFactory(
+            filter_policy=rocksdb.FullFilterPolicy(10),
+            data_block_index_type='binary_search')
+
+        self.assertRaises(
+            ValueError,
+            rocksdb.BlockBasedTableFactory,
+            partition_filters=True)
+
+        self.assertRaises(
+            ValueError,
+            rocksdb.BlockBasedTableFactory,
+            data_block_index_type='nix')
+
     def test_unicode_path(self):
         name = b'/tmp/M\xc3\xbcnchen'.decode('utf8')
         opts = rocksdb.Options()
@@ -102,3 +211,69 @@ class TestOptions(unittest.TestCase):
         self.assertIsNone(opts.row_cache)
         opts.row_cache = cache = rocksdb.LRUCache(2*1024*1024)
         self.assertEqual(cache, opts.row_cache)
+
+    def test_cache(self):
+        cache = rocksdb.LRUCache(
+            1024 * 1024,
+            strict_capacity_limit=True,
+            high_pri_pool_ratio=0.5)
+
+        self.assertEqual(1024 * 1024, cache.get_capacity())
+        self.assertEqual(0, cache.get_usage())
+        self.assertEqual(0, cache.get_pinned_usage())
+        self.assertTrue(cache.strict_capacity_limit)
+
+        cache.set_capacity(2048)
+        cache.strict_capacity_limit = False
+        self.assertEqual(2048, cache.get_capacity())
+        self.assertFalse(cache.strict_capacity_limit)
+
+        cache = rocksdb.HyperClockCache(1024 * 1024, 4096)
+        self.assertEqual(1024 * 1024, cache.get_capacity())
+
+    def test_write_buffer_manager(self):
+        opts = rocksdb.Options()
+        self.assertIsNone(opts.write_buffer_manager)
+
+        cache = rocksdb.LRUCache(64 * 1024 * 1024)
+        manager = rocksdb.WriteBufferManager(1024 * 1024, cache=cache)
+        opts.write_buffer_manager = manager
+        self.assertIs(manager, opts.write_buffer_manager)
+        self.assertIs(cache, manager.cache)
+
+        self.assertTrue(manager.enabled())
+        self.assertTrue(manager.cost_to_cache())
+        self.assertEqual(1024 * 1024, manager.buffer_size())
+        self.assertEqual(0, manager.memory_usage())
+
+        manager.set_buffer_size(2048 * 1024)
+        self.assertEqual(2048 * 1024, manager.buffer_size())
+
+        self.assertFalse(rocksdb.WriteBufferManager(0).enabled())
+        self.assertRaises(Exception, rocksdb.WriteBufferManager, 10, cache=object())
+
+        opts.write_buffer_manager = None
+        self.assertIsNone(opts.write_buffer_manager)
+
+    def test_compaction_filter(self):
+        opts = rocksdb.Options()
+        self.assertIsNone(opts.compaction_filter)
+        opts.compaction_filter = ob = rocksdb.TTLFilter(3600)
+        self.assertIs(ob, opts.compaction_filter)
+        opts.compaction_filter = None
+        self.assertIsNone(opts.compaction_filter)
+        self.assertRaises(TypeError, setattr, opts, 'compaction_filter', object())
+
+    def test_statistics(self):
+        opts = rocksdb.Options()
+        self.assertIsNone(opts.statistics)
+        opts.statistics = stats = rocksdb.Statistics()
+        self.assertEqual(stats, opts.statistics)
+        self.assertEqual('except_detailed_timers', stats.level)
+
+        stats.level = 'all'
+        self.assertEqual('all', stats.level)
+        self.assertRaises(Exception, setattr, stats, 'level', 'nix')
+
+        opts.statistics = None
+        self.assertIsNone(opts.statistics)
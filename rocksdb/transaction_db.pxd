@@ -0,0 +1,103 @@
+from libcpp cimport bool as cpp_bool
+from libcpp.string cimport string
+from libcpp.vector cimport vector
+from libc.stdint cimport int64_t
+from libc.stdint cimport uint64_t
+from slice_ cimport Slice
+from status cimport Status
+from snapshot cimport Snapshot
+from iterator cimport Iterator
+from options cimport Options
+from options cimport DBOptions
+from options cimport ReadOptions
+from options cimport WriteOptions
+from db cimport DB
+from db cimport ColumnFamilyHandle
+from db cimport ColumnFamilyDescriptor
+
+cdef extern from "rocksdb/utilities/transaction.h" namespace "rocksdb":
+    cdef cppclass Transaction:
+        void SetSnapshot() nogil except+
+        const Snapshot* GetSnapshot() nogil except+
+
+        void SetSavePoint() nogil except+
+        Status RollbackToSavePoint() nogil except+
+        Status PopSavePoint() nogil except+
+
+        Status Commit() nogil except+
+        Status Rollback() nogil except+
+
+        Status Get(
+            const ReadOptions&,
+            ColumnFamilyHandle*,
+            const Slice&,
+            string*) nogil except+
+
+        Status GetForUpdate(
+            const ReadOptions&,
+            ColumnFamilyHandle*,
+            const Slice&,
+            string*,
+            cpp_bool) nogil except+
+
+        Status Put(ColumnFamilyHandle*, const Slice&, const Slice&) nogil except+
+        Status Merge(ColumnFamilyHandle*, const Slice&, const Slice&) nogil except+
+        Status Delete(ColumnFamilyHandle*, const Slice&) nogil except+
+
+        Iterator* GetIterator(const ReadOptions&, ColumnFamilyHandle*) nogil except+
+
+        void SetLockTimeout(int64_t) nogil except+
+        uint64_t GetNumKeys() nogil except+
+
+cdef extern from "rocksdb/utilities/transaction_db.h" namespace "rocksdb":
+    cdef cppclass TransactionDBOptions:
+        int64_t max_num_locks
+        size_t num_stripes
+        int64_t transaction_lock_timeout
+        int64_t default_lock_timeout
+
+    cdef cppclass TransactionOptions:
+        cpp_bool set_snapshot
+        cpp_bool deadlock_detect
+        int64_t lock_timeout
+        int64_t expiration
+
+    cdef cppclass TransactionDB(DB):
+        Transaction* BeginTransaction(
+            const WriteOptions&,
+            const TransactionOptions&) nogil except+
+
+    cdef Status TransactionDB_Open "rocksdb::TransactionDB::Open"(
+        const Options&,
+        const TransactionDBOptions&,
+        const string&,
+        TransactionDB**) nogil except+
+
+    cdef Status TransactionDB_OpenColumnFamilies "rocksdb::TransactionDB::Open"(
+        const DBOptions&,
+        const TransactionDBOptions&,
+        const string&,
+        const vector[ColumnFamilyDescriptor]&,
+        vector[ColumnFamilyHandle*]*,
+        TransactionDB**) nogil except+
+
+cdef extern from "rocksdb/utilities/optimistic_transaction_db.h" namespace "rocksdb":
+    cdef cppclass OptimisticTransactionOptions:
+        cpp_bool set_snapshot
+
+    cdef cppclass OptimisticTransactionDB(DB):
+        Transaction* BeginTransaction(
+            const WriteOptions&,
+            const OptimisticTransactionOptions&) nogil except+
+
+    cdef Status OptimisticTransactionDB_Open "rocksdb::OptimisticTransactionDB::Open"(
+        const Options&,
+        const string&,
+        OptimisticTransactionDB**) nogil except+
+
+    cdef Status OptimisticTransactionDB_OpenColumnFamilies "rocksdb::OptimisticTransactionDB::Open"(
+        const DBOptions&,
+        const string&,
+        const vector[ColumnFamilyDescriptor]&,
+        vector[ColumnFamilyHandle*]*,
+        OptimisticTransactionDB**) nogil except+
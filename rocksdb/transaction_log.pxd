@@ -0,0 +1,26 @@
+from libcpp.string cimport string
+from libcpp.vector cimport vector
+from libc.stdint cimport uint64_t
+from libcpp cimport bool as cpp_bool
+from std_memory cimport unique_ptr
+from status cimport Status
+
+cdef extern from "rocksdb/transaction_log.h" namespace "rocksdb":
+    ctypedef uint64_t SequenceNumber
+
+    ctypedef enum WalFileType:
+        kArchivedLogFile
+        kAliveLogFile
+
+    cdef cppclass LogFile:
+        string PathName() nogil except+
+        uint64_t LogNumber() nogil except+
+        WalFileType Type() nogil except+
+        SequenceNumber StartSequence() nogil except+
+        uint64_t SizeFileBytes() nogil except+
+
+    ctypedef vector[unique_ptr[LogFile]] VectorLogPtr
+
+    cdef cppclass TransactionLogIterator:
+        cpp_bool Valid() nogil except+
+        Status status() nogil except+
@@ -0,0 +1,40 @@
+from libcpp cimport bool as cpp_bool
+from libcpp.string cimport string
+from slice_ cimport Slice
+from status cimport Status
+from comparator cimport Comparator
+from iterator cimport Iterator
+from options cimport DBOptions
+from options cimport ReadOptions
+from db cimport DB
+from db cimport WriteBatch
+from db cimport ColumnFamilyHandle
+
+cdef extern from "rocksdb/utilities/write_batch_with_index.h" namespace "rocksdb":
+    cdef cppclass WriteBatchWithIndex:
+        WriteBatchWithIndex(const Comparator*, size_t, cpp_bool) nogil except+
+
+        Status Put(const Slice&, const Slice&) nogil except+
+        Status Put(ColumnFamilyHandle*, const Slice&, const Slice&) nogil except+
+        Status Merge(const Slice&, const Slice&) nogil except+
+        Status Merge(ColumnFamilyHandle*, const Slice&, const Slice&) nogil except+
+        Status Delete(const Slice&) nogil except+
+        Status Delete(ColumnFamilyHandle*, const Slice&) nogil except+
+        void Clear() nogil except+
+
+        WriteBatch* GetWriteBatch() nogil except+
+
+        Status GetFromBatch(
+            ColumnFamilyHandle*,
+            const DBOptions&,
+            const Slice&,
+            string*) nogil except+
+
+        Status GetFromBatchAndDB(
+            DB*,
+            const ReadOptions&,
+            ColumnFamilyHandle*,
+            const Slice&,
+            string*) nogil except+
+
+        Iterator* NewIteratorWithBase(ColumnFamilyHandle*, Iterator*) nogil except+
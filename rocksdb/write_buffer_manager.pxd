@@ -0,0 +1,13 @@
+from libcpp cimport bool as cpp_bool
+from std_memory cimport shared_ptr
+from cache cimport Cache
+
+cdef extern from "rocksdb/write_buffer_manager.h" namespace "rocksdb":
+    cdef cppclass WriteBufferManager:
+        WriteBufferManager(size_t, shared_ptr[Cache]) nogil except+
+        cpp_bool enabled() nogil except+
+        cpp_bool cost_to_cache() nogil except+
+        size_t memory_usage() nogil except+
+        size_t mutable_memtable_memory_usage() nogil except+
+        size_t buffer_size() nogil except+
+        void SetBufferSize(size_t) nogil except+